@@ -0,0 +1,378 @@
+"""
+api.py — Manufacture Balance 4.0 HTTP/JSON Solve Service
+Programmatic access to the engine for other plant systems.
+
+Endpoints (POST bodies are JSON):
+    POST /solve    {tasks | csv, cycle_time, algorithm}   -> stations + metrics
+    POST /metrics  {tasks | csv, cycle_time, algorithm}   -> metrics + assignment
+    POST /energy   {..., kwh_per_sec, cost_per_kwh, co2_factor} -> energy report
+    POST /jes      {..., station_id?, format: json|markdown}    -> work instructions
+    GET  /health
+    GET  /stats    per-endpoint latency percentiles, coalescing and cache counters
+
+`tasks` is a list of {task_id, task_name, duration, predecessors} objects
+(predecessors: space-separated string or list); `csv` is the same data as
+CSV text. Solves run on a worker process pool through the persistent
+solver cache; identical solves that are in flight at the same time share
+one worker job.
+
+Run: python api.py [--host 0.0.0.0] [--port 8502] [--workers 4]
+"""
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from engine.energy_waste import calculate_energy_waste
+from engine.graph import PrecedenceGraph, validate_records
+from engine.hashing import parts_hash, task_rows_hash
+from engine.jes_generator import format_jes_markdown, generate_jes, generate_station_jes
+from engine.solution import stations_to_assignment
+
+HOST = os.environ.get("ALB_API_HOST", "127.0.0.1")
+PORT = int(os.environ.get("ALB_API_PORT", "8502"))
+WORKERS = int(os.environ.get("ALB_API_WORKERS", "0")) or None  # None = CPU count
+SOLVE_TIMEOUT = float(os.environ.get("ALB_API_TIMEOUT", "300"))
+MAX_BODY = 32 * 1024 * 1024
+ALGORITHMS = ("rpw", "greedy")
+JES_FORMATS = ("json", "markdown")
+# Request field -> calculate_energy_waste() argument
+ENERGY_PARAMS = {"kwh_per_sec": "kwh_per_second", "cost_per_kwh": "cost_per_kwh", "co2_factor": "co2_per_kwh"}
+LATENCY_WINDOW = 2048  # most recent requests kept per endpoint
+
+
+class RequestError(ValueError):
+    """Invalid request (answered with 400)."""
+
+
+# ------------------------------------------------------------------ #
+#  Payload Parsing
+# ------------------------------------------------------------------ #
+
+def task_rows(payload: Dict[str, Any]) -> List[Tuple[str, str, float, List[str]]]:
+    """
+    (task_id, task_name, duration, [predecessor, ...]) rows from a request.
+
+    Raises:
+        RequestError: Missing/invalid tasks, duplicate IDs or non-positive durations
+                      (see engine.graph.validate_records)
+    """
+    if "csv" in payload:
+        if not isinstance(payload["csv"], str):
+            raise RequestError("'csv' must be CSV text (a string).")
+        records = list(csv.DictReader(io.StringIO(payload["csv"])))
+    else:
+        records = payload.get("tasks")
+    if not isinstance(records, list) or not records:
+        raise RequestError("Request needs 'tasks' (list of task objects) or 'csv' (CSV text).")
+
+    rows = []
+    for i, t in enumerate(records, start=1):
+        if not isinstance(t, dict):
+            raise RequestError(f"Task {i}: expected an object with 'task_id' and 'duration'.")
+        preds = t.get("predecessors") or []
+        if isinstance(preds, str):
+            preds = preds.split()
+        name = str(t.get("task_name") or t.get("task_id") or "").strip()
+        rows.append((t.get("task_id"), name, t.get("duration"), [str(p).strip() for p in preds]))
+    try:
+        return validate_records(rows)
+    except ValueError as e:
+        raise RequestError(str(e)) from None
+
+
+def solve_params(payload: Dict[str, Any]) -> Tuple[float, str]:
+    """(cycle_time, algorithm) from a request."""
+    try:
+        cycle_time = float(payload["cycle_time"])
+    except (KeyError, TypeError, ValueError):
+        raise RequestError("Request needs a numeric 'cycle_time'.") from None
+    if cycle_time <= 0:
+        raise RequestError("'cycle_time' must be positive.")
+    algorithm = payload.get("algorithm", "rpw")
+    if algorithm not in ALGORITHMS:
+        raise RequestError(f"Unknown algorithm '{algorithm}'. Expected one of: {', '.join(ALGORITHMS)}")
+    return cycle_time, algorithm
+
+
+# ------------------------------------------------------------------ #
+#  Worker Pool & Coalescing
+# ------------------------------------------------------------------ #
+
+def _solve_rows(rows, cycle_time: float, algorithm: str, db_path: Optional[str]):
+    """Runs in a worker process: build the graph and solve through the solver cache."""
+    from data.database import DB_PATH
+    from data.solver_cache import solve_cached
+
+    graph = PrecedenceGraph()
+    graph.load_from_records(rows)
+    stations, metrics = solve_cached(graph, cycle_time, algorithm, db_path=db_path or DB_PATH)
+    return stations, metrics
+
+
+class SolvePool:
+    """
+    Process pool for solves. Identical in-flight requests (same task rows,
+    cycle time and algorithm) are coalesced onto one future.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, db_path: Optional[str] = None):
+        # spawn: workers open their own SQLite connections instead of inheriting ours
+        self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self.db_path = db_path
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.coalesced = 0
+
+    def solve(self, rows, cycle_time: float, algorithm: str) -> Future:
+        key = parts_hash([task_rows_hash(rows), cycle_time, algorithm])
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return fut
+            fut = self._pool.submit(_solve_rows, rows, cycle_time, algorithm, self.db_path)
+            self._inflight[key] = fut
+            self.submitted += 1
+        fut.add_done_callback(lambda _f: self._forget(key))
+        return fut
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"submitted": self.submitted, "coalesced": self.coalesced, "inflight": len(self._inflight)}
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ------------------------------------------------------------------ #
+#  Latency Metrics
+# ------------------------------------------------------------------ #
+
+class LatencyStats:
+    """Request counts, errors and latency percentiles per endpoint (recent window)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, List[int]] = {}  # endpoint -> [requests, errors]
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            counts = self._counts.setdefault(endpoint, [0, 0])
+            counts[0] += 1
+            counts[1] += not ok
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            out = {}
+            for endpoint, samples in self._samples.items():
+                ms = sorted(s * 1000 for s in samples)
+                out[endpoint] = {
+                    "requests": self._counts[endpoint][0],
+                    "errors": self._counts[endpoint][1],
+                    "mean_ms": round(sum(ms) / len(ms), 3),
+                    "p50_ms": round(_percentile(ms, 50), 3),
+                    "p95_ms": round(_percentile(ms, 95), 3),
+                    "p99_ms": round(_percentile(ms, 99), 3),
+                    "max_ms": round(ms[-1], 3),
+                }
+            return out
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+# ------------------------------------------------------------------ #
+#  Endpoints
+# ------------------------------------------------------------------ #
+
+class SolveService:
+    """Endpoint logic, independent of the HTTP layer."""
+
+    def __init__(self, pool: SolvePool, timeout: float = SOLVE_TIMEOUT):
+        self.pool = pool
+        self.timeout = timeout
+        self.latency = LatencyStats()
+
+    def _solve(self, payload: Dict[str, Any]):
+        rows = task_rows(payload)
+        cycle_time, algorithm = solve_params(payload)
+        stations, metrics = self.pool.solve(rows, cycle_time, algorithm).result(timeout=self.timeout)
+        return cycle_time, algorithm, stations, metrics
+
+    def solve(self, payload):
+        cycle_time, algorithm, stations, metrics = self._solve(payload)
+        return {"cycle_time": cycle_time, "algorithm": algorithm, "stations": stations, "metrics": metrics}
+
+    def metrics(self, payload):
+        cycle_time, algorithm, stations, metrics = self._solve(payload)
+        return {
+            "cycle_time": cycle_time, "algorithm": algorithm,
+            "metrics": metrics, "assignment": stations_to_assignment(stations),
+        }
+
+    def energy(self, payload):
+        try:
+            kwargs = {arg: float(payload[k]) for k, arg in ENERGY_PARAMS.items() if k in payload}
+        except (TypeError, ValueError):
+            raise RequestError("Energy parameters must be numeric.") from None
+        cycle_time, algorithm, stations, _ = self._solve(payload)
+        report = calculate_energy_waste(stations, cycle_time, **kwargs)
+        return {"cycle_time": cycle_time, "algorithm": algorithm, "energy": report.to_dict()}
+
+    def jes(self, payload):
+        fmt = payload.get("format", "json")
+        if fmt not in JES_FORMATS:
+            raise RequestError(f"Unknown format '{fmt}'. Expected one of: {', '.join(JES_FORMATS)}")
+        station_id = payload.get("station_id")
+        if station_id is not None:
+            try:
+                station_id = int(station_id)
+            except (TypeError, ValueError):
+                raise RequestError("'station_id' must be an integer.") from None
+        cycle_time, algorithm, stations, _ = self._solve(payload)
+        line_name = payload.get("line_name", "Main Assembly Line")
+        if station_id is not None:
+            match = [s for s in stations if s["station_id"] == station_id]
+            if not match:
+                raise RequestError(f"No station {station_id} (line has {len(stations)} stations).")
+            docs = [generate_station_jes(match[0], cycle_time, line_name)]
+        else:
+            docs = list(generate_jes(stations, cycle_time, line_name).values())
+        if fmt == "markdown":
+            docs = [{"station_id": d["station_id"], "markdown": format_jes_markdown(d)} for d in docs]
+        return {"cycle_time": cycle_time, "algorithm": algorithm, "jes": docs}
+
+    def stats(self, _payload=None):
+        from data.solver_cache import cache_stats
+
+        out = {"latency": self.latency.snapshot(), "pool": self.pool.stats()}
+        try:
+            out["solver_cache"] = cache_stats(self.pool.db_path) if self.pool.db_path else cache_stats()
+        except Exception as e:  # stats must not fail because the database is busy
+            out["solver_cache"] = {"error": str(e)}
+        return out
+
+
+POST_ROUTES = {"/solve": "solve", "/metrics": "metrics", "/energy": "energy", "/jes": "jes"}
+GET_ROUTES = {"/health": None, "/stats": "stats"}
+
+
+class Handler(BaseHTTPRequestHandler):
+    service: SolveService = None  # set by make_server
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self._respond(path, 200, {"status": "ok"}, time.perf_counter())
+        elif path in GET_ROUTES:
+            self._handle(path, getattr(self.service, GET_ROUTES[path]), None)
+        else:
+            self._respond(path, 404, {"error": f"Unknown endpoint: {path}"}, time.perf_counter())
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        started = time.perf_counter()
+        if path not in POST_ROUTES:
+            self._respond(path, 404, {"error": f"Unknown endpoint: {path}"}, started)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self._respond(path, 413, {"error": "Request body too large."}, started)
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            self._respond(path, 400, {"error": f"Invalid JSON body: {e}"}, started)
+            return
+        self._handle(path, getattr(self.service, POST_ROUTES[path]), payload, started)
+
+    def _handle(self, path, fn, payload, started=None):
+        started = started or time.perf_counter()
+        try:
+            status, body = 200, fn(payload)
+        except ValueError as e:  # RequestError, invalid graph (cycle) or infeasible cycle time
+            status, body = 400, {"error": str(e)}
+        except FutureTimeoutError:  # only an alias of the builtin TimeoutError from Python 3.11
+            status, body = 504, {"error": "Solve timed out."}
+        except Exception as e:
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+        self._respond(path, status, body, started)
+
+    def _respond(self, path, status, body, started):
+        data = json.dumps(body).encode()
+        elapsed = time.perf_counter() - started
+        if path in POST_ROUTES or path in GET_ROUTES:
+            self.service.latency.record(path, elapsed, status < 400)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Response-Time-Ms", f"{elapsed * 1000:.3f}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):  # keep stdout quiet; /stats has the numbers
+        pass
+
+
+def make_server(host: str = HOST, port: int = PORT, workers: Optional[int] = WORKERS,
+                db_path: Optional[str] = None) -> ThreadingHTTPServer:
+    """HTTP server bound to host:port (port 0 = any free port); call serve_forever()."""
+    from data.database import init_db
+
+    if db_path:
+        init_db(db_path)
+    else:
+        init_db()
+    service = SolveService(SolvePool(workers, db_path))
+    handler = type("BoundHandler", (Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manufacture Balance 4.0 HTTP solve service.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Solver processes (default: CPU count)")
+    parser.add_argument("--db", default=None, help="Database for the solver cache (default: the dashboard's)")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers, args.db)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} ({args.workers or os.cpu_count()} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.pool.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,11 +9,6 @@ import streamlit as st
 from data.database import init_db
 
 from ui.styles import C, apply_styles
-from ui.tabs.input_tab import render_input_tab
-from ui.tabs.results_tab import render_results_tab
-from ui.tabs.operator_tab import render_operator_tab
-from ui.tabs.sustainability_tab import render_sustainability_tab
-from ui.tabs.compare_tab import render_compare_tab
 
 # ── Page Config ───────────────────────────────────────────────────── #
 st.set_page_config(
@@ -66,24 +61,36 @@ with st.sidebar:
     co2_factor = st.number_input("CO₂ Factor (kg/kWh)", 0.01, 2.0, 0.47, 0.01)
 
 # ── Tabs ──────────────────────────────────────────────────────────── #
+# Only the open tab runs (switching tabs reruns the script); each tab module
+# and its heavy dependencies (plotly, pandas, openpyxl) load on first use.
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📥 Data Input", "📊 Results", "👷 Operator JES", "🌿 Sustainability", "⚖️ Compare"
-])
+], key="main_tab", on_change="rerun")
 
 with tab1:
-    render_input_tab()
+    if tab1.open:
+        from ui.tabs.input_tab import render_input_tab
+        render_input_tab()
 
 with tab2:
-    render_results_tab(algorithm, cycle_time, kwh_per_sec, cost_per_kwh, co2_factor)
+    if tab2.open:
+        from ui.tabs.results_tab import render_results_tab
+        render_results_tab(algorithm, cycle_time, kwh_per_sec, cost_per_kwh, co2_factor)
 
 with tab3:
-    render_operator_tab(cycle_time)
+    if tab3.open:
+        from ui.tabs.operator_tab import render_operator_tab
+        render_operator_tab(cycle_time)
 
 with tab4:
-    render_sustainability_tab()
+    if tab4.open:
+        from ui.tabs.sustainability_tab import render_sustainability_tab
+        render_sustainability_tab(cycle_time, kwh_per_sec, cost_per_kwh, co2_factor)
 
 with tab5:
-    render_compare_tab()
+    if tab5.open:
+        from ui.tabs.compare_tab import render_compare_tab
+        render_compare_tab()
 
 # ── Footer ────────────────────────────────────────────────────────── #
 st.markdown('<div class="ft">MANUFACTURE BALANCE 4.0 &nbsp;·&nbsp; Sustainable Lean Manufacturing</div>', unsafe_allow_html=True)
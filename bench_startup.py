@@ -0,0 +1,104 @@
+"""
+bench_startup.py — Startup & Rerun Benchmark
+
+Measures the cold import time of the engine, data layer and each dashboard
+tab (every import runs in a fresh interpreter), reports which heavy
+dependencies each one pulls in, and times dashboard reruns per tab with
+Streamlit's AppTest.
+
+Run: python bench_startup.py [--repeat 5] [--reruns 10] [--no-app]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+HEAVY = ("pandas", "numpy", "plotly", "openpyxl", "pyarrow", "streamlit")
+
+IMPORTS = {
+    "engine": "import engine",
+    "engine (all modules)": "import engine, engine.cache, engine.jobs, engine.store, engine.jes_export",
+    "data": "import data; data.init_db",
+    "data.solver_cache": "import data.solver_cache",
+    "data.parser": "import data.parser",
+    "ui.tabs.input_tab": "import ui.tabs.input_tab",
+    "ui.tabs.results_tab": "import ui.tabs.results_tab",
+    "ui.tabs.operator_tab": "import ui.tabs.operator_tab",
+    "ui.tabs.sustainability_tab": "import ui.tabs.sustainability_tab",
+    "ui.tabs.compare_tab": "import ui.tabs.compare_tab",
+}
+
+TABS = ["📥 Data Input", "📊 Results", "👷 Operator JES", "🌿 Sustainability", "⚖️ Compare"]
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def cold_import(stmt, repeat):
+    """Median seconds to run stmt in a fresh interpreter, and the heavy modules it loaded."""
+    times, heavy = [], []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(stmt=stmt, heavy=HEAVY)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(res["seconds"])
+        heavy = res["heavy"]
+    return statistics.median(times), heavy
+
+
+def bench_imports(repeat):
+    print(f"Cold imports (median of {repeat}, fresh interpreter each)")
+    for name, stmt in IMPORTS.items():
+        seconds, heavy = cold_import(stmt, repeat)
+        print(f"  {name:<28} {seconds * 1000:8.1f} ms   loads: {', '.join(heavy) or '-'}")
+
+
+def bench_app(reruns):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    t = time.perf_counter()
+    at.run()
+    print(f"\nApp first run (cold): {(time.perf_counter() - t) * 1000:.1f} ms")
+
+    print(f"Reruns per open tab (median of {reruns})")
+    for tab in TABS:
+        at.session_state["main_tab"] = tab
+        at.run()  # warm-up: first visit imports the tab module
+        times = []
+        for _ in range(reruns):
+            t = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - t)
+        errors = [e.value for e in at.exception]
+        note = f"   errors: {errors}" if errors else ""
+        print(f"  {tab:<20} {statistics.median(times) * 1000:8.1f} ms{note}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark cold start and per-rerun overhead.")
+    ap.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per import (default 5)")
+    ap.add_argument("--reruns", type=int, default=10, help="Timed reruns per tab (default 10)")
+    ap.add_argument("--no-app", action="store_true", help="Only measure imports")
+    args = ap.parse_args()
+
+    sys.path.insert(0, ROOT)
+    bench_imports(args.repeat)
+    if not args.no_app:
+        bench_app(args.reruns)
+
+
+if __name__ == "__main__":
+    main()
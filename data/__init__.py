@@ -1,16 +1,67 @@
 """
 data — Data layer modules
+
+Names are imported from their submodule on first access, so importing
+the package (e.g. for init_db) doesn't load pandas via the parser.
 """
 
+import importlib
+
 __all__ = [
     "init_db",
     "save_scenario",
+    "save_scenarios",
     "load_scenario",
     "list_scenarios",
+    "list_scenarios_page",
     "delete_scenario",
+    "load_scenario_metrics",
+    "load_station_loads",
+    "load_scenario_lazy",
+    "connection",
+    "transaction",
+    "close_pools",
+    "scenarios_with_task_at_station",
+    "station_load_summary",
+    "compare_scenarios",
+    "solve_cached",
+    "cache_stats",
+    "clear_cache",
+    "save_scenario_async",
+    "save_scenarios_async",
+    "load_scenario_async",
+    "list_scenarios_async",
+    "delete_scenario_async",
     "parse_csv",
+    "load_tasks_csv",
     "validate_tasks",
 ]
 
-from .database import init_db, save_scenario, load_scenario, list_scenarios, delete_scenario
-from .parser import parse_csv, validate_tasks
+_MODULES = {
+    "database": [
+        "init_db", "save_scenario", "save_scenarios", "load_scenario", "list_scenarios",
+        "list_scenarios_page", "delete_scenario", "load_scenario_metrics", "load_station_loads",
+        "load_scenario_lazy", "connection", "transaction", "close_pools",
+        "scenarios_with_task_at_station", "station_load_summary", "compare_scenarios",
+    ],
+    "aio": [
+        "save_scenario_async", "save_scenarios_async", "load_scenario_async",
+        "list_scenarios_async", "delete_scenario_async",
+    ],
+    "solver_cache": ["solve_cached", "cache_stats", "clear_cache"],
+    "parser": ["parse_csv", "load_tasks_csv", "validate_tasks"],
+}
+_LAZY = {name: module for module, names in _MODULES.items() for name in names}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,85 @@
+"""
+aio.py — Asynchronous Data Layer
+asyncio counterparts of the scenario CRUD functions in database.py.
+
+Each call runs the synchronous function on a dedicated thread pool sized
+to the connection pool (POOL_SIZE), so the event loop never blocks on
+SQLite and independent loads and saves overlap.
+
+Usage:
+    ids = await asyncio.gather(*(save_scenario_async(**sc) for sc in batch))
+    scenario = await load_scenario_async(ids[0])
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from . import database
+from .database import DB_PATH, POOL_SIZE
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """The data-layer thread pool (created on first use)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="alb-db")
+        return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Stop the thread pool (tests, shutdown). A new one starts on next use."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def _run(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def save_scenario_async(
+    name: str,
+    cycle_time: float,
+    algorithm: str,
+    tasks_data: List[Dict],
+    metrics: Dict[str, Any],
+    stations: List[Dict],
+    energy_report: Optional[Dict] = None,
+    db_path: str = DB_PATH,
+    cache_json: bool = False,
+) -> int:
+    """Async save_scenario()."""
+    return await _run(
+        database.save_scenario, name, cycle_time, algorithm, tasks_data,
+        metrics, stations, energy_report, db_path=db_path, cache_json=cache_json,
+    )
+
+
+async def save_scenarios_async(scenarios: List[Dict[str, Any]], db_path: str = DB_PATH) -> List[int]:
+    """Async save_scenarios() (one transaction for the whole list)."""
+    return await _run(database.save_scenarios, scenarios, db_path=db_path)
+
+
+async def load_scenario_async(scenario_id: int, db_path: str = DB_PATH) -> Optional[Dict]:
+    """Async load_scenario()."""
+    return await _run(database.load_scenario, scenario_id, db_path=db_path)
+
+
+async def list_scenarios_async(db_path: str = DB_PATH) -> List[Dict]:
+    """Async list_scenarios()."""
+    return await _run(database.list_scenarios, db_path=db_path)
+
+
+async def delete_scenario_async(scenario_id: int, db_path: str = DB_PATH) -> bool:
+    """Async delete_scenario()."""
+    return await _run(database.delete_scenario, scenario_id, db_path=db_path)
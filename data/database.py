@@ -1,67 +1,470 @@
 """
 database.py — SQLite Database Layer
 Persists scenario, task, and result data.
+
+Task graphs are content-addressed: identical task lists are stored once
+in task_graphs/graph_tasks and shared by reference-counted scenarios.
+
+Connections are pooled per database file and reused across calls and
+threads; the schema is created once per process. Each pooled connection
+keeps SQLite's prepared-statement cache warm for the module-level SQL.
+
+Writes wait up to BUSY_TIMEOUT for the database lock and are retried with
+backoff if it stays locked. With ALB_DB_WRITE_QUEUE=1 all saves go through
+one background writer per database that groups concurrent saves into
+shared transactions.
 """
 
 import sqlite3
 import json
 import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+from engine.hashing import task_rows_hash
+
+# ALB_DB_PATH lets several processes/containers share one database; mount its
+# whole directory, since WAL mode keeps -wal/-shm files next to it
+DB_PATH = os.environ.get("ALB_DB_PATH") or os.path.join(os.path.dirname(os.path.dirname(__file__)), "alb_data.db")
+POOL_SIZE = 8
+
+# Concurrent writers: seconds to wait on a locked database, then retries
+BUSY_TIMEOUT = float(os.environ.get("ALB_DB_BUSY_TIMEOUT", "5"))
+WRITE_RETRIES = 5
+RETRY_BACKOFF = 0.05  # seconds, doubled per attempt (+ jitter)
+WRITE_QUEUE = os.environ.get("ALB_DB_WRITE_QUEUE", "") == "1"
+WRITE_BATCH = 64  # max saves grouped into one queued transaction
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS scenarios (
+        id          INTEGER PRIMARY KEY AUTOINCREMENT,
+        name        TEXT NOT NULL,
+        cycle_time  REAL NOT NULL,
+        algorithm   TEXT NOT NULL DEFAULT 'rpw',
+        created_at  TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS tasks (
+        id              INTEGER PRIMARY KEY AUTOINCREMENT,
+        scenario_id     INTEGER NOT NULL,
+        task_id         TEXT NOT NULL,
+        task_name       TEXT NOT NULL,
+        duration        REAL NOT NULL,
+        predecessors    TEXT DEFAULT '',
+        FOREIGN KEY (scenario_id) REFERENCES scenarios(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS results (
+        id                      INTEGER PRIMARY KEY AUTOINCREMENT,
+        scenario_id             INTEGER NOT NULL UNIQUE,
+        num_stations            INTEGER,
+        line_efficiency         REAL,
+        balance_delay           REAL,
+        smoothness_index        REAL,
+        theoretical_min         INTEGER,
+        total_energy_kwh        REAL DEFAULT 0,
+        total_co2_kg            REAL DEFAULT 0,
+        total_cost              REAL DEFAULT 0,
+        stations_json           TEXT,
+        created_at              TEXT NOT NULL,
+        FOREIGN KEY (scenario_id) REFERENCES scenarios(id) ON DELETE CASCADE
+    );
+"""
+
+
+def _migrate_station_tables(conn: sqlite3.Connection) -> None:
+    """Normalized station storage; backfilled from existing stations_json blobs."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS station_assignments (
+            scenario_id INTEGER NOT NULL,
+            station_id  INTEGER NOT NULL,
+            position    INTEGER NOT NULL,
+            task_id     TEXT NOT NULL,
+            PRIMARY KEY (scenario_id, station_id, position),
+            FOREIGN KEY (scenario_id) REFERENCES scenarios(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS station_loads (
+            scenario_id INTEGER NOT NULL,
+            station_id  INTEGER NOT NULL,
+            total_time  REAL NOT NULL,
+            idle_time   REAL NOT NULL,
+            task_count  INTEGER NOT NULL,
+            PRIMARY KEY (scenario_id, station_id),
+            FOREIGN KEY (scenario_id) REFERENCES scenarios(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assign_task ON station_assignments(task_id, station_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_loads_station ON station_loads(station_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_scenario_task ON tasks(scenario_id, task_id)")
+
+    for scenario_id, blob in conn.execute(
+        "SELECT scenario_id, stations_json FROM results WHERE stations_json IS NOT NULL"
+    ).fetchall():
+        _insert_station_rows(conn, scenario_id, json.loads(blob))
+
+
+def _migrate_task_graphs(conn: sqlite3.Connection) -> None:
+    """Content-addressed task graphs shared by scenarios; replaces per-scenario tasks rows."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS task_graphs (
+            hash        TEXT PRIMARY KEY,
+            task_count  INTEGER NOT NULL,
+            refcount    INTEGER NOT NULL DEFAULT 0,
+            created_at  TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS graph_tasks (
+            graph_hash      TEXT NOT NULL,
+            position        INTEGER NOT NULL,
+            task_id         TEXT NOT NULL,
+            task_name       TEXT NOT NULL,
+            duration        REAL NOT NULL,
+            predecessors    TEXT DEFAULT '',
+            PRIMARY KEY (graph_hash, position),
+            FOREIGN KEY (graph_hash) REFERENCES task_graphs(hash) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_graph_tasks_task ON graph_tasks(graph_hash, task_id)")
+    conn.execute("ALTER TABLE scenarios ADD COLUMN graph_hash TEXT REFERENCES task_graphs(hash)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scenarios_graph ON scenarios(graph_hash)")
+
+    scenario_ids = [r[0] for r in conn.execute("SELECT id FROM scenarios")]
+    for scenario_id in scenario_ids:
+        rows = conn.execute(
+            "SELECT task_id, task_name, duration, predecessors FROM tasks WHERE scenario_id = ? ORDER BY id",
+            (scenario_id,),
+        ).fetchall()
+        graph = _store_graph(conn, [dict(r) for r in rows], datetime.now().isoformat())
+        conn.execute("UPDATE scenarios SET graph_hash = ? WHERE id = ?", (graph, scenario_id))
+
+    conn.execute("DROP TABLE tasks")
+
 
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "alb_data.db")
+# Schema migrations, applied in order on top of SCHEMA. Each step is an
+# SQL script or a callable(conn); PRAGMA user_version records how many
+# have run.
+MIGRATIONS = [
+    # 1: indexes for listing, keyset pagination and per-scenario task lookups
+    """
+    CREATE INDEX IF NOT EXISTS idx_scenarios_created ON scenarios(created_at, id);
+    CREATE INDEX IF NOT EXISTS idx_scenarios_algorithm ON scenarios(algorithm, created_at, id);
+    CREATE INDEX IF NOT EXISTS idx_tasks_scenario ON tasks(scenario_id);
+    """,
+    # 2: station_assignments / station_loads (stations_json becomes an optional cache)
+    _migrate_station_tables,
+    # 3: task graphs stored once per content hash, referenced by scenarios
+    _migrate_task_graphs,
+    # 4: persistent solver result cache (see data.solver_cache)
+    """
+    CREATE TABLE IF NOT EXISTS solver_cache (
+        key         TEXT PRIMARY KEY,
+        graph_hash  TEXT NOT NULL,
+        cycle_time  REAL NOT NULL,
+        algorithm   TEXT NOT NULL,
+        params      TEXT NOT NULL DEFAULT '{}',
+        assignment  TEXT NOT NULL,
+        metrics     TEXT NOT NULL,
+        size_bytes  INTEGER NOT NULL,
+        hits        INTEGER NOT NULL DEFAULT 0,
+        created_at  TEXT NOT NULL,
+        last_used   REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_solver_cache_lru ON solver_cache(last_used);
+    CREATE TABLE IF NOT EXISTS solver_cache_stats (
+        name    TEXT PRIMARY KEY,
+        value   INTEGER NOT NULL DEFAULT 0
+    );
+    INSERT OR IGNORE INTO solver_cache_stats (name, value) VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+    """,
+]
+
+# Statements are kept as constants so each pooled connection's
+# statement cache reuses the prepared form.
+SQL_INSERT_SCENARIO = (
+    "INSERT INTO scenarios (name, cycle_time, algorithm, created_at, graph_hash) VALUES (?, ?, ?, ?, ?)"
+)
+SQL_INSERT_GRAPH = (
+    "INSERT OR IGNORE INTO task_graphs (hash, task_count, refcount, created_at) VALUES (?, ?, 0, ?)"
+)
+SQL_INSERT_GRAPH_TASK = (
+    "INSERT INTO graph_tasks (graph_hash, position, task_id, task_name, duration, predecessors) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+SQL_GRAPH_ADDREF = "UPDATE task_graphs SET refcount = refcount + 1 WHERE hash = ?"
+SQL_GRAPH_RELEASE = "UPDATE task_graphs SET refcount = refcount - 1 WHERE hash = ?"
+SQL_GRAPH_COLLECT = "DELETE FROM task_graphs WHERE hash = ? AND refcount <= 0"
+SQL_INSERT_RESULT = (
+    "INSERT INTO results "
+    "(scenario_id, num_stations, line_efficiency, balance_delay, "
+    "smoothness_index, theoretical_min, total_energy_kwh, total_co2_kg, "
+    "total_cost, stations_json, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+SQL_LIST_SCENARIOS = (
+    "SELECT s.*, r.line_efficiency, r.num_stations "
+    "FROM scenarios s LEFT JOIN results r ON s.id = r.scenario_id "
+    "ORDER BY s.created_at DESC, s.id DESC"
+)
+SQL_INSERT_ASSIGNMENT = (
+    "INSERT INTO station_assignments (scenario_id, station_id, position, task_id) VALUES (?, ?, ?, ?)"
+)
+SQL_INSERT_LOAD = (
+    "INSERT INTO station_loads (scenario_id, station_id, total_time, idle_time, task_count) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+SQL_GET_STATIONS = (
+    "SELECT a.station_id, a.task_id, t.task_name, t.duration "
+    "FROM station_assignments a "
+    "JOIN scenarios s ON s.id = a.scenario_id "
+    "LEFT JOIN graph_tasks t ON t.graph_hash = s.graph_hash AND t.task_id = a.task_id "
+    "WHERE a.scenario_id = ? ORDER BY a.station_id, a.position"
+)
+SQL_GET_LOADS = "SELECT * FROM station_loads WHERE scenario_id = ? ORDER BY station_id"
+SQL_GET_SCENARIO = "SELECT * FROM scenarios WHERE id = ?"
+SQL_GET_TASKS = (
+    "SELECT task_id, task_name, duration, predecessors FROM graph_tasks "
+    "WHERE graph_hash = ? ORDER BY position"
+)
+SQL_GET_RESULT = "SELECT * FROM results WHERE scenario_id = ?"
+SQL_DELETE_SCENARIO = "DELETE FROM scenarios WHERE id = ?"
+SQL_GET_SCENARIO_GRAPH = "SELECT graph_hash FROM scenarios WHERE id = ?"
+
+# Headline columns: scenario fields + scalar result metrics (no JSON blobs)
+METRIC_COLUMNS = (
+    "num_stations", "line_efficiency", "balance_delay", "smoothness_index",
+    "theoretical_min", "total_energy_kwh", "total_co2_kg", "total_cost",
+)
+SQL_GET_METRICS = (
+    "SELECT s.id, s.name, s.cycle_time, s.algorithm, s.created_at, s.graph_hash, "
+    + ", ".join(f"r.{c}" for c in METRIC_COLUMNS)
+    + " FROM scenarios s LEFT JOIN results r ON r.scenario_id = s.id WHERE s.id = ?"
+)
+SQL_GET_LOAD_ROWS = (
+    "SELECT station_id, total_time, idle_time, task_count FROM station_loads "
+    "WHERE scenario_id = ? ORDER BY station_id"
+)
+SQL_GET_STATIONS_JSON = "SELECT stations_json FROM results WHERE scenario_id = ?"
+
+# Metrics compared across scenarios: column -> rank direction (best first)
+COMPARE_METRICS = {
+    "line_efficiency": "DESC",
+    "num_stations": "ASC",
+    "balance_delay": "ASC",
+    "smoothness_index": "ASC",
+    "total_energy_kwh": "ASC",
+    "total_cost": "ASC",
+    "total_co2_kg": "ASC",
+}
+# Params: JSON array of scenario ids, baseline id. Loads are aggregated per
+# scenario in station order; deltas are against the baseline row.
+SQL_COMPARE = (
+    "WITH sel AS (SELECT CAST(value AS INTEGER) AS id, MIN(key) AS ord FROM json_each(?) GROUP BY value), "
+    "m AS ("
+    "  SELECT s.id, sel.ord, s.name, s.cycle_time, s.algorithm, "
+    + ", ".join(f"r.{c}" for c in COMPARE_METRICS)
+    + "  FROM sel JOIN scenarios s ON s.id = sel.id JOIN results r ON r.scenario_id = s.id"
+    "), "
+    "l AS ("
+    "  SELECT scenario_id, "
+    "    MIN(total_time) AS min_load, MAX(total_time) AS max_load, AVG(total_time) AS avg_load, "
+    "    SUM(idle_time) AS total_idle "
+    "  FROM station_loads WHERE scenario_id IN (SELECT id FROM sel) "
+    "  GROUP BY scenario_id"
+    "), "
+    "b AS (SELECT * FROM m WHERE id = ?) "
+    "SELECT m.*, l.min_load, l.max_load, l.avg_load, l.total_idle, "
+    + ", ".join(f"m.{c} - b.{c} AS delta_{c}" for c in COMPARE_METRICS) + ", "
+    + ", ".join(f"RANK() OVER (ORDER BY m.{c} {d}) AS rank_{c}" for c, d in COMPARE_METRICS.items())
+    + " FROM m LEFT JOIN l ON l.scenario_id = m.id LEFT JOIN b ON 1 ORDER BY m.ord"
+)
+# Load lists are assembled in Python: json_group_array() has no guaranteed
+# order before SQLite 3.44 (aggregate ORDER BY), whatever the subquery sorts by
+SQL_COMPARE_LOADS = (
+    "SELECT scenario_id, total_time FROM station_loads "
+    "WHERE scenario_id IN (SELECT CAST(value AS INTEGER) FROM json_each(?)) "
+    "ORDER BY scenario_id, station_id"
+)
 
 
 def get_connection(db_path: str = DB_PATH) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
+    """Open a new standalone connection (caller closes it). Prefer connection()/transaction()."""
+    uri = db_path.startswith("file:")
+    parent = os.path.dirname(db_path)
+    if parent and db_path != ":memory:" and not uri:
+        os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(
+        db_path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+        isolation_level=None, cached_statements=256, uri=uri,
+    )
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
 
+class ConnectionPool:
+    """
+    Thread-safe pool of connections to one SQLite file.
+
+    Connections are created lazily up to max_size, run in autocommit mode
+    (transactions are explicit, see transaction()) and are handed to one
+    thread at a time. ":memory:" is one shared in-memory database per pool,
+    kept alive by the pooled connections.
+    """
+
+    def __init__(self, db_path: str, max_size: int = POOL_SIZE):
+        if db_path == ":memory:":  # plain ":memory:" opens a new empty database per connection
+            db_path = f"file:alb-memory-{id(self)}?mode=memory&cache=shared"
+        self.db_path = db_path
+        self.max_size = max_size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.max_size:
+                self._created += 1
+                return get_connection(self.db_path)
+        return self._idle.get()
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._created = 0
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = DB_PATH) -> ConnectionPool:
+    """Pool for db_path; the schema is created the first time a path is used."""
+    key = os.path.abspath(db_path)
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            with pool.connection() as conn:
+                if conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+                    conn.executescript(SCHEMA)
+                migrate(conn)
+            _pools[key] = pool
+    return pool
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending MIGRATIONS; returns the resulting schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for i, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute("BEGIN")
+        try:
+            if callable(step):
+                step(conn)
+            else:
+                for stmt in step.split(";"):
+                    if stmt.strip():
+                        conn.execute(stmt)
+            conn.execute(f"PRAGMA user_version = {i}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    return max(version, len(MIGRATIONS))
+
+
+def close_pools() -> None:
+    """Stop the write queues and close every pooled connection (tests, shutdown)."""
+    close_write_queues()
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+@contextmanager
+def connection(db_path: str = DB_PATH) -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection for reads."""
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+
+@contextmanager
+def transaction(db_path: str = DB_PATH) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a pooled connection inside BEGIN IMMEDIATE … COMMIT (ROLLBACK on error).
+
+    IMMEDIATE takes the write lock up front, so a busy database is waited
+    on (BUSY_TIMEOUT) instead of failing when a read upgrades to a write.
+    """
+    with get_pool(db_path).connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
 def init_db(db_path: str = DB_PATH) -> None:
-    """Create tables if they don't exist."""
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
-
-    cursor.executescript("""
-        CREATE TABLE IF NOT EXISTS scenarios (
-            id          INTEGER PRIMARY KEY AUTOINCREMENT,
-            name        TEXT NOT NULL,
-            cycle_time  REAL NOT NULL,
-            algorithm   TEXT NOT NULL DEFAULT 'rpw',
-            created_at  TEXT NOT NULL
-        );
+    """Create tables if they don't exist (once per database file per process)."""
+    get_pool(db_path)
 
-        CREATE TABLE IF NOT EXISTS tasks (
-            id              INTEGER PRIMARY KEY AUTOINCREMENT,
-            scenario_id     INTEGER NOT NULL,
-            task_id         TEXT NOT NULL,
-            task_name       TEXT NOT NULL,
-            duration        REAL NOT NULL,
-            predecessors    TEXT DEFAULT '',
-            FOREIGN KEY (scenario_id) REFERENCES scenarios(id) ON DELETE CASCADE
-        );
-
-        CREATE TABLE IF NOT EXISTS results (
-            id                      INTEGER PRIMARY KEY AUTOINCREMENT,
-            scenario_id             INTEGER NOT NULL UNIQUE,
-            num_stations            INTEGER,
-            line_efficiency         REAL,
-            balance_delay           REAL,
-            smoothness_index        REAL,
-            theoretical_min         INTEGER,
-            total_energy_kwh        REAL DEFAULT 0,
-            total_co2_kg            REAL DEFAULT 0,
-            total_cost              REAL DEFAULT 0,
-            stations_json           TEXT,
-            created_at              TEXT NOT NULL,
-            FOREIGN KEY (scenario_id) REFERENCES scenarios(id) ON DELETE CASCADE
-        );
-    """)
-    conn.commit()
-    conn.close()
+
+def is_locked_error(exc: BaseException) -> bool:
+    """True for SQLite's transient 'database is locked' / 'busy' errors."""
+    msg = str(exc).lower()
+    return isinstance(exc, sqlite3.OperationalError) and ("locked" in msg or "busy" in msg)
+
+
+def retry_locked(fn, *args, retries: Optional[int] = None, **kwargs):
+    """
+    Call fn(*args, **kwargs), retrying with exponential backoff while the
+    database is locked. fn must be safe to repeat (e.g. one transaction).
+    """
+    retries = WRITE_RETRIES if retries is None else retries
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if attempt == retries or not is_locked_error(e):
+                raise
+            time.sleep(RETRY_BACKOFF * (2 ** attempt) * (1 + random.random()))
 
 
 # ------------------------------------------------------------------ #
@@ -77,106 +480,512 @@ def save_scenario(
     stations: List[Dict],
     energy_report: Optional[Dict] = None,
     db_path: str = DB_PATH,
+    cache_json: bool = False,
 ) -> int:
-    """Save a complete scenario: scenario + tasks + results."""
-    conn = get_connection(db_path)
-    cursor = conn.cursor()
+    """
+    Save a complete scenario: scenario + tasks + results + station rows.
+
+    cache_json additionally stores the full station list in
+    results.stations_json (not needed by load_scenario).
+    """
+    return save_scenarios([{
+        "name": name,
+        "cycle_time": cycle_time,
+        "algorithm": algorithm,
+        "tasks_data": tasks_data,
+        "metrics": metrics,
+        "stations": stations,
+        "energy_report": energy_report,
+        "cache_json": cache_json,
+    }], db_path=db_path)[0]
+
+
+def save_scenarios(
+    scenarios: List[Dict[str, Any]],
+    db_path: str = DB_PATH,
+    queued: Optional[bool] = None,
+) -> List[int]:
+    """
+    Save many scenarios in a single transaction (e.g. a cycle-time sweep).
+
+    Args:
+        scenarios : Dicts with save_scenario()'s arguments (name, cycle_time,
+                    algorithm, tasks_data, metrics, stations, energy_report,
+                    cache_json)
+        queued    : Go through the background write queue (default: WRITE_QUEUE)
+
+    Returns:
+        Scenario IDs, in input order. Nothing is saved if any insert fails.
+    """
+    if queued is None:
+        queued = WRITE_QUEUE
+    if queued:
+        return get_write_queue(db_path).submit(scenarios).result()
+    return retry_locked(_save_scenarios, scenarios, db_path)
+
+
+def _save_scenarios(scenarios: List[Dict[str, Any]], db_path: str) -> List[int]:
     now = datetime.now().isoformat()
+    graphs: Dict[int, str] = {}  # id(tasks_data) -> graph hash, sweeps share one list
+    with transaction(db_path) as conn:
+        return [_insert_scenario(conn, now=now, graphs=graphs, **sc) for sc in scenarios]
+
+
+def _insert_scenario(
+    conn: sqlite3.Connection,
+    name: str,
+    cycle_time: float,
+    algorithm: str,
+    tasks_data: List[Dict],
+    metrics: Dict[str, Any],
+    stations: List[Dict],
+    energy_report: Optional[Dict] = None,
+    cache_json: bool = False,
+    now: Optional[str] = None,
+    graphs: Optional[Dict[int, str]] = None,
+) -> int:
+    now = now or datetime.now().isoformat()
+
+    # Task graph (stored once per content hash)
+    graph = graphs.get(id(tasks_data)) if graphs is not None else None
+    if graph is None:
+        graph = _store_graph(conn, tasks_data, now)
+        if graphs is not None:
+            graphs[id(tasks_data)] = graph
+    else:
+        conn.execute(SQL_GRAPH_ADDREF, (graph,))
 
     # Main scenario record
-    cursor.execute(
-        "INSERT INTO scenarios (name, cycle_time, algorithm, created_at) VALUES (?, ?, ?, ?)",
-        (name, cycle_time, algorithm, now),
-    )
-    scenario_id = cursor.lastrowid
-
-    # Tasks
-    for t in tasks_data:
-        preds = t.get("predecessors", "")
-        if isinstance(preds, list):
-            preds = " ".join(preds)
-        cursor.execute(
-            "INSERT INTO tasks (scenario_id, task_id, task_name, duration, predecessors) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (scenario_id, t["task_id"], t["task_name"], t["duration"], preds),
-        )
+    scenario_id = conn.execute(SQL_INSERT_SCENARIO, (name, cycle_time, algorithm, now, graph)).lastrowid
 
     # Results
     energy = energy_report or {}
-    cursor.execute(
-        "INSERT INTO results "
-        "(scenario_id, num_stations, line_efficiency, balance_delay, "
-        "smoothness_index, theoretical_min, total_energy_kwh, total_co2_kg, "
-        "total_cost, stations_json, created_at) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        (
-            scenario_id,
-            metrics.get("num_stations", 0),
-            metrics.get("line_efficiency", 0),
-            metrics.get("balance_delay", 0),
-            metrics.get("smoothness_index", 0),
-            metrics.get("theoretical_min_stations", 0),
-            energy.get("total_energy_kwh", 0),
-            energy.get("total_co2_kg", 0),
-            energy.get("total_cost", 0),
-            json.dumps(stations, ensure_ascii=False),
-            now,
-        ),
-    )
+    conn.execute(SQL_INSERT_RESULT, (
+        scenario_id,
+        metrics.get("num_stations", 0),
+        metrics.get("line_efficiency", 0),
+        metrics.get("balance_delay", 0),
+        metrics.get("smoothness_index", 0),
+        metrics.get("theoretical_min_stations", 0),
+        energy.get("total_energy_kwh", 0),
+        energy.get("total_co2_kg", 0),
+        energy.get("total_cost", 0),
+        json.dumps(stations, ensure_ascii=False) if cache_json else None,
+        now,
+    ))
+
+    # Normalized station rows
+    _insert_station_rows(conn, scenario_id, stations)
 
-    conn.commit()
-    conn.close()
     return scenario_id
 
 
+def _insert_station_rows(conn: sqlite3.Connection, scenario_id: int, stations: List[Dict]) -> None:
+    conn.executemany(SQL_INSERT_ASSIGNMENT, (
+        (scenario_id, s["station_id"], pos, tid)
+        for s in stations for pos, tid in enumerate(s["tasks"])
+    ))
+    conn.executemany(SQL_INSERT_LOAD, (
+        (scenario_id, s["station_id"], s["total_time"], s["idle_time"], len(s["tasks"]))
+        for s in stations
+    ))
+
+
+def _store_graph(conn: sqlite3.Connection, tasks_data: List[Dict], now: str) -> str:
+    """Insert the task graph unless an identical one exists; add a reference. Returns its hash."""
+    rows = [
+        (str(t["task_id"]), str(t["task_name"]), float(t["duration"]), _split_preds(t.get("predecessors", "")))
+        for t in tasks_data
+    ]
+    graph = task_rows_hash(rows)
+    if conn.execute(SQL_INSERT_GRAPH, (graph, len(rows), now)).rowcount:
+        conn.executemany(SQL_INSERT_GRAPH_TASK, (
+            (graph, pos, tid, name, duration, " ".join(preds))
+            for pos, (tid, name, duration, preds) in enumerate(rows)
+        ))
+    conn.execute(SQL_GRAPH_ADDREF, (graph,))
+    return graph
+
+
+def _split_preds(preds) -> List[str]:
+    if isinstance(preds, (list, tuple)):
+        return [str(p) for p in preds]
+    if preds is None or str(preds).strip().lower() in ("", "nan", "none"):
+        return []
+    return str(preds).split()
+
+
 def list_scenarios(db_path: str = DB_PATH) -> List[Dict]:
     """List all scenarios."""
-    conn = get_connection(db_path)
-    rows = conn.execute(
-        "SELECT s.*, r.line_efficiency, r.num_stations "
-        "FROM scenarios s LEFT JOIN results r ON s.id = r.scenario_id "
-        "ORDER BY s.created_at DESC"
-    ).fetchall()
-    conn.close()
+    with connection(db_path) as conn:
+        rows = conn.execute(SQL_LIST_SCENARIOS).fetchall()
     return [dict(r) for r in rows]
 
 
-def load_scenario(scenario_id: int, db_path: str = DB_PATH) -> Optional[Dict]:
-    """Load a scenario with all details."""
-    conn = get_connection(db_path)
+def list_scenarios_page(
+    limit: int = 50,
+    cursor: Optional[Tuple[str, int]] = None,
+    search: Optional[str] = None,
+    algorithm: Optional[str] = None,
+    db_path: str = DB_PATH,
+) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+    """
+    One page of scenarios, newest first, using keyset pagination on (created_at, id).
 
-    scenario = conn.execute(
-        "SELECT * FROM scenarios WHERE id = ?", (scenario_id,)
-    ).fetchone()
-    if not scenario:
-        conn.close()
-        return None
+    Args:
+        limit     : Page size
+        cursor    : next_cursor returned by the previous page (None = first page)
+        search    : Case-insensitive substring of the scenario name
+        algorithm : Exact algorithm filter ("rpw", "greedy", ...)
 
-    tasks = conn.execute(
-        "SELECT * FROM tasks WHERE scenario_id = ? ORDER BY task_id",
-        (scenario_id,),
-    ).fetchall()
+    Returns:
+        (rows, next_cursor) — next_cursor is None on the last page
+    """
+    where, params = [], []
+    if cursor is not None:
+        where.append("(s.created_at, s.id) < (?, ?)")
+        params.extend(cursor)
+    if search:
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where.append("s.name LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    if algorithm:
+        where.append("s.algorithm = ?")
+        params.append(algorithm)
 
-    result = conn.execute(
-        "SELECT * FROM results WHERE scenario_id = ?", (scenario_id,)
-    ).fetchone()
+    sql = (
+        "SELECT s.*, r.line_efficiency, r.num_stations "
+        "FROM scenarios s LEFT JOIN results r ON s.id = r.scenario_id "
+        + ("WHERE " + " AND ".join(where) + " " if where else "")
+        + "ORDER BY s.created_at DESC, s.id DESC LIMIT ?"
+    )
+    params.append(limit + 1)
+
+    with connection(db_path) as conn:
+        rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
 
-    conn.close()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+def load_scenario(scenario_id: int, db_path: str = DB_PATH) -> Optional[Dict]:
+    """Load a scenario with all details."""
+    with connection(db_path) as conn:
+        scenario = conn.execute(SQL_GET_SCENARIO, (scenario_id,)).fetchone()
+        if not scenario:
+            return None
+        tasks = conn.execute(SQL_GET_TASKS, (scenario["graph_hash"],)).fetchall()
+        result = conn.execute(SQL_GET_RESULT, (scenario_id,)).fetchone()
+        stations = None
+        if result and not result["stations_json"]:
+            stations = _load_stations(conn, scenario_id)
 
     data = dict(scenario)
     data["tasks"] = [dict(t) for t in tasks]
     data["results"] = dict(result) if result else None
-    if data["results"] and data["results"].get("stations_json"):
-        data["results"]["stations"] = json.loads(data["results"]["stations_json"])
+    if data["results"]:
+        if data["results"].get("stations_json"):
+            data["results"]["stations"] = json.loads(data["results"]["stations_json"])
+        else:
+            data["results"]["stations"] = stations
 
     return data
 
 
+def _load_stations(conn: sqlite3.Connection, scenario_id: int) -> List[Dict]:
+    """Rebuild the solver-format station list from the normalized tables."""
+    stations = [
+        {
+            "station_id": r["station_id"],
+            "tasks": [],
+            "task_details": [],
+            "total_time": r["total_time"],
+            "idle_time": r["idle_time"],
+        }
+        for r in conn.execute(SQL_GET_LOADS, (scenario_id,))
+    ]
+    by_id = {s["station_id"]: s for s in stations}
+    for r in conn.execute(SQL_GET_STATIONS, (scenario_id,)):
+        s = by_id[r["station_id"]]
+        s["tasks"].append(r["task_id"])
+        s["task_details"].append({
+            "id": r["task_id"],
+            "name": r["task_name"] if r["task_name"] is not None else r["task_id"],
+            "duration": r["duration"],
+        })
+    return stations
+
+
 def delete_scenario(scenario_id: int, db_path: str = DB_PATH) -> bool:
-    """Delete scenario (CASCADE deletes tasks and results too)."""
-    conn = get_connection(db_path)
-    cursor = conn.execute("DELETE FROM scenarios WHERE id = ?", (scenario_id,))
-    conn.commit()
-    deleted = cursor.rowcount > 0
-    conn.close()
-    return deleted
+    """
+    Delete scenario (CASCADE deletes results and station rows too).
+    Its task graph is removed once no other scenario references it.
+    """
+    return retry_locked(_delete_scenario, scenario_id, db_path)
+
+
+def _delete_scenario(scenario_id: int, db_path: str) -> bool:
+    with transaction(db_path) as conn:
+        row = conn.execute(SQL_GET_SCENARIO_GRAPH, (scenario_id,)).fetchone()
+        if row is None:
+            return False
+        conn.execute(SQL_DELETE_SCENARIO, (scenario_id,))
+        if row["graph_hash"] is not None:
+            conn.execute(SQL_GRAPH_RELEASE, (row["graph_hash"],))
+            conn.execute(SQL_GRAPH_COLLECT, (row["graph_hash"],))
+    return True
+
+
+# ------------------------------------------------------------------ #
+#  Background Write Queue
+# ------------------------------------------------------------------ #
+
+class WriteQueue:
+    """
+    Single writer thread for one database.
+
+    Saves submitted from any thread are queued; the writer takes everything
+    pending (up to max_batch saves) and commits it as one transaction, so
+    concurrent sessions stop competing for the write lock. If a grouped
+    transaction fails, its saves are retried one by one so a bad save only
+    fails its own caller.
+    """
+
+    def __init__(self, db_path: str, max_batch: int = WRITE_BATCH):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[Tuple[List[Dict[str, Any]], Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="alb-db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, scenarios: List[Dict[str, Any]]) -> "Future[List[int]]":
+        """Queue scenarios for saving; the future resolves to their IDs."""
+        fut: "Future[List[int]]" = Future()
+        self._queue.put((scenarios, fut))
+        return fut
+
+    def close(self) -> None:
+        """Write everything still queued, then stop the writer."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple[List[Dict[str, Any]], Future]]) -> None:
+        batch = [(scs, fut) for scs, fut in batch if fut.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            ids = retry_locked(_save_scenarios, [sc for scs, _ in batch for sc in scs], self.db_path)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            for scs, fut in batch:
+                try:
+                    fut.set_result(retry_locked(_save_scenarios, scs, self.db_path))
+                except Exception as item_error:
+                    fut.set_exception(item_error)
+            return
+        start = 0
+        for scs, fut in batch:
+            fut.set_result(ids[start:start + len(scs)])
+            start += len(scs)
+
+
+_write_queues: Dict[str, WriteQueue] = {}
+
+
+def get_write_queue(db_path: str = DB_PATH) -> WriteQueue:
+    """The background writer for db_path (started on first use)."""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        wq = _write_queues.get(key)
+        if wq is None:
+            wq = _write_queues[key] = WriteQueue(db_path)
+    return wq
+
+
+def close_write_queues() -> None:
+    """Flush and stop every background writer."""
+    with _pools_lock:
+        queues = list(_write_queues.values())
+        _write_queues.clear()
+    for wq in queues:
+        wq.close()
+
+
+# ------------------------------------------------------------------ #
+#  Projection Loaders (only the fields a view needs)
+# ------------------------------------------------------------------ #
+
+def load_scenario_metrics(scenario_id: int, db_path: str = DB_PATH) -> Optional[Dict]:
+    """Scenario fields + headline metrics, without tasks or stations."""
+    with connection(db_path) as conn:
+        row = conn.execute(SQL_GET_METRICS, (scenario_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def load_station_loads(scenario_id: int, db_path: str = DB_PATH) -> List[Dict]:
+    """[{"station_id", "total_time", "idle_time", "task_count"}, ...] in station order."""
+    with connection(db_path) as conn:
+        rows = conn.execute(SQL_GET_LOAD_ROWS, (scenario_id,)).fetchall()
+    return [dict(r) for r in rows]
+
+
+class LazyScenario(Mapping):
+    """
+    Read-only scenario view that loads its heavy fields on first access.
+
+    Headline fields (see METRIC_COLUMNS, plus id/name/cycle_time/...) are
+    read up front in one small query. "loads", "stations" and "tasks" are
+    queried (and JSON-decoded) only when accessed, then kept.
+    """
+
+    LAZY_FIELDS = ("loads", "stations", "tasks")
+
+    def __init__(self, headline: Dict[str, Any], db_path: str = DB_PATH):
+        self._data = dict(headline)
+        self._db_path = db_path
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._data and key in self.LAZY_FIELDS:
+            self._data[key] = getattr(self, f"_fetch_{key}")()
+        return self._data[key]
+
+    def __iter__(self):
+        yield from self._data
+        yield from (k for k in self.LAZY_FIELDS if k not in self._data)
+
+    def __len__(self) -> int:
+        return len(set(self._data) | set(self.LAZY_FIELDS))
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._data
+
+    def _fetch_loads(self) -> List[Dict]:
+        return load_station_loads(self._data["id"], self._db_path)
+
+    def _fetch_stations(self) -> List[Dict]:
+        with connection(self._db_path) as conn:
+            row = conn.execute(SQL_GET_STATIONS_JSON, (self._data["id"],)).fetchone()
+            if row and row["stations_json"]:
+                return json.loads(row["stations_json"])
+            return _load_stations(conn, self._data["id"])
+
+    def _fetch_tasks(self) -> List[Dict]:
+        with connection(self._db_path) as conn:
+            rows = conn.execute(SQL_GET_TASKS, (self._data["graph_hash"],)).fetchall()
+        return [dict(r) for r in rows]
+
+
+def load_scenario_lazy(scenario_id: int, db_path: str = DB_PATH) -> Optional[LazyScenario]:
+    """Headline metrics now; loads, stations and tasks on first access."""
+    headline = load_scenario_metrics(scenario_id, db_path)
+    return LazyScenario(headline, db_path) if headline else None
+
+
+# ------------------------------------------------------------------ #
+#  Cross-Scenario Analytics (single SQL queries)
+# ------------------------------------------------------------------ #
+
+def compare_scenarios(
+    scenario_ids: List[int],
+    baseline_id: Optional[int] = None,
+    db_path: str = DB_PATH,
+) -> List[Dict]:
+    """
+    Compare any number of scenarios in one query.
+
+    Args:
+        scenario_ids : Scenarios to compare, in display order
+        baseline_id  : Reference for the deltas (default: first id)
+
+    Returns:
+        One dict per scenario that has results, in the given order:
+        headline metrics, "delta_<metric>" vs the baseline (None if the
+        baseline has no results), "rank_<metric>" (1 = best, ties share a
+        rank), "loads" (station loads in station order) and
+        "min_load"/"max_load"/"avg_load"/"total_idle".
+    """
+    if not scenario_ids:
+        return []
+    if baseline_id is None:
+        baseline_id = scenario_ids[0]
+    ids_json = json.dumps([int(i) for i in scenario_ids])
+    with connection(db_path) as conn:
+        rows = conn.execute(SQL_COMPARE, (ids_json, baseline_id)).fetchall()
+        loads: Dict[int, List[float]] = {}
+        for scenario_id, total_time in conn.execute(SQL_COMPARE_LOADS, (ids_json,)):
+            loads.setdefault(scenario_id, []).append(total_time)
+
+    out = []
+    for r in rows:
+        row = dict(r)
+        del row["ord"]
+        row["loads"] = loads.get(row["id"], [])
+        out.append(row)
+    return out
+
+
+def scenarios_with_task_at_station(task_id: str, station_id: int, db_path: str = DB_PATH) -> List[Dict]:
+    """Scenarios that assigned task_id to station_id."""
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT s.id, s.name, s.cycle_time, s.algorithm, s.created_at "
+            "FROM station_assignments a JOIN scenarios s ON s.id = a.scenario_id "
+            "WHERE a.task_id = ? AND a.station_id = ? "
+            "ORDER BY s.created_at DESC, s.id DESC",
+            (task_id, station_id),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def station_load_summary(
+    station_id: Optional[int] = None,
+    scenario_ids: Optional[List[int]] = None,
+    db_path: str = DB_PATH,
+) -> List[Dict]:
+    """
+    Per-station load statistics across scenarios.
+
+    Returns:
+        [{"station_id", "scenarios", "avg_load", "min_load", "max_load", "avg_idle"}, ...]
+    """
+    where, params = [], []
+    if station_id is not None:
+        where.append("station_id = ?")
+        params.append(station_id)
+    if scenario_ids:
+        where.append(f"scenario_id IN ({', '.join('?' * len(scenario_ids))})")
+        params.extend(scenario_ids)
+
+    sql = (
+        "SELECT station_id, COUNT(*) AS scenarios, AVG(total_time) AS avg_load, "
+        "MIN(total_time) AS min_load, MAX(total_time) AS max_load, AVG(idle_time) AS avg_idle "
+        "FROM station_loads "
+        + ("WHERE " + " AND ".join(where) + " " if where else "")
+        + "GROUP BY station_id ORDER BY station_id"
+    )
+    with connection(db_path) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [dict(r) for r in rows]
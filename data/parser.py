@@ -5,12 +5,21 @@ Parses user-uploaded CSV files and validates their contents.
 
 import pandas as pd
 import io
-from typing import List, Union
+import os
+from typing import Callable, Iterator, List, Optional, Tuple, Union
 from collections import defaultdict
 
+from engine.graph import GraphBuilder, PrecedenceGraph
+
 
 REQUIRED_COLUMNS = {"task_id", "task_name", "duration", "predecessors"}
 
+# Read as text, duration is coerced per chunk so bad cells become
+# validation errors instead of parser exceptions.
+CSV_DTYPES = {"task_id": "string", "task_name": "string", "duration": "string", "predecessors": "string"}
+DEFAULT_CHUNKSIZE = 100_000
+MAX_REPORTED_ERRORS = 20
+
 
 def parse_csv(source: Union[str, io.BytesIO, io.StringIO]) -> pd.DataFrame:
     """
@@ -138,3 +147,199 @@ def _check_cycles(df: pd.DataFrame) -> str:
                 return result
 
     return ""
+
+
+# ------------------------------------------------------------------ #
+#  Chunked Import (large files)
+# ------------------------------------------------------------------ #
+
+def csv_engine() -> str:
+    """Fastest available CSV engine: 'pyarrow' (streaming, multithreaded) or pandas 'c'."""
+    try:
+        import pyarrow.csv  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "c"
+
+
+def load_tasks_csv(
+    source: Union[str, io.IOBase],
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: Optional[Callable[[int, float], None]] = None,
+) -> Tuple[pd.DataFrame, PrecedenceGraph]:
+    """
+    Stream a (possibly very large) task CSV in chunks, validating each
+    chunk and feeding the graph builder as it goes.
+
+    Args:
+        source    : File path or binary/text file-like object (read from its start)
+        chunksize : Rows per chunk
+        progress  : Optional callback(rows_read, fraction_of_bytes_read)
+
+    Returns:
+        (validated DataFrame, PrecedenceGraph)
+
+    Raises:
+        ValueError: Missing columns, invalid data, unknown predecessors, cycles
+    """
+    handle, owned = _open_binary(source)
+    start = handle.tell()
+    try:
+        engine = csv_engine()
+        try:
+            return _load_chunks(handle, chunksize, progress, engine)
+        except _RaggedRows:
+            # pyarrow can't pad short rows (e.g. no trailing empty predecessors
+            # field) with nulls; the pandas c engine reads them like parse_csv
+            handle.seek(start)
+            return _load_chunks(handle, chunksize, progress, "c")
+    finally:
+        if owned:
+            handle.close()
+
+
+def _load_chunks(handle, chunksize, progress, engine) -> Tuple[pd.DataFrame, PrecedenceGraph]:
+    builder = GraphBuilder()
+    errors: List[str] = []
+    frames = []
+    rows = 0
+
+    total = _stream_size(handle)
+    for chunk in _iter_chunks(handle, chunksize, engine):
+        chunk = _clean_chunk(chunk)
+        ids = chunk["task_id"].tolist()
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.extend(_validate_chunk(chunk, ids, builder.graph.tasks))
+        builder.add_records(zip(
+            ids, chunk["task_name"].tolist(), chunk["duration"].tolist(), chunk["predecessors"].tolist(),
+        ))
+        frames.append(chunk)
+        rows += len(chunk)
+        if progress:
+            progress(rows, min(handle.tell() / total, 1.0) if total else 1.0)
+
+    if rows == 0:
+        errors.append("CSV file is empty — at least one task is required.")
+    if not errors:
+        errors.extend(
+            f"Task '{tid}' references unknown predecessor: '{p}'"
+            for tid, p in builder.unknown_predecessors()[:MAX_REPORTED_ERRORS]
+        )
+    if errors:
+        raise ValueError("CSV validation errors:\n" + "\n".join(f"  • {e}" for e in errors[:MAX_REPORTED_ERRORS]))
+
+    try:
+        graph = builder.build()
+    except ValueError as e:
+        raise ValueError(f"CSV validation errors:\n  • {e}") from None
+
+    df = pd.concat(frames, ignore_index=True)
+    return df, graph
+
+
+def _open_binary(source) -> Tuple[io.IOBase, bool]:
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb"), True
+    if isinstance(source, io.TextIOBase):
+        # Manual entry / StringIO — small, re-encode once
+        return io.BytesIO(source.read().encode("utf-8")), True
+    source.seek(0)
+    return source, False
+
+
+def _stream_size(handle) -> int:
+    pos = handle.tell()
+    end = handle.seek(0, io.SEEK_END)
+    handle.seek(pos)
+    return end - pos
+
+
+def _read_header(handle) -> List[str]:
+    pos = handle.tell()
+    header = handle.readline().decode("utf-8-sig")
+    handle.seek(pos)
+    return [c.strip().lower() for c in header.rstrip("\r\n").split(",")]
+
+
+class _RaggedRows(Exception):
+    """A row's field count differs from the header; pyarrow rejects these, the c engine pads them."""
+
+
+def _iter_chunks(handle, chunksize: int, engine: str) -> Iterator[pd.DataFrame]:
+    names = _read_header(handle)
+    missing = REQUIRED_COLUMNS - set(names)
+    if missing:
+        raise ValueError(
+            f"Missing columns in CSV: {', '.join(missing)}. "
+            f"Expected columns: {', '.join(REQUIRED_COLUMNS)}"
+        )
+    usecols = [c for c in names if c in REQUIRED_COLUMNS]
+
+    if engine == "pyarrow":
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        ragged = []
+
+        def on_invalid_row(row):
+            ragged.append(row.number)
+            return "error"
+
+        try:
+            reader = pacsv.open_csv(
+                handle,
+                read_options=pacsv.ReadOptions(column_names=names, skip_rows=1, block_size=1 << 22),
+                parse_options=pacsv.ParseOptions(newlines_in_values=True, invalid_row_handler=on_invalid_row),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=usecols,
+                    column_types={c: pa.string() for c in usecols},
+                    strings_can_be_null=True,
+                ),
+            )
+            buffered, n = [], 0
+            for batch in reader:
+                buffered.append(batch)
+                n += batch.num_rows
+                if n >= chunksize:
+                    yield pa.Table.from_batches(buffered).to_pandas()
+                    buffered, n = [], 0
+            if buffered:
+                yield pa.Table.from_batches(buffered).to_pandas()
+        except pa.ArrowInvalid:
+            if ragged:
+                raise _RaggedRows(f"Row {ragged[0]} has a different number of fields than the header") from None
+            raise
+    else:
+        yield from pd.read_csv(
+            handle, engine="c", names=names, header=0, usecols=usecols,
+            dtype={c: CSV_DTYPES[c] for c in usecols}, chunksize=chunksize,
+        )
+
+
+def _clean_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk = chunk[["task_id", "task_name", "duration", "predecessors"]].copy()
+    chunk["task_id"] = chunk["task_id"].fillna("").astype(str).str.strip()
+    chunk["task_name"] = chunk["task_name"].fillna("").astype(str).str.strip()
+    chunk["duration"] = pd.to_numeric(chunk["duration"], errors="coerce").astype("float64")
+    chunk["predecessors"] = chunk["predecessors"].fillna("").astype(str).str.strip()
+    return chunk
+
+
+def _validate_chunk(chunk: pd.DataFrame, ids: List[str], known) -> List[str]:
+    """Row-local checks for one chunk; `known` holds IDs of earlier chunks."""
+    errors = []
+
+    dups = chunk.loc[chunk["task_id"].duplicated(), "task_id"].tolist()
+    dups += [t for t in ids if t in known]
+    if dups:
+        errors.append(f"Duplicate task IDs: {', '.join(dups[:MAX_REPORTED_ERRORS])}")
+
+    empty_id = chunk["task_id"] == ""
+    if empty_id.any():
+        errors.append(f"Missing task_id in {int(empty_id.sum())} row(s)")
+
+    bad = chunk["duration"].isna() | (chunk["duration"] <= 0)
+    if bad.any():
+        errors.append(f"Invalid duration (<=0 or NaN): {', '.join(chunk.loc[bad, 'task_id'].head(MAX_REPORTED_ERRORS))}")
+
+    return errors
@@ -0,0 +1,281 @@
+"""
+solver_cache.py — Persistent Solver Result Cache
+Stores solved line balances in SQLite so identical solves (same graph,
+cycle time, algorithm and solver parameters) are shared across sessions
+and users.
+
+Entries hold the compact assignment ([[task_id, ...], ...]) and metrics;
+station dicts are rebuilt from the caller's graph on a hit. The cache is
+bounded by entry count and total size, evicting least-recently-used
+entries first.
+
+Lookups are read-only: hit/miss counters and per-entry hits are buffered
+in memory and written in one transaction every FLUSH_EVERY lookups or
+FLUSH_INTERVAL seconds (and at exit), and an entry's last_used is only
+rewritten once it is TOUCH_INTERVAL seconds old, so cache hits don't
+contend for the database write lock.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from engine.greedy_solver import solve_greedy
+from engine.hashing import graph_hash, parts_hash
+from engine.metrics import compute_all_metrics
+from engine.rpw_solver import solve_rpw
+from engine.solution import build_stations, stations_to_assignment
+
+from .database import DB_PATH, connection, retry_locked, transaction
+
+SOLVERS = {
+    "rpw": solve_rpw,
+    "greedy": solve_greedy,
+}
+
+MAX_ENTRIES = 10_000
+MAX_BYTES = 256 * 1024 * 1024
+FLUSH_EVERY = 64         # buffered lookups written in one transaction
+FLUSH_INTERVAL = 5.0     # ... or after this many seconds
+TOUCH_INTERVAL = 60.0    # seconds before a hit rewrites an entry's last_used
+
+SQL_GET = "SELECT assignment, metrics, last_used FROM solver_cache WHERE key = ?"
+SQL_TOUCH = "UPDATE solver_cache SET hits = hits + ?, last_used = MAX(last_used, ?) WHERE key = ?"
+SQL_PUT = (
+    "INSERT OR REPLACE INTO solver_cache "
+    "(key, graph_hash, cycle_time, algorithm, params, assignment, metrics, size_bytes, hits, created_at, last_used) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)"
+)
+SQL_COUNT = "UPDATE solver_cache_stats SET value = value + ? WHERE name = ?"
+SQL_EVICT = (
+    "DELETE FROM solver_cache WHERE key IN ("
+    "  SELECT key FROM ("
+    "    SELECT key,"
+    "      ROW_NUMBER() OVER (ORDER BY last_used DESC) AS n,"
+    "      SUM(size_bytes) OVER (ORDER BY last_used DESC ROWS UNBOUNDED PRECEDING) AS total"
+    "    FROM solver_cache"
+    "  ) WHERE n > ? OR total > ?"
+    ")"
+)
+
+
+def cache_key(g_hash: str, cycle_time: float, algorithm: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Key of one solve: graph content hash + cycle time + algorithm + solver parameters."""
+    return parts_hash([g_hash, float(cycle_time), algorithm, _params_json(params)])
+
+
+def _params_json(params: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+
+
+def get_cached(
+    g_hash: str,
+    cycle_time: float,
+    algorithm: str,
+    params: Optional[Dict[str, Any]] = None,
+    db_path: str = DB_PATH,
+) -> Optional[Tuple[List[List[str]], Dict[str, Any]]]:
+    """(assignment, metrics) for a cached solve, or None. Counts a hit or a miss."""
+    key = cache_key(g_hash, cycle_time, algorithm, params)
+    row = retry_locked(_lookup, key, db_path)
+    if row is None:
+        return None
+    return json.loads(row["assignment"]), json.loads(row["metrics"])
+
+
+def _lookup(key: str, db_path: str):
+    with connection(db_path) as conn:
+        row = conn.execute(SQL_GET, (key,)).fetchone()
+    _count(db_path, key, row)
+    return row
+
+
+# ------------------------------------------------------------------ #
+#  Buffered Counters
+# ------------------------------------------------------------------ #
+
+class _Counters:
+    """Lookups of one database not yet written to it."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.entries: Dict[str, List[float]] = {}  # key -> [hits, last_used to write (0 = keep)]
+        self.since = time.monotonic()
+
+    def merge(self, other: "_Counters") -> None:
+        self.hits += other.hits
+        self.misses += other.misses
+        for key, (hits, last_used) in other.entries.items():
+            entry = self.entries.setdefault(key, [0, 0.0])
+            entry[0] += hits
+            entry[1] = max(entry[1], last_used)
+
+
+_pending: Dict[str, _Counters] = {}
+_pending_lock = threading.Lock()
+
+
+def _count(db_path: str, key: str, row) -> None:
+    now = time.time()
+    with _pending_lock:
+        c = _pending.setdefault(db_path, _Counters())
+        if row is None:
+            c.misses += 1
+        else:
+            c.hits += 1
+            entry = c.entries.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            if now - row["last_used"] >= TOUCH_INTERVAL:
+                entry[1] = now
+        due = c.hits + c.misses >= FLUSH_EVERY or time.monotonic() - c.since >= FLUSH_INTERVAL
+    if due:
+        flush_counters(db_path)
+
+
+def flush_counters(db_path: Optional[str] = None) -> None:
+    """Write buffered hit/miss counts and entry touches (every database if db_path is None)."""
+    with _pending_lock:
+        paths = [db_path] if db_path is not None else list(_pending)
+    for path in paths:
+        c = _take_counters(path)
+        if c is None:
+            continue
+        try:
+            retry_locked(_flush, c, path)
+        except sqlite3.Error:
+            # Counters are advisory: keep them for the next flush rather than fail a lookup
+            _requeue_counters(path, c)
+
+
+def _take_counters(db_path: str) -> Optional[_Counters]:
+    with _pending_lock:
+        return _pending.pop(db_path, None)
+
+
+def _requeue_counters(db_path: str, c: _Counters) -> None:
+    with _pending_lock:
+        _pending.setdefault(db_path, _Counters()).merge(c)
+
+
+def _flush(c: _Counters, db_path: str) -> None:
+    with transaction(db_path) as conn:
+        _write_counters(conn, c)
+
+
+def _write_counters(conn, c: _Counters) -> None:
+    conn.executemany(SQL_TOUCH, [(hits, last_used, key) for key, (hits, last_used) in c.entries.items()])
+    conn.executemany(SQL_COUNT, [(c.hits, "hits"), (c.misses, "misses")])
+
+
+atexit.register(flush_counters)
+
+
+def put_cached(
+    g_hash: str,
+    cycle_time: float,
+    algorithm: str,
+    assignment: List[List[str]],
+    metrics: Dict[str, Any],
+    params: Optional[Dict[str, Any]] = None,
+    db_path: str = DB_PATH,
+    max_entries: int = MAX_ENTRIES,
+    max_bytes: int = MAX_BYTES,
+) -> None:
+    """Store a solve and evict least-recently-used entries beyond the limits."""
+    key = cache_key(g_hash, cycle_time, algorithm, params)
+    a_json = json.dumps(assignment, separators=(",", ":"))
+    m_json = json.dumps(metrics, separators=(",", ":"))
+    row = (
+        key, g_hash, float(cycle_time), algorithm, _params_json(params),
+        a_json, m_json, len(a_json) + len(m_json),
+        datetime.now().isoformat(), time.time(),
+    )
+    retry_locked(_store, row, max_entries, max_bytes, db_path)
+
+
+def _store(row: tuple, max_entries: int, max_bytes: int, db_path: str) -> None:
+    c = _take_counters(db_path)  # a put follows a miss: write the buffered counts with it
+    try:
+        with transaction(db_path) as conn:
+            conn.execute(SQL_PUT, row)
+            evicted = conn.execute(SQL_EVICT, (max_entries, max_bytes)).rowcount
+            if evicted:
+                conn.execute(SQL_COUNT, (evicted, "evictions"))
+            if c is not None:
+                _write_counters(conn, c)
+    except BaseException:
+        if c is not None:
+            _requeue_counters(db_path, c)
+        raise
+
+
+def solve_cached(
+    graph,
+    cycle_time: float,
+    algorithm: str,
+    params: Optional[Dict[str, Any]] = None,
+    db_path: str = DB_PATH,
+    g_hash: Optional[str] = None,
+    progress=None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Solve through the cache.
+
+    Args:
+        graph      : PrecedenceGraph
+        cycle_time : Cycle time
+        algorithm  : Key of SOLVERS ("rpw", "greedy")
+        params     : Extra solver keyword arguments (part of the cache key)
+        g_hash     : Precomputed graph_hash(graph), if the caller has it
+        progress   : Solver progress callback (only called on a miss; not part of the key)
+
+    Returns:
+        (stations, metrics) — same as the solver + compute_all_metrics
+
+    Raises:
+        ValueError: Unknown algorithm, or the solver's own errors (not cached)
+    """
+    if algorithm not in SOLVERS:
+        raise ValueError(f"Unknown algorithm '{algorithm}'. Expected one of: {', '.join(SOLVERS)}")
+    g_hash = g_hash or graph_hash(graph)
+
+    hit = get_cached(g_hash, cycle_time, algorithm, params, db_path)
+    if hit is not None:
+        assignment, metrics = hit
+        return build_stations(graph, assignment, cycle_time), metrics
+
+    stations = SOLVERS[algorithm](graph, cycle_time, progress=progress, **(params or {}))
+    metrics = compute_all_metrics(stations, cycle_time, graph.total_work_content())
+    put_cached(g_hash, cycle_time, algorithm, stations_to_assignment(stations), metrics, params, db_path)
+    return stations, metrics
+
+
+def cache_stats(db_path: str = DB_PATH) -> Dict[str, int]:
+    """{"entries", "size_bytes", "hits", "misses", "evictions"} (including this process's buffered counts)"""
+    with connection(db_path) as conn:
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM solver_cache").fetchone()
+        counters = dict(conn.execute("SELECT name, value FROM solver_cache_stats").fetchall())
+    with _pending_lock:
+        c = _pending.get(db_path)
+        if c is not None:
+            counters["hits"] = counters.get("hits", 0) + c.hits
+            counters["misses"] = counters.get("misses", 0) + c.misses
+    return {"entries": entries, "size_bytes": size, **counters}
+
+
+def clear_cache(db_path: str = DB_PATH) -> None:
+    """Drop every cached solve and reset the counters."""
+    with _pending_lock:
+        _pending.pop(db_path, None)
+    retry_locked(_clear, db_path)
+
+
+def _clear(db_path: str) -> None:
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM solver_cache")
+        conn.execute("UPDATE solver_cache_stats SET value = 0")
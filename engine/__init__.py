@@ -16,6 +16,9 @@ __all__ = [
     "calculate_energy_waste",
     "annual_savings",
     "generate_jes",
+    "generate_station_jes",
+    "build_stations",
+    "stations_to_assignment",
 ]
 
 from .graph import PrecedenceGraph
@@ -30,4 +33,5 @@ from .metrics import (
     compute_all_metrics,
 )
 from .energy_waste import calculate_energy_waste, annual_savings
-from .jes_generator import generate_jes
+from .jes_generator import generate_jes, generate_station_jes
+from .solution import build_stations, stations_to_assignment
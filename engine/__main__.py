@@ -0,0 +1,5 @@
+"""Run the headless batch solver: python -m engine solve --help"""
+
+from .cli import main
+
+raise SystemExit(main())
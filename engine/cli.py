@@ -0,0 +1,385 @@
+"""
+cli.py — Headless Batch Solver
+Balances many lines without the dashboard: every combination of task
+file, cycle time and algorithm becomes one job, and jobs are fanned out
+across worker processes.
+
+Results are written as JSON Lines (one record per job, in input order,
+streamed as they finish) or as a Parquet table (requires `pyarrow`).
+Solves can go through the persistent solver cache, and results can be
+saved as scenarios in the dashboard database.
+
+`watch` keeps results for a directory of task files up to date as the
+files change (see watch.py).
+
+Headless usage:
+    python -m engine solve lines/ -c 10:30:2.5 -a rpw -a greedy -o results.jsonl
+    python -m engine solve line_a.csv line_b.csv -c 15,20 --save --workers 8
+    python -m engine watch incoming/ -c 15 -o results/
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import LRUCache
+from .energy_waste import calculate_energy_waste
+from .graph import PrecedenceGraph
+from .greedy_solver import solve_greedy
+from .hashing import graph_hash
+from .metrics import compute_all_metrics
+from .rpw_solver import solve_rpw
+from .solution import stations_to_assignment
+
+SOLVERS = {
+    "rpw": solve_rpw,
+    "greedy": solve_greedy,
+}
+OUTPUT_FORMATS = ("jsonl", "parquet")
+
+# Metrics copied into flat result columns (Parquet)
+METRIC_COLUMNS = (
+    "num_stations", "theoretical_min_stations", "line_efficiency",
+    "balance_delay", "smoothness_index", "total_work_content",
+)
+ENERGY_COLUMNS = ("total_idle_time", "total_energy_kwh", "total_cost", "total_co2_kg")
+
+
+# ------------------------------------------------------------------ #
+#  Argument Parsing
+# ------------------------------------------------------------------ #
+
+def parse_cycle_times(spec: str) -> List[float]:
+    """
+    Cycle times from "15", "15,20,25" or an inclusive range "10:30:2.5"
+    (start:stop:step; step defaults to 1).
+
+    Raises:
+        ValueError: If the spec is malformed or a value is not positive
+    """
+    values: List[float] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" in part:
+            bounds = part.split(":")
+            if len(bounds) not in (2, 3):
+                raise ValueError(f"Invalid cycle time range '{part}'. Expected start:stop[:step].")
+            start, stop = float(bounds[0]), float(bounds[1])
+            step = float(bounds[2]) if len(bounds) == 3 else 1.0
+            if step <= 0 or stop < start:
+                raise ValueError(f"Invalid cycle time range '{part}'.")
+            n = int(round((stop - start) / step, 9)) + 1
+            values.extend(round(start + i * step, 9) for i in range(n))
+        else:
+            values.append(float(part))
+    if not values or any(v <= 0 for v in values):
+        raise ValueError(f"Cycle times must be positive: '{spec}'.")
+    return values
+
+
+def _cycle_times_arg(spec: str) -> List[float]:
+    try:
+        return parse_cycle_times(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def expand_inputs(paths: Iterable[str]) -> List[str]:
+    """Task files from files and directories (every *.csv in a directory, sorted)."""
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(".csv") and os.path.isfile(os.path.join(path, name))
+            ))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"No such task file or directory: {path}")
+    return files
+
+
+# ------------------------------------------------------------------ #
+#  Jobs (run in worker processes)
+# ------------------------------------------------------------------ #
+
+# Parsed graphs per worker process, keyed by (path, mtime)
+_GRAPHS = LRUCache(maxsize=16)
+
+
+def load_graph(path: str) -> Tuple[PrecedenceGraph, str]:
+    """(graph, graph hash) of a task file, parsed once per worker process."""
+    def load():
+        g = PrecedenceGraph()
+        g.load_from_csv(path, validate=True)
+        return g, graph_hash(g)
+    return _GRAPHS.get_or_set((path, os.path.getmtime(path)), load)
+
+
+def solve_job(
+    path: str,
+    cycle_time: float,
+    algorithm: str,
+    cache_db: Optional[str] = None,
+    with_stations: bool = False,
+) -> Dict[str, Any]:
+    """
+    Solve one (file, cycle time, algorithm) job.
+
+    Args:
+        cache_db      : Solve through the persistent solver cache in this database
+        with_stations : Include the full station list (needed to save scenarios)
+
+    Returns:
+        Result record; status "error" with a message if the file or solve failed
+    """
+    started = time.perf_counter()
+    record: Dict[str, Any] = {
+        "file": path,
+        "line": os.path.splitext(os.path.basename(path))[0],
+        "cycle_time": cycle_time,
+        "algorithm": algorithm,
+    }
+    try:
+        graph, g_hash = load_graph(path)
+        record["graph_hash"] = g_hash
+        if cache_db is not None:
+            from data.solver_cache import solve_cached
+            stations, metrics = solve_cached(graph, cycle_time, algorithm, db_path=cache_db, g_hash=g_hash)
+        else:
+            stations = SOLVERS[algorithm](graph, cycle_time)
+            metrics = compute_all_metrics(stations, cycle_time, graph.total_work_content())
+        energy = calculate_energy_waste(stations, cycle_time).to_dict()
+    except (OSError, KeyError, ValueError, csv.Error, sqlite3.Error) as e:
+        # Caught here so one bad file or cache database doesn't abort a pooled batch
+        record.update(status="error", error=str(e), elapsed_s=round(time.perf_counter() - started, 4))
+        return record
+
+    energy.pop("per_station", None)
+    record.update(
+        status="ok",
+        metrics=metrics,
+        energy=energy,
+        assignment=stations_to_assignment(stations),
+        elapsed_s=round(time.perf_counter() - started, 4),
+    )
+    if with_stations:
+        record["stations"] = stations
+    return record
+
+
+def _run(job: Tuple) -> Dict[str, Any]:
+    return solve_job(*job)
+
+
+def run_jobs(jobs: List[Tuple], workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield solve_job() records in job order; workers=1 runs in this process."""
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _run(job)
+        return
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_run, jobs, chunksize=chunksize)
+
+
+# ------------------------------------------------------------------ #
+#  Output
+# ------------------------------------------------------------------ #
+
+def write_parquet(records: List[Dict[str, Any]], path: str) -> None:
+    """Write result records as one flat Parquet table (one row per job)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:  # pragma: no cover - depends on environment
+        raise ImportError(
+            "Parquet output requires 'pyarrow'. Install it with: pip install pyarrow"
+        ) from e
+
+    schema = pa.schema(
+        [("file", pa.string()), ("line", pa.string()), ("cycle_time", pa.float64()),
+         ("algorithm", pa.string()), ("graph_hash", pa.string()), ("status", pa.string()),
+         ("error", pa.string())]
+        + [(c, pa.float64()) for c in METRIC_COLUMNS + ENERGY_COLUMNS]
+        + [("assignment", pa.list_(pa.list_(pa.string()))), ("elapsed_s", pa.float64())]
+    )
+    rows = []
+    for r in records:
+        metrics, energy = r.get("metrics") or {}, r.get("energy") or {}
+        row = {name: r.get(name) for name in schema.names}
+        row.update({c: metrics.get(c) for c in METRIC_COLUMNS})
+        row.update({c: energy.get(c) for c in ENERGY_COLUMNS})
+        rows.append(row)
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), path)
+
+
+def _tasks_data(graph: PrecedenceGraph) -> List[Dict[str, Any]]:
+    return [
+        {"task_id": t, "task_name": info["name"], "duration": info["duration"],
+         "predecessors": " ".join(graph.predecessors[t])}
+        for t, info in graph.tasks.items()
+    ]
+
+
+def save_records(records: List[Dict[str, Any]], db_path: str) -> List[int]:
+    """Save successful records as scenarios (one transaction); returns their IDs."""
+    from data.database import save_scenarios
+
+    tasks: Dict[str, List[Dict[str, Any]]] = {}  # one list per file, so its graph is stored once
+    scenarios = []
+    for r in records:
+        if r["status"] != "ok":
+            continue
+        if r["file"] not in tasks:
+            tasks[r["file"]] = _tasks_data(load_graph(r["file"])[0])
+        scenarios.append({
+            "name": f"{r['line']}_{r['algorithm'].upper()}_CT{r['cycle_time']:g}",
+            "cycle_time": r["cycle_time"],
+            "algorithm": r["algorithm"],
+            "tasks_data": tasks[r["file"]],
+            "metrics": r["metrics"],
+            "stations": r["stations"],
+            "energy_report": r["energy"],
+        })
+    return save_scenarios(scenarios, db_path=db_path) if scenarios else []
+
+
+# ------------------------------------------------------------------ #
+#  Entry Point
+# ------------------------------------------------------------------ #
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m engine", description="Headless assembly line balancing.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="Balance task files for cycle times and algorithms")
+    solve.add_argument("inputs", nargs="+", help="Task CSV files or directories of them")
+    solve.add_argument("--cycle-time", "-c", dest="cycle_times", type=_cycle_times_arg, action="append",
+                       required=True, help="15, 15,20,25 or start:stop[:step]; repeatable")
+    solve.add_argument("--algorithm", "-a", dest="algorithms", action="append", choices=[*SOLVERS, "all"],
+                       help="Repeatable (default: rpw)")
+    solve.add_argument("--output", "-o", default="-", help="Output file (default: JSON Lines on stdout)")
+    solve.add_argument("--format", "-f", choices=OUTPUT_FORMATS,
+                       help="Output format (default: from the output extension, else jsonl)")
+    solve.add_argument("--workers", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    solve.add_argument("--cache", action="store_true", help="Solve through the persistent solver cache")
+    solve.add_argument("--save", action="store_true", help="Save results as scenarios in the database")
+    solve.add_argument("--db", default=None, help="Database path for --cache/--save (default: the dashboard's)")
+
+    watch = commands.add_parser("watch", help="Re-balance task files in a directory as they change")
+    watch.add_argument("directory", help="Directory of task CSVs")
+    watch.add_argument("--cycle-time", "-c", dest="cycle_times", type=_cycle_times_arg, action="append",
+                       required=True, help="15, 15,20,25 or start:stop[:step]; repeatable")
+    watch.add_argument("--algorithm", "-a", dest="algorithms", action="append", choices=[*SOLVERS, "all"],
+                       help="Repeatable (default: rpw)")
+    watch.add_argument("--output", "-o", default="watch_results", help="Output directory (default: watch_results)")
+    watch.add_argument("--interval", type=float, default=2.0, help="Seconds between polls (default: 2)")
+    watch.add_argument("--resolve", action="store_true", help="Always re-solve changed lines instead of repairing")
+    watch.add_argument("--once", action="store_true", help="Process the directory once and exit")
+    return parser
+
+
+def _algorithms(selected: Optional[List[str]]) -> List[str]:
+    algorithms = selected or ["rpw"]
+    if "all" in algorithms:
+        algorithms = list(SOLVERS)
+    return list(dict.fromkeys(algorithms))
+
+
+def cmd_solve(args: argparse.Namespace) -> int:
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "jsonl")
+    if fmt == "parquet" and args.output == "-":
+        print("error: Parquet output needs --output <file>", file=sys.stderr)
+        return 2
+    try:
+        files = expand_inputs(args.inputs)
+    except FileNotFoundError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    algorithms = _algorithms(args.algorithms)
+    cycle_times = list(dict.fromkeys(ct for cts in args.cycle_times for ct in cts))
+
+    db_path = None
+    if args.cache or args.save:
+        from data.database import DB_PATH, init_db
+        db_path = args.db or DB_PATH
+        init_db(db_path)
+
+    jobs = [
+        (path, ct, algo, db_path if args.cache else None, args.save)
+        for path in files for ct in cycle_times for algo in algorithms
+    ]
+
+    started = time.perf_counter()
+    keep = fmt == "parquet" or args.save
+    records: List[Dict[str, Any]] = []
+    failed = 0
+    out = sys.stdout if args.output == "-" else None
+    try:
+        if fmt == "jsonl" and out is None:
+            out = open(args.output, "w", encoding="utf-8")
+        for record in run_jobs(jobs, args.workers):
+            failed += record["status"] != "ok"
+            if fmt == "jsonl":
+                out.write(json.dumps({k: v for k, v in record.items() if k != "stations"}) + "\n")
+                out.flush()
+            if keep:
+                records.append(record)
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+
+    if fmt == "parquet":
+        write_parquet(records, args.output)
+    saved = save_records(records, db_path) if args.save else []
+
+    summary = f"Solved {len(jobs) - failed}/{len(jobs)} jobs ({len(files)} files) in {time.perf_counter() - started:.2f}s"
+    if args.save:
+        summary += f", saved {len(saved)} scenarios"
+    print(summary, file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    from .watch import DirectoryWatcher
+
+    if not os.path.isdir(args.directory):
+        print(f"error: Not a directory: {args.directory}", file=sys.stderr)
+        return 2
+    cycle_times = list(dict.fromkeys(ct for cts in args.cycle_times for ct in cts))
+    watcher = DirectoryWatcher(
+        args.directory, args.output, cycle_times, _algorithms(args.algorithms),
+        resolve=args.resolve, log=lambda msg: print(msg, file=sys.stderr, flush=True),
+    )
+    if args.once:
+        events = watcher.scan()
+        return 1 if any(e["action"] == "error" or e.get("failed") for e in events) else 0
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+COMMANDS = {"solve": cmd_solve, "watch": cmd_watch}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,275 @@
+"""
+columnar.py — Columnar (Parquet / Arrow) Solution Export & Import
+Writes a balancing result as four tables with a fixed schema:
+
+    tasks       task_id, task_name, duration, predecessors
+    assignment  solution_id, task_id, station_id, position
+    stations    solution_id, station_id, total_time, idle_time, task_count,
+                load_percent, is_bottleneck
+    energy      solution_id, station_id, idle_time, energy_kwh, cost, co2_kg
+
+Each table is one file inside a solution directory (`<table>.parquet` or
+`<table>.arrow`). Line-level values (cycle time, algorithm, line name,
+schema version) are stored in the schema metadata of every table.
+Arrow IPC files are memory-mapped on read, so loading them is zero-copy.
+
+Requires the optional `pyarrow` package.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .graph import PrecedenceGraph
+from .hashing import solution_hash
+from .metrics import bottleneck_score
+from .solution import build_stations
+
+SCHEMA_VERSION = 1
+TABLES = ("tasks", "assignment", "stations", "energy")
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:  # pragma: no cover - depends on environment
+        raise ImportError(
+            "Columnar export requires 'pyarrow'. Install it with: pip install pyarrow"
+        ) from e
+    return pa
+
+
+def table_schemas() -> Dict[str, Any]:
+    """The stable pyarrow schema of each table."""
+    pa = _require_pyarrow()
+    return {
+        "tasks": pa.schema([
+            ("task_id", pa.string()),
+            ("task_name", pa.string()),
+            ("duration", pa.float64()),
+            ("predecessors", pa.list_(pa.string())),
+        ]),
+        "assignment": pa.schema([
+            ("solution_id", pa.string()),
+            ("task_id", pa.string()),
+            ("station_id", pa.int32()),
+            ("position", pa.int32()),
+        ]),
+        "stations": pa.schema([
+            ("solution_id", pa.string()),
+            ("station_id", pa.int32()),
+            ("total_time", pa.float64()),
+            ("idle_time", pa.float64()),
+            ("task_count", pa.int32()),
+            ("load_percent", pa.float64()),
+            ("is_bottleneck", pa.bool_()),
+        ]),
+        "energy": pa.schema([
+            ("solution_id", pa.string()),
+            ("station_id", pa.int32()),
+            ("idle_time", pa.float64()),
+            ("energy_kwh", pa.float64()),
+            ("cost", pa.float64()),
+            ("co2_kg", pa.float64()),
+        ]),
+    }
+
+
+@dataclass
+class ColumnarSolution:
+    """Tables of one solution plus its line-level metadata."""
+    tables: Dict[str, Any]
+    cycle_time: float
+    algorithm: str = ""
+    line_name: str = ""
+    solution_id: str = ""
+    metadata: Dict[str, str] = field(default_factory=dict)
+
+    def graph(self) -> PrecedenceGraph:
+        """Rebuild the PrecedenceGraph from the tasks table."""
+        t = self.tables["tasks"]
+        g = PrecedenceGraph()
+        g.load_from_records(zip(
+            t.column("task_id").to_pylist(),
+            t.column("task_name").to_pylist(),
+            t.column("duration").to_pylist(),
+            t.column("predecessors").to_pylist(),
+        ))
+        return g
+
+    def assignment(self) -> List[List[str]]:
+        """Compact assignment ([[task_id, ...], ...]) from the assignment table."""
+        t = self.tables["assignment"].sort_by([("station_id", "ascending"), ("position", "ascending")])
+        out: List[List[str]] = []
+        for tid, sid in zip(t.column("task_id").to_pylist(), t.column("station_id").to_pylist()):
+            while len(out) < sid:
+                out.append([])
+            out[sid - 1].append(tid)
+        return out
+
+    def stations(self, graph: Optional[PrecedenceGraph] = None) -> List[Dict[str, Any]]:
+        """Solver-format station list."""
+        return build_stations(graph or self.graph(), self.assignment(), self.cycle_time)
+
+
+def solution_tables(
+    graph: PrecedenceGraph,
+    stations: List[Dict[str, Any]],
+    cycle_time: float,
+    energy_report=None,
+    algorithm: str = "",
+    line_name: str = "",
+) -> ColumnarSolution:
+    """Build the four Arrow tables for a solution (energy table is empty if no report)."""
+    pa = _require_pyarrow()
+    schemas = table_schemas()
+    sol_id = solution_hash(stations, cycle_time)
+    meta = {
+        "schema_version": str(SCHEMA_VERSION),
+        "cycle_time": repr(float(cycle_time)),
+        "algorithm": algorithm,
+        "line_name": line_name,
+        "solution_id": sol_id,
+    }
+
+    def table(name, columns):
+        schema = schemas[name].with_metadata({k: str(v) for k, v in meta.items()})
+        return pa.Table.from_pydict(columns, schema=schema)
+
+    ids = list(graph.tasks)
+    tasks = table("tasks", {
+        "task_id": ids,
+        "task_name": [graph.tasks[t]["name"] for t in ids],
+        "duration": [graph.tasks[t]["duration"] for t in ids],
+        "predecessors": [list(graph.predecessors[t]) for t in ids],
+    })
+
+    a_task, a_station, a_pos = [], [], []
+    for s in stations:
+        for pos, tid in enumerate(s["tasks"]):
+            a_task.append(tid)
+            a_station.append(s["station_id"])
+            a_pos.append(pos)
+    assignment = table("assignment", {
+        "solution_id": [sol_id] * len(a_task),
+        "task_id": a_task,
+        "station_id": a_station,
+        "position": a_pos,
+    })
+
+    scores = bottleneck_score(stations, cycle_time)
+    station_tbl = table("stations", {
+        "solution_id": [sol_id] * len(stations),
+        "station_id": [s["station_id"] for s in stations],
+        "total_time": [float(s["total_time"]) for s in stations],
+        "idle_time": [float(s["idle_time"]) for s in stations],
+        "task_count": [len(s["tasks"]) for s in stations],
+        "load_percent": [float(b["load_percent"]) for b in scores],
+        "is_bottleneck": [b["is_bottleneck"] for b in scores],
+    })
+
+    per_station = energy_report.per_station if energy_report is not None else []
+    energy = table("energy", {
+        "solution_id": [sol_id] * len(per_station),
+        "station_id": [d.station_id for d in per_station],
+        "idle_time": [float(d.idle_time) for d in per_station],
+        "energy_kwh": [d.energy_kwh for d in per_station],
+        "cost": [d.cost for d in per_station],
+        "co2_kg": [d.co2_kg for d in per_station],
+    })
+
+    return ColumnarSolution(
+        tables={"tasks": tasks, "assignment": assignment, "stations": station_tbl, "energy": energy},
+        cycle_time=float(cycle_time),
+        algorithm=algorithm,
+        line_name=line_name,
+        solution_id=sol_id,
+        metadata=meta,
+    )
+
+
+def write_solution(
+    dest_dir: str,
+    graph: PrecedenceGraph,
+    stations: List[Dict[str, Any]],
+    cycle_time: float,
+    energy_report=None,
+    algorithm: str = "",
+    line_name: str = "",
+    fmt: str = "parquet",
+) -> List[str]:
+    """
+    Write a solution as one file per table into dest_dir.
+
+    Args:
+        fmt : "parquet" (compressed, for storage) or "arrow" (IPC, zero-copy reads)
+
+    Returns:
+        Paths of the written files
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown columnar format '{fmt}'. Expected one of: {', '.join(FORMATS)}")
+    sol = solution_tables(graph, stations, cycle_time, energy_report, algorithm, line_name)
+    os.makedirs(dest_dir, exist_ok=True)
+
+    paths = []
+    for name in TABLES:
+        path = os.path.join(dest_dir, name + FORMATS[fmt])
+        _write_table(sol.tables[name], path, fmt)
+        paths.append(path)
+    return paths
+
+
+def _write_table(table, path: str, fmt: str) -> None:
+    pa = _require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_solution(src_dir: str) -> ColumnarSolution:
+    """
+    Load a solution directory written by write_solution().
+
+    Arrow IPC files are memory-mapped (zero-copy); Parquet files are decoded.
+
+    Raises:
+        FileNotFoundError: If a table file is missing
+        ValueError: If the schema version is newer than this reader
+    """
+    pa = _require_pyarrow()
+    tables = {}
+    for name in TABLES:
+        arrow_path = os.path.join(src_dir, name + FORMATS["arrow"])
+        parquet_path = os.path.join(src_dir, name + FORMATS["parquet"])
+        if os.path.exists(arrow_path):
+            # Closing the file keeps the mapping alive for as long as the table's buffers use it
+            with pa.memory_map(arrow_path, "r") as source:
+                tables[name] = pa.ipc.open_file(source).read_all()
+        elif os.path.exists(parquet_path):
+            import pyarrow.parquet as pq
+            tables[name] = pq.read_table(parquet_path)
+        else:
+            raise FileNotFoundError(f"Missing '{name}' table in {src_dir}")
+
+    raw = tables["tasks"].schema.metadata or {}
+    meta = {k.decode(): v.decode() for k, v in raw.items()}
+    version = int(meta.get("schema_version", SCHEMA_VERSION))
+    if version > SCHEMA_VERSION:
+        raise ValueError(
+            f"Solution schema version {version} is newer than supported ({SCHEMA_VERSION})."
+        )
+
+    return ColumnarSolution(
+        tables=tables,
+        cycle_time=float(meta.get("cycle_time", 0)),
+        algorithm=meta.get("algorithm", ""),
+        line_name=meta.get("line_name", ""),
+        solution_id=meta.get("solution_id", ""),
+        metadata=meta,
+    )
+
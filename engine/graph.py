@@ -3,9 +3,14 @@ graph.py — Precedence Relationship Graph (DAG)
 Models task dependencies as a Directed Acyclic Graph.
 """
 
-import pandas as pd
+import csv
 from collections import defaultdict, deque
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+if TYPE_CHECKING:  # pandas is only needed by callers that pass DataFrames
+    import pandas as pd
+
+MAX_REPORTED_ERRORS = 20
 
 
 class PrecedenceGraph:
@@ -27,40 +32,32 @@ class PrecedenceGraph:
     #  Data Loading
     # ------------------------------------------------------------------ #
 
-    def load_from_dataframe(self, df: pd.DataFrame) -> None:
+    def load_from_dataframe(self, df: "pd.DataFrame") -> None:
         """
         Load graph from a DataFrame.
         Expected columns: task_id, task_name, duration, predecessors
         predecessors column can be empty or a space-separated list of IDs.
         """
-        self._reset()
-
-        # Register tasks
-        for _, row in df.iterrows():
-            tid = str(row["task_id"]).strip()
-            self.tasks[tid] = {
-                "name": str(row["task_name"]).strip(),
-                "duration": float(row["duration"]),
-            }
-
-        # Build precedence edges
-        for _, row in df.iterrows():
-            tid = str(row["task_id"]).strip()
-            pred_raw = str(row.get("predecessors", "")).strip()
+        preds = df["predecessors"] if "predecessors" in df.columns else [""] * len(df)
+        self.load_from_records(zip(df["task_id"], df["task_name"], df["duration"], preds))
 
-            if pred_raw and pred_raw.lower() not in ("nan", "none", ""):
-                preds = pred_raw.split()
-                for p in preds:
-                    p = p.strip()
-                    if p and p in self.tasks:
-                        self.predecessors[tid].append(p)
-                        self.successors[p].append(tid)
-
-        self._validate()
+    def load_from_records(self, records: Iterable[Tuple], validate: bool = False) -> None:
+        """
+        Load graph from (task_id, task_name, duration, predecessors) tuples.
+        predecessors can be a space-separated string or a list of IDs;
+        references to unknown tasks are ignored.
+        validate=True checks the rows first (see validate_records).
+        """
+        if validate:
+            records = validate_records(records)
+        builder = GraphBuilder(self)
+        builder.add_records(records)
+        builder.build()
 
-    def load_from_csv(self, filepath: str) -> None:
-        df = pd.read_csv(filepath)
-        self.load_from_dataframe(df)
+    def load_from_csv(self, filepath: str, validate: bool = False) -> None:
+        """Load graph from a CSV file (same columns as load_from_dataframe)."""
+        with open(filepath, newline="", encoding="utf-8-sig") as f:
+            self.load_from_records(csv_records(f), validate=validate)
 
     def _reset(self):
         self.tasks.clear()
@@ -74,29 +71,14 @@ class PrecedenceGraph:
     # ------------------------------------------------------------------ #
 
     def _validate(self) -> None:
-        """Check for cycles (must be a DAG)."""
-        visited = set()
-        rec_stack = set()
-
-        def has_cycle(node):
-            visited.add(node)
-            rec_stack.add(node)
-            for succ in self.successors[node]:
-                if succ not in visited:
-                    if has_cycle(succ):
-                        return True
-                elif succ in rec_stack:
-                    return True
-            rec_stack.remove(node)
-            return False
-
-        for task in self.tasks:
-            if task not in visited:
-                if has_cycle(task):
-                    raise ValueError(
-                        "Cycle detected in precedence graph! "
-                        "Please check your data."
-                    )
+        """Check for cycles (must be a DAG). Iterative, safe for very deep graphs."""
+        try:
+            self.topological_sort()
+        except ValueError:
+            raise ValueError(
+                "Cycle detected in precedence graph! "
+                "Please check your data."
+            ) from None
 
     # ------------------------------------------------------------------ #
     #  Graph Metrics
@@ -132,23 +114,35 @@ class PrecedenceGraph:
         """
         RPW (Ranked Positional Weight) calculation:
         Task's own duration + longest path sum through all successors.
+        Only visits the task's descendants (iterative, safe for deep graphs).
         """
-        memo = {}
-
-        def _rpw(tid: str) -> float:
-            if tid in memo:
-                return memo[tid]
-            w = self.tasks[tid]["duration"]
-            if self.successors[tid]:
-                w += max(_rpw(s) for s in self.successors[tid])
-            memo[tid] = w
-            return w
-
-        return _rpw(task_id)
+        rpw: Dict[str, float] = {}
+        stack, entered = [task_id], set()
+        while stack:
+            tid = stack[-1]
+            if tid in rpw:  # reached again through another path
+                stack.pop()
+                continue
+            succ = self.successors[tid]
+            if tid not in entered:
+                entered.add(tid)
+                pending = [s for s in succ if s not in rpw]
+                if any(s in entered for s in pending):
+                    raise ValueError("Topological sort failed — cycle exists in graph.")
+                stack.extend(pending)
+                if pending:
+                    continue
+            stack.pop()
+            rpw[tid] = self.tasks[tid]["duration"] + (max(rpw[s] for s in succ) if succ else 0)
+        return rpw[task_id]
 
     def all_positional_weights(self) -> Dict[str, float]:
-        """Return RPW values for all tasks."""
-        return {tid: self.positional_weight(tid) for tid in self.tasks}
+        """Return RPW values for all tasks (one pass in reverse topological order)."""
+        rpw: Dict[str, float] = {}
+        for tid in reversed(self.topological_sort()):
+            succ = self.successors[tid]
+            rpw[tid] = self.tasks[tid]["duration"] + (max(rpw[s] for s in succ) if succ else 0)
+        return {tid: rpw[tid] for tid in self.tasks}
 
     def total_work_content(self) -> float:
         """Total work content (sum of all task durations)."""
@@ -161,3 +155,106 @@ class PrecedenceGraph:
             "entry_tasks": self.get_entry_tasks(),
             "exit_tasks": self.get_exit_tasks(),
         }
+
+
+def csv_records(f) -> Iterator[Tuple[str, str, str, str]]:
+    """(task_id, task_name, duration, predecessors) rows of an open task CSV."""
+    for r in csv.DictReader(f):
+        yield r["task_id"], r["task_name"], r["duration"], r.get("predecessors") or ""
+
+
+def validate_records(records: Iterable[Tuple]) -> List[Tuple[str, str, float, object]]:
+    """
+    Check (task_id, task_name, duration, predecessors) rows without pandas
+    (headless loads; the dashboard validates with data.parser).
+
+    Returns:
+        The rows with stripped task IDs and float durations
+
+    Raises:
+        ValueError: No tasks, a missing task_id, a non-numeric or
+                    non-positive duration, or duplicate task IDs
+    """
+    rows, errors, seen, duplicates = [], [], set(), {}
+    for i, (tid, name, duration, preds) in enumerate(records, start=1):
+        tid = "" if tid is None else str(tid).strip()
+        if not tid:
+            errors.append(f"Row {i}: missing task_id")
+            continue
+        try:
+            duration = float(duration)
+        except (TypeError, ValueError):
+            errors.append(f"Task '{tid}': duration '{duration}' is not a number")
+            continue
+        if not duration > 0:  # also rejects NaN
+            errors.append(f"Task '{tid}': duration must be positive")
+        if tid in seen:
+            duplicates[tid] = None
+        seen.add(tid)
+        rows.append((tid, name, duration, preds))
+
+    if not rows and not errors:
+        errors.append("No tasks — at least one task is required.")
+    if duplicates:
+        errors.append(f"Duplicate task IDs: {', '.join(list(duplicates)[:MAX_REPORTED_ERRORS])}")
+    if errors:
+        raise ValueError("Task data errors:\n" + "\n".join(f"  • {e}" for e in errors[:MAX_REPORTED_ERRORS]))
+    return rows
+
+
+def _split_predecessors(pred_raw) -> List[str]:
+    """Normalize a predecessors cell (string, list or NaN) to a list of IDs."""
+    if pred_raw is None:
+        return []
+    if isinstance(pred_raw, (list, tuple)):
+        return [str(p).strip() for p in pred_raw if str(p).strip()]
+    pred_raw = str(pred_raw).strip()
+    if not pred_raw or pred_raw.lower() in ("nan", "none"):
+        return []
+    return pred_raw.split()
+
+
+class GraphBuilder:
+    """
+    Builds a PrecedenceGraph incrementally from batches of records,
+    e.g. while a large CSV is streamed in chunks. Edges are linked once
+    every task is known, so predecessors may refer to later rows.
+    """
+
+    def __init__(self, graph: PrecedenceGraph = None):
+        self.graph = graph if graph is not None else PrecedenceGraph()
+        self.graph._reset()
+        self._pending: List[Tuple[str, List[str]]] = []
+
+    def add_records(self, records: Iterable[Tuple]) -> int:
+        """Register (task_id, task_name, duration, predecessors) tuples. Returns count added."""
+        tasks = self.graph.tasks
+        n = 0
+        for tid, name, duration, pred_raw in records:
+            tid = str(tid).strip()
+            tasks[tid] = {
+                "name": str(name).strip(),
+                "duration": float(duration),
+            }
+            preds = _split_predecessors(pred_raw)
+            if preds:
+                self._pending.append((tid, preds))
+            n += 1
+        return n
+
+    def unknown_predecessors(self) -> List[Tuple[str, str]]:
+        """(task_id, predecessor) pairs whose predecessor was never registered."""
+        tasks = self.graph.tasks
+        return [(tid, p) for tid, preds in self._pending for p in preds if p not in tasks]
+
+    def build(self) -> PrecedenceGraph:
+        """Link precedence edges and validate. Unknown predecessors are ignored."""
+        g = self.graph
+        for tid, preds in self._pending:
+            for p in preds:
+                if p in g.tasks:
+                    g.predecessors[tid].append(p)
+                    g.successors[p].append(tid)
+        self._pending = []
+        g._validate()
+        return g
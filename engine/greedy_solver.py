@@ -8,17 +8,22 @@ Steps:
 3. Open a new station when no more tasks fit
 """
 
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 from .graph import PrecedenceGraph
 
 
-def solve_greedy(graph: PrecedenceGraph, cycle_time: float) -> List[Dict[str, Any]]:
+def solve_greedy(
+    graph: PrecedenceGraph,
+    cycle_time: float,
+    progress: Optional[Callable[[List[Dict[str, Any]], int, int], None]] = None,
+) -> List[Dict[str, Any]]:
     """
     Solve line balancing using the Greedy (Largest Candidate Rule) algorithm.
 
     Args:
         graph      : PrecedenceGraph object
         cycle_time : Station cycle time
+        progress   : Called after each station as progress(stations, assigned, total)
 
     Returns:
         List of stations (same format as RPW solver)
@@ -93,5 +98,7 @@ def solve_greedy(graph: PrecedenceGraph, cycle_time: float) -> List[Dict[str, An
             "total_time": round(station_time, 4),
             "idle_time": round(cycle_time - station_time, 4),
         })
+        if progress is not None:
+            progress(stations, len(assigned), len(graph.tasks))
 
     return stations
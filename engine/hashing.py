@@ -0,0 +1,61 @@
+"""
+hashing.py — Content Hashes for Cache Keys
+Stable, order-sensitive digests of task graphs, stations and solutions.
+
+Hashes only depend on the data that affects derived output (task IDs,
+names, durations, precedence edges, cycle time), so identical content
+always maps to the same key across reruns, sessions and processes.
+Task order is part of the hash because solver tie-breaking follows it.
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+def parts_hash(parts: Iterable[Any]) -> str:
+    """
+    Hash of a sequence of values (compared by repr, in order). Use it to
+    build composite cache keys, e.g. parts_hash([graph_hash(g), ct, algo]).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(repr(part).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def bytes_hash(data) -> str:
+    """Hash of raw bytes (file contents, uploads); accepts any buffer."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def station_hash(station: Dict[str, Any], cycle_time: float) -> str:
+    """Hash of a single station's task list (id, name, duration) and cycle time."""
+    return parts_hash(
+        [float(cycle_time)]
+        + [(t["id"], t["name"], float(t["duration"])) for t in station["task_details"]]
+    )
+
+
+def solution_hash(stations: List[Dict[str, Any]], cycle_time: float) -> str:
+    """Hash of a full solution (every station, in order) and cycle time."""
+    return parts_hash(
+        [float(cycle_time)]
+        + [(s["station_id"], station_hash(s, cycle_time)) for s in stations]
+    )
+
+
+def task_rows_hash(rows: Iterable[Tuple[str, str, float, Sequence[str]]]) -> str:
+    """Hash of (task_id, task_name, duration, [predecessor, ...]) rows, in order."""
+    return parts_hash(
+        (str(tid), str(name), float(duration), tuple(preds))
+        for tid, name, duration, preds in rows
+    )
+
+
+def graph_hash(graph) -> str:
+    """Hash of a PrecedenceGraph's tasks (insertion order) and edges."""
+    return task_rows_hash(
+        (tid, info["name"], info["duration"], graph.predecessors.get(tid, []))
+        for tid, info in graph.tasks.items()
+    )
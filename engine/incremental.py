@@ -0,0 +1,144 @@
+"""
+incremental.py — Incremental Graph Updates
+Diffs two versions of a task graph, applies only the differences to the
+loaded graph, and repairs an existing line balance instead of re-solving
+it when the change allows.
+
+A repair keeps the previous task→station assignment and rebuilds only the
+stations whose tasks changed, so operators keep their work instructions
+for every station the change didn't touch. It is possible when no task
+was added or removed, every new edge is still respected by the station
+order, and every changed station still fits the cycle time.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .graph import PrecedenceGraph
+from .solution import build_stations, stations_to_assignment
+
+Edge = Tuple[str, str]  # (predecessor, task)
+
+
+@dataclass
+class GraphDiff:
+    """Differences between two versions of a graph (old -> new)."""
+    added: Dict[str, Dict[str, Any]] = field(default_factory=dict)    # task_id -> {"name", "duration"}
+    removed: List[str] = field(default_factory=list)
+    durations: Dict[str, float] = field(default_factory=dict)         # task_id -> new duration
+    names: Dict[str, str] = field(default_factory=dict)               # task_id -> new name
+    edges_added: List[Edge] = field(default_factory=list)
+    edges_removed: List[Edge] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.durations or self.names
+                    or self.edges_added or self.edges_removed)
+
+    def affected_tasks(self) -> Set[str]:
+        """Existing tasks whose data or predecessors changed."""
+        return set(self.durations) | set(self.names) | {t for _, t in self.edges_added + self.edges_removed}
+
+    def summary(self) -> str:
+        parts = [
+            (len(self.added), "task(s) added"), (len(self.removed), "task(s) removed"),
+            (len(self.durations), "duration(s)"), (len(self.names), "name(s)"),
+            (len(self.edges_added), "edge(s) added"), (len(self.edges_removed), "edge(s) removed"),
+        ]
+        return ", ".join(f"{n} {label}" for n, label in parts if n) or "no changes"
+
+
+def diff_graphs(old: PrecedenceGraph, new: PrecedenceGraph) -> GraphDiff:
+    """Compare tasks, durations, names and precedence edges of two graphs."""
+    diff = GraphDiff()
+    for tid, info in new.tasks.items():
+        before = old.tasks.get(tid)
+        if before is None:
+            diff.added[tid] = dict(info)
+            continue
+        if before["duration"] != info["duration"]:
+            diff.durations[tid] = info["duration"]
+        if before["name"] != info["name"]:
+            diff.names[tid] = info["name"]
+    diff.removed = [tid for tid in old.tasks if tid not in new.tasks]
+
+    for tid in new.tasks:
+        old_preds = set(old.predecessors.get(tid, ())) if tid in old.tasks else set()
+        new_preds = new.predecessors.get(tid, ())
+        diff.edges_added.extend((p, tid) for p in new_preds if p not in old_preds)
+        if old_preds:
+            new_set = set(new_preds)
+            diff.edges_removed.extend((p, tid) for p in old.predecessors[tid] if p not in new_set)
+    return diff
+
+
+def apply_diff(graph: PrecedenceGraph, diff: GraphDiff) -> PrecedenceGraph:
+    """
+    Apply a diff to graph in place (new tasks are appended) and validate it.
+
+    Raises:
+        ValueError: If the result has a cycle (the graph is left modified)
+    """
+    for tid in diff.removed:
+        graph.tasks.pop(tid, None)
+        for p in graph.predecessors.pop(tid, []):
+            if tid in graph.successors.get(p, ()):
+                graph.successors[p].remove(tid)
+        for s in graph.successors.pop(tid, []):
+            if tid in graph.predecessors.get(s, ()):
+                graph.predecessors[s].remove(tid)
+
+    for tid, info in diff.added.items():
+        graph.tasks[tid] = {"name": info["name"], "duration": info["duration"]}
+    for tid, duration in diff.durations.items():
+        graph.tasks[tid]["duration"] = duration
+    for tid, name in diff.names.items():
+        graph.tasks[tid]["name"] = name
+
+    for p, tid in diff.edges_removed:
+        if p in graph.tasks and tid in graph.tasks:
+            graph.predecessors[tid].remove(p)
+            graph.successors[p].remove(tid)
+    for p, tid in diff.edges_added:
+        graph.predecessors[tid].append(p)
+        graph.successors[p].append(tid)
+
+    if diff.removed or diff.edges_added:
+        graph._validate()
+    return graph
+
+
+def repair_stations(
+    graph: PrecedenceGraph,
+    stations: List[Dict[str, Any]],
+    cycle_time: float,
+    diff: GraphDiff,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Update a solution for an applied diff without re-solving.
+
+    Args:
+        graph    : The graph after the diff (apply_diff() or the reloaded graph)
+        stations : Previous solution (on the graph before the diff)
+
+    Returns:
+        The repaired station list (untouched stations are reused as-is),
+        or None if the previous assignment no longer works and the line
+        has to be re-solved
+    """
+    if diff.added or diff.removed:
+        return None
+    assignment = stations_to_assignment(stations)
+    position = {tid: (i, j) for i, tasks in enumerate(assignment) for j, tid in enumerate(tasks)}
+    if any(position[p] > position[tid] for p, tid in diff.edges_added):
+        return None
+
+    changed = {position[tid][0] for tid in set(diff.durations) | set(diff.names)}
+    repaired = sorted(stations, key=lambda s: s["station_id"])
+    for i in changed:
+        station = build_stations(graph, [assignment[i]], cycle_time)[0]
+        if station["total_time"] > cycle_time + 1e-9:
+            return None
+        station["station_id"] = i + 1
+        repaired[i] = station
+    return repaired
@@ -0,0 +1,148 @@
+"""
+jes_export.py — Bulk JES Archive Export
+Streams Markdown and HTML work instructions for every station into a ZIP.
+
+Stations are rendered in parallel on a thread pool, but only a bounded
+window of rendered documents is held in memory at any time; documents are
+written to the archive in station order as soon as they are ready.
+
+Headless usage:
+    python -m engine.jes_export sample_tasks.csv --cycle-time 15 -o jes.zip
+"""
+
+import argparse
+import html
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+from .jes_generator import (
+    format_jes_html,
+    format_jes_markdown,
+    generate_station_jes,
+    jes_timestamp,
+)
+
+FORMATS = ("md", "html")
+
+
+def _render_station(
+    station: Dict[str, Any],
+    cycle_time: float,
+    line_name: str,
+    generated_at: str,
+    formats: Sequence[str],
+) -> List[Tuple[str, bytes]]:
+    jes = generate_station_jes(station, cycle_time, line_name, generated_at)
+    sid = station["station_id"]
+    docs = []
+    if "md" in formats:
+        docs.append((f"md/JES_Station_{sid}.md", format_jes_markdown(jes).encode("utf-8")))
+    if "html" in formats:
+        docs.append((f"html/JES_Station_{sid}.html", format_jes_html(jes).encode("utf-8")))
+    return docs
+
+
+def _index_html(station_ids: List[int], line_name: str, generated_at: str) -> str:
+    links = "".join(
+        f'<li><a href="JES_Station_{sid}.html">Station {sid}</a></li>' for sid in station_ids
+    )
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Work Instructions</title></head>'
+        f"<body><h1>{html.escape(line_name)}</h1><p>Generated {html.escape(generated_at)}</p>"
+        f"<ul>{links}</ul></body></html>\n"
+    )
+
+
+def export_jes_archive(
+    stations: List[Dict[str, Any]],
+    cycle_time: float,
+    dest: Union[str, BinaryIO],
+    line_name: str = "Main Assembly Line",
+    generated_at: Optional[str] = None,
+    formats: Sequence[str] = FORMATS,
+    max_workers: Optional[int] = None,
+) -> int:
+    """
+    Write JES documents for all stations into a ZIP archive.
+
+    Args:
+        stations     : Solver output
+        cycle_time   : Cycle time
+        dest         : Output path or writable binary file object
+        line_name    : Line name (for JES header)
+        generated_at : Header timestamp (default: now, same for every station)
+        formats      : Any of "md", "html"
+        max_workers  : Render threads (default: min(8, CPU count))
+
+    Returns:
+        Number of documents written (index excluded)
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown JES format(s): {', '.join(sorted(unknown))}")
+    if generated_at is None:
+        generated_at = jes_timestamp()
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+
+    # At most `window` stations are rendered-but-unwritten at any time
+    window = max_workers * 4
+    written = 0
+
+    with zipfile.ZipFile(dest, "w", compression=zipfile.ZIP_DEFLATED) as zf, \
+            ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for station in stations:
+            pending.append(pool.submit(_render_station, station, cycle_time, line_name, generated_at, formats))
+            if len(pending) >= window:
+                for arcname, data in pending.popleft().result():
+                    zf.writestr(arcname, data)
+                    written += 1
+        while pending:
+            for arcname, data in pending.popleft().result():
+                zf.writestr(arcname, data)
+                written += 1
+
+        if "html" in formats:
+            ids = [s["station_id"] for s in stations]
+            zf.writestr("html/index.html", _index_html(ids, line_name, generated_at))
+
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .graph import PrecedenceGraph
+    from .greedy_solver import solve_greedy
+    from .rpw_solver import solve_rpw
+
+    parser = argparse.ArgumentParser(description="Export JES work instructions for all stations as a ZIP.")
+    parser.add_argument("csv", help="Task CSV (task_id, task_name, duration, predecessors)")
+    parser.add_argument("--cycle-time", "-c", type=float, required=True)
+    parser.add_argument("--algorithm", "-a", choices=["rpw", "greedy"], default="rpw")
+    parser.add_argument("--output", "-o", default="jes_export.zip")
+    parser.add_argument("--line-name", default="Main Assembly Line")
+    parser.add_argument("--format", dest="formats", action="append", choices=list(FORMATS),
+                        help="Repeat to select formats (default: all)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    graph = PrecedenceGraph()
+    graph.load_from_csv(args.csv)
+    solve = solve_rpw if args.algorithm == "rpw" else solve_greedy
+    stations = solve(graph, args.cycle_time)
+
+    n = export_jes_archive(
+        stations, args.cycle_time, args.output,
+        line_name=args.line_name,
+        formats=args.formats or FORMATS,
+        max_workers=args.workers,
+    )
+    print(f"Wrote {n} documents for {len(stations)} stations to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,23 +5,38 @@ Ciano et al. (2021) — Operator 4.0 digital work instructions.
 Generates step-by-step, timed work instructions for each station.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import html
 
+from .cache import LRUCache
+from .hashing import station_hash
+
+
+# Steps depend only on the station's task list and cycle time, so they are
+# memoized by content hash and shared across reruns and sessions.
+_STEPS_CACHE = LRUCache(maxsize=4096)
+
+
+def jes_timestamp() -> str:
+    """Timestamp shown in the JES header. Take it once per solve."""
+    return datetime.now().strftime("%Y-%m-%d %H:%M")
+
 
 def generate_jes(
     stations: List[Dict[str, Any]],
     cycle_time: float,
     line_name: str = "Main Assembly Line",
+    generated_at: Optional[str] = None,
 ) -> Dict[int, Dict[str, Any]]:
     """
     Generate JES data for all stations.
 
     Args:
-        stations   : Solver output
-        cycle_time : Cycle time
-        line_name  : Line name (for JES header)
+        stations     : Solver output
+        cycle_time   : Cycle time
+        line_name    : Line name (for JES header)
+        generated_at : Header timestamp (default: now, taken once for all stations)
 
     Returns:
         {
@@ -47,43 +62,69 @@ def generate_jes(
             }
         }
     """
-    all_jes = {}
-
-    for station in stations:
-        sid = station["station_id"]
-        steps = []
-        cumulative = 0.0
-
-        for i, task in enumerate(station["task_details"], start=1):
-            cumulative += task["duration"]
-            remaining = round(cycle_time - cumulative, 4)
-
-            # Auto-generate key points
-            key_points = _auto_key_points(task, i, len(station["task_details"]))
-
-            steps.append({
-                "step": i,
-                "task_id": task["id"],
-                "task_name": task["name"],
-                "duration": task["duration"],
-                "cumulative_time": round(cumulative, 4),
-                "remaining_time": max(remaining, 0),
-                "key_points": key_points,
-            })
-
-        utilization = round((station["total_time"] / cycle_time) * 100, 1) if cycle_time > 0 else 0
-
-        all_jes[sid] = {
-            "station_id": sid,
-            "line_name": line_name,
-            "cycle_time": cycle_time,
-            "total_time": station["total_time"],
-            "utilization_pct": utilization,
-            "steps": steps,
-            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        }
+    if generated_at is None:
+        generated_at = jes_timestamp()
+
+    return {
+        station["station_id"]: generate_station_jes(station, cycle_time, line_name, generated_at)
+        for station in stations
+    }
+
+
+def generate_station_jes(
+    station: Dict[str, Any],
+    cycle_time: float,
+    line_name: str = "Main Assembly Line",
+    generated_at: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Generate JES data for a single station (same format as one generate_jes() entry).
+
+    Steps are cached by station_hash(station, cycle_time); the returned
+    "steps" list is shared between callers and must not be mutated.
+    """
+    key = station_hash(station, cycle_time)
+    steps = _STEPS_CACHE.get(key)
+    if steps is None:
+        steps = _build_steps(station, cycle_time)
+        _STEPS_CACHE.put(key, steps)
+
+    utilization = round((station["total_time"] / cycle_time) * 100, 1) if cycle_time > 0 else 0
+
+    return {
+        "station_id": station["station_id"],
+        "line_name": line_name,
+        "cycle_time": cycle_time,
+        "total_time": station["total_time"],
+        "utilization_pct": utilization,
+        "steps": steps,
+        "generated_at": generated_at if generated_at is not None else jes_timestamp(),
+    }
+
+
+def _build_steps(station: Dict[str, Any], cycle_time: float) -> List[Dict[str, Any]]:
+    steps = []
+    cumulative = 0.0
+    total_steps = len(station["task_details"])
 
-    return all_jes
+    for i, task in enumerate(station["task_details"], start=1):
+        cumulative += task["duration"]
+        remaining = round(cycle_time - cumulative, 4)
+
+        # Auto-generate key points
+        key_points = _auto_key_points(task, i, total_steps)
+
+        steps.append({
+            "step": i,
+            "task_id": task["id"],
+            "task_name": task["name"],
+            "duration": task["duration"],
+            "cumulative_time": round(cumulative, 4),
+            "remaining_time": max(remaining, 0),
+            "key_points": key_points,
+        })
+
+    return steps
 
 
 def format_jes_markdown(jes_data: Dict[str, Any]) -> str:
@@ -147,6 +188,53 @@ def format_jes_markdown(jes_data: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def format_jes_html(jes_data: Dict[str, Any]) -> str:
+    """
+    Convert a single station's JES data to a standalone HTML page
+    (for shop-floor tablets; no external assets).
+
+    Args:
+        jes_data: Single station dict from generate_jes() output
+
+    Returns:
+        HTML string
+    """
+    sid = jes_data["station_id"]
+    pct = jes_data["utilization_pct"]
+    esc = html.escape
+
+    rows = []
+    for step in jes_data["steps"]:
+        kp = f'<div class="kp">📌 {esc(str(step["key_points"]))}</div>' if step["key_points"] else ""
+        rows.append(
+            f'<li><div class="h"><b>Step {step["step"]}: {esc(str(step["task_name"]))}</b>'
+            f'<span>⏱️ {step["duration"]} sec</span></div>'
+            f'<div class="d">ID: <code>{esc(str(step["task_id"]))}</code> · '
+            f'Σ {step["cumulative_time"]} / {jes_data["cycle_time"]} sec · '
+            f'Remaining: {step["remaining_time"]} sec</div>{kp}</li>'
+        )
+
+    return (
+        "<!DOCTYPE html>\n"
+        f'<html><head><meta charset="utf-8"><title>Station {sid} — Work Instructions</title>'
+        "<style>body{font-family:sans-serif;margin:1.5rem;}li{margin-bottom:.8rem;}"
+        ".h{display:flex;justify-content:space-between;}.d{color:#555;font-size:.9rem;}"
+        ".kp{color:#b45309;font-size:.9rem;}.bar{background:#e5e7eb;height:8px;}"
+        ".bar div{background:#6366f1;height:8px;}</style></head><body>"
+        f"<h1>🏭 Work Instructions — Station {sid}</h1>"
+        "<table>"
+        f"<tr><th>Line</th><td>{esc(str(jes_data['line_name']))}</td></tr>"
+        f"<tr><th>Cycle Time</th><td>{jes_data['cycle_time']} sec</td></tr>"
+        f"<tr><th>Station Load</th><td>{jes_data['total_time']} sec</td></tr>"
+        f"<tr><th>Utilization</th><td>{pct}%</td></tr>"
+        f"<tr><th>Generated</th><td>{esc(str(jes_data['generated_at']))}</td></tr>"
+        "</table>"
+        f'<div class="bar"><div style="width:{min(pct, 100)}%;"></div></div>'
+        f"<h2>📋 Work Steps</h2><ol>{''.join(rows)}</ol>"
+        "</body></html>\n"
+    )
+
+
 def _auto_key_points(task: Dict, step_num: int, total_steps: int) -> str:
     """Generate automatic tips/warnings based on the task."""
     points = []
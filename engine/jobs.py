@@ -0,0 +1,138 @@
+"""
+jobs.py — Background Job Manager
+Runs long computations (solves) on a thread pool, identified by job IDs.
+
+Jobs are deduplicated by a caller-supplied key: submitting a key that is
+already queued, running or recently completed returns the existing job, so
+reruns with unchanged inputs never start the work again (failed jobs are
+not reused; the next submit retries). Job functions get a
+`progress(fraction, partial=None)` callback that pollers can read.
+
+Submitters can name an owner (e.g. a session) and release the job when
+they no longer need it; a queued job that nobody owns any more is
+cancelled before it starts.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from .cache import LRUCache
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "failed", "cancelled"
+
+
+@dataclass
+class Job:
+    """State of one background job (updated by the worker thread)."""
+    job_id: str
+    key: Hashable
+    status: str = PENDING
+    progress: float = 0.0
+    partial: Any = None
+    result: Any = None
+    error: Optional[BaseException] = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    owners: Set[Hashable] = field(default_factory=set, repr=False)
+    _future: Optional[Future] = field(default=None, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes (or timeout); True if finished."""
+        return self._done.wait(timeout)
+
+
+class JobManager:
+    """
+    Thread-pool job runner with key-based deduplication.
+
+    Args:
+        max_workers  : Worker threads
+        keep_finished: Finished jobs remembered for dedup/polling
+        finished_ttl : Seconds a completed job stays reusable (failed jobs
+                       can still be polled, but are never reused)
+    """
+
+    def __init__(self, max_workers: int = 2, keep_finished: int = 256, finished_ttl: float = 600):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alb-job")
+        self._lock = threading.Lock()
+        self._active: Dict[Hashable, Job] = {}
+        self._active_ids: Dict[str, Job] = {}
+        self._finished = LRUCache(maxsize=keep_finished, ttl=finished_ttl)      # key -> job
+        self._finished_ids = LRUCache(maxsize=keep_finished, ttl=finished_ttl)  # job_id -> job
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args, owner: Hashable = None, **kwargs) -> Job:
+        """
+        Run fn(*args, progress=callback, **kwargs) in the background, unless a
+        job for key is already in flight or recently completed. owner is
+        recorded for release(); jobs submitted without one are never cancelled.
+        """
+        with self._lock:
+            job = self._active.get(key) or self._finished.get(key)
+            if job is None:
+                job = Job(job_id=uuid.uuid4().hex, key=key)
+                self._active[key] = job
+                self._active_ids[job.job_id] = job
+                job._future = self._pool.submit(self._run, job, fn, args, kwargs)
+            if not job.finished:
+                job.owners.add(owner)
+            return job
+
+    def release(self, job_id: str, owner: Hashable) -> bool:
+        """
+        owner no longer needs the job. If nobody else submitted it and it
+        hasn't started yet, it is cancelled. Returns True if it was cancelled.
+        """
+        with self._lock:
+            job = self._active_ids.get(job_id)
+            if job is None:
+                return False
+            job.owners.discard(owner)
+            if job.owners or job.status != PENDING or not job._future.cancel():
+                return False
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            self._active.pop(job.key, None)
+            self._active_ids.pop(job.job_id, None)
+            self._finished_ids.put(job.job_id, job)
+        job._done.set()
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job by ID, while it is running or remembered as finished."""
+        with self._lock:
+            return self._active_ids.get(job_id) or self._finished_ids.get(job_id)
+
+    def _run(self, job: Job, fn, args, kwargs) -> None:
+        def progress(fraction: float, partial: Any = None) -> None:
+            job.progress = fraction
+            if partial is not None:
+                job.partial = partial
+
+        job.status = RUNNING
+        try:
+            job.result = fn(*args, progress=progress, **kwargs)
+            job.progress = 1.0
+            job.status = DONE
+        except BaseException as e:
+            job.error = e
+            job.status = FAILED
+        job.finished_at = time.time()
+        with self._lock:
+            self._active.pop(job.key, None)
+            self._active_ids.pop(job.job_id, None)
+            if job.status == DONE:
+                self._finished.put(job.key, job)  # failures are retried by the next submit
+            self._finished_ids.put(job.job_id, job)
+        job._done.set()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
@@ -8,17 +8,23 @@ Steps:
 3. Assign to stations sequentially — respecting cycle time and precedence
 """
 
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 from .graph import PrecedenceGraph
 
 
-def solve_rpw(graph: PrecedenceGraph, cycle_time: float) -> List[Dict[str, Any]]:
+def solve_rpw(
+    graph: PrecedenceGraph,
+    cycle_time: float,
+    progress: Optional[Callable[[List[Dict[str, Any]], int, int], None]] = None,
+) -> List[Dict[str, Any]]:
     """
     Solve line balancing using the RPW algorithm.
 
     Args:
         graph      : PrecedenceGraph object (tasks + precedences loaded)
         cycle_time : Station cycle time (takt time)
+        progress   : Called after each station as progress(stations, assigned, total);
+                     `stations` is the live list built so far
 
     Returns:
         stations: [
@@ -94,5 +100,7 @@ def solve_rpw(graph: PrecedenceGraph, cycle_time: float) -> List[Dict[str, Any]]
             "total_time": round(station_time, 4),
             "idle_time": round(cycle_time - station_time, 4),
         })
+        if progress is not None:
+            progress(stations, len(assigned), len(graph.tasks))
 
     return stations
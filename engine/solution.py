@@ -0,0 +1,57 @@
+"""
+solution.py — Compact Solution Representation
+Converts between solver output (station dicts) and a compact assignment:
+one list of task IDs per station, in station order.
+
+The compact form is what gets stored, cached and exported; the full
+station dicts are rebuilt from it with the task data of the graph.
+"""
+
+from typing import Any, Dict, List
+
+from .graph import PrecedenceGraph
+
+
+def stations_to_assignment(stations: List[Dict[str, Any]]) -> List[List[str]]:
+    """Station dicts -> [[task_id, ...], ...] in station order."""
+    return [list(s["tasks"]) for s in sorted(stations, key=lambda s: s["station_id"])]
+
+
+def build_stations(
+    graph: PrecedenceGraph,
+    assignment: List[List[str]],
+    cycle_time: float,
+) -> List[Dict[str, Any]]:
+    """
+    Rebuild solver output from a compact assignment.
+
+    Args:
+        graph      : PrecedenceGraph holding the task names and durations
+        assignment : [[task_id, ...], ...] — station i+1 gets assignment[i]
+        cycle_time : Station cycle time
+
+    Returns:
+        List of stations (same format as the RPW solver)
+
+    Raises:
+        ValueError: If the assignment references an unknown task
+    """
+    stations = []
+    for i, task_ids in enumerate(assignment, start=1):
+        details = []
+        station_time = 0.0
+        for tid in task_ids:
+            info = graph.tasks.get(tid)
+            if info is None:
+                raise ValueError(f"Assignment references unknown task '{tid}'.")
+            details.append({"id": tid, "name": info["name"], "duration": info["duration"]})
+            station_time += info["duration"]
+
+        stations.append({
+            "station_id": i,
+            "tasks": list(task_ids),
+            "task_details": details,
+            "total_time": round(station_time, 4),
+            "idle_time": round(cycle_time - station_time, 4),
+        })
+    return stations
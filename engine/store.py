@@ -0,0 +1,231 @@
+"""
+store.py — Shared Result Store
+Process-wide store for large results (task frames, graphs, solutions),
+keyed by content hash and shared by every session.
+
+Entries are reference counted: a holder acquire()s the keys it uses and
+release()s them when done. Unreferenced entries are evicted least recently
+used first once the store exceeds its memory budget, or once they have been
+idle for longer than the TTL. Referenced entries are never evicted, so
+memory grows with the number of distinct inputs in use, not with the
+number of sessions.
+"""
+
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Containers larger than this are sized from a sample of their items
+_SAMPLE = 64
+
+
+def estimate_size(obj: Any, _depth: int = 0) -> int:
+    """
+    Approximate deep size of obj in bytes.
+
+    Uses memory_usage(deep=True) for DataFrames, and samples large
+    containers instead of walking every item, so sizing stays cheap for
+    million-row inputs.
+    """
+    if _depth > 6:
+        return sys.getsizeof(obj)
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):  # pandas DataFrame
+        return int(obj.memory_usage(deep=True).sum())
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        items = list(obj.items()) if len(obj) <= _SAMPLE else [kv for _, kv in zip(range(_SAMPLE), obj.items())]
+        part = sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in items)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = list(obj) if len(obj) <= _SAMPLE else [x for _, x in zip(range(_SAMPLE), obj)]
+        part = sum(estimate_size(x, _depth + 1) for x in items)
+    elif hasattr(obj, "__dict__"):
+        return size + estimate_size(vars(obj), _depth + 1)
+    else:
+        return size
+    n = len(obj)
+    return size + (part * n // len(items) if items else 0)
+
+
+class ResultStore:
+    """
+    Reference-counted, memory-bounded LRU store.
+
+    Args:
+        budget_bytes : Target total size of all entries
+        ttl          : Seconds an unreferenced entry may sit unused (None = no limit)
+    """
+
+    def __init__(self, budget_bytes: int, ttl: Optional[float] = None):
+        self.budget_bytes = budget_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, list]" = OrderedDict()  # key -> [value, size, refs, last_used]
+        self._size = 0
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._touch(key, entry)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        """Store value (replacing any previous value, keeping its references)."""
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            old = self._entries.get(key)
+            refs = 0
+            if old is not None:
+                self._size -= old[1]
+                refs = old[2]
+            self._entries[key] = [value, size, refs, time.monotonic()]
+            self._entries.move_to_end(key)
+            self._size += size
+            self._evict()
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Cached value for key, computing and storing factory() on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def acquire(self, key: Hashable, value: Any = None) -> Any:
+        """
+        Add a reference to key (pinning it), re-storing value if the entry
+        was evicted meanwhile. Returns the stored value.
+
+        Raises:
+            KeyError: If key is not stored and no value is given
+        """
+        with self._lock:
+            if key not in self._entries:
+                if value is None:
+                    raise KeyError(key)
+                self.put(key, value)
+            entry = self._entries[key]
+            entry[2] += 1
+            self._touch(key, entry)
+            return entry[0]
+
+    def release(self, key: Hashable) -> None:
+        """Drop a reference; the entry becomes evictable at zero."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > 0:
+                entry[2] -= 1
+                entry[3] = time.monotonic()
+                self._evict()
+
+    def refcount(self, key: Hashable) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[2] if entry is not None else 0
+
+    def _touch(self, key: Hashable, entry: list) -> None:
+        entry[3] = time.monotonic()
+        self._entries.move_to_end(key)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if entry[2] > 0:
+                continue
+            expired = self.ttl is not None and now - entry[3] > self.ttl
+            if self._size <= self.budget_bytes and not expired:
+                continue
+            del self._entries[key]
+            self._size -= entry[1]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "pinned": sum(1 for e in self._entries.values() if e[2] > 0),
+                "size_bytes": self._size,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _release_all(store: ResultStore, slots: Dict[str, Hashable]) -> None:
+    for key in slots.values():
+        store.release(key)
+    slots.clear()
+
+
+class StoreRefs:
+    """
+    Named references into a ResultStore, held by one client (e.g. a session).
+
+    Each slot holds at most one key; assigning a new key releases the old
+    one. All references are released when the object is garbage collected.
+    """
+
+    def __init__(self, store: ResultStore):
+        self.store = store
+        self._slots: Dict[str, Hashable] = {}
+        self._lock = threading.Lock()
+        weakref.finalize(self, _release_all, store, self._slots)
+
+    def hold(self, slot: str, key: Hashable, value: Any = None) -> Any:
+        """Point slot at key (acquiring it) and return the stored value."""
+        with self._lock:
+            old = self._slots.get(slot)
+            if old == key:
+                return self.store.get(key) if value is None else value
+            stored = self.store.acquire(key, value)
+            self._slots[slot] = key
+        if old is not None:
+            self.store.release(old)
+        return stored
+
+    def get(self, slot: str, default: Any = None) -> Any:
+        """Value held in slot (None if the slot is empty)."""
+        key = self._slots.get(slot)
+        if key is None:
+            return default
+        return self.store.get(key, default)
+
+    def key(self, slot: str) -> Optional[Hashable]:
+        return self._slots.get(slot)
+
+    def drop(self, slot: str) -> None:
+        with self._lock:
+            key = self._slots.pop(slot, None)
+        if key is not None:
+            self.store.release(key)
+
+    def close(self) -> None:
+        with self._lock:
+            _release_all(self.store, self._slots)
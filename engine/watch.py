@@ -0,0 +1,245 @@
+"""
+watch.py — Directory Watch Mode
+Monitors a directory of task CSVs (e.g. files dropped by the MES) and keeps
+balancing results and JES work instructions up to date.
+
+Each poll only stats the files; a file is read when its size or mtime
+changed, and reprocessed only when its content hash changed. A changed
+file is validated and diffed against the graph loaded for that line; the
+new graph replaces the old one (so task order always follows the file),
+and the diff decides whether each (cycle time, algorithm) solution can
+be repaired in place (see incremental.py) or has to be re-solved. JES
+documents are rewritten only for stations whose content changed, so the
+work per poll follows what changed, not how many lines are watched.
+
+Output layout (per line = CSV file name without extension):
+    <out>/<line>/<algo>_ct<cycle time>/result.json
+    <out>/<line>/<algo>_ct<cycle time>/station_<id>.md
+
+Headless usage:
+    python -m engine watch incoming/ -c 15 -c 20 -a rpw -o results/
+"""
+
+import io
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .graph import PrecedenceGraph, csv_records
+from .greedy_solver import solve_greedy
+from .hashing import bytes_hash, graph_hash, station_hash
+from .incremental import diff_graphs, repair_stations
+from .jes_generator import format_jes_markdown, generate_station_jes, jes_timestamp
+from .metrics import compute_all_metrics
+from .rpw_solver import solve_rpw
+from .solution import stations_to_assignment
+
+SOLVERS = {
+    "rpw": solve_rpw,
+    "greedy": solve_greedy,
+}
+
+
+@dataclass
+class LineState:
+    """What is loaded for one watched file."""
+    path: str
+    signature: Tuple[int, int]                  # (mtime_ns, size) at the last read
+    content_hash: str = ""
+    graph: Optional[PrecedenceGraph] = None
+    solutions: Dict[Tuple[float, str], List[Dict[str, Any]]] = field(default_factory=dict)
+
+
+def _write_atomic(path: str, data: str) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class DirectoryWatcher:
+    """
+    Keeps results for every *.csv in a directory up to date.
+
+    Args:
+        directory   : Directory to watch (not recursive)
+        out_dir     : Where results and JES are written
+        cycle_times : Cycle times to balance every line for
+        algorithms  : Keys of SOLVERS
+        resolve     : Always re-solve changed lines instead of repairing
+        log         : Called with one message per processed change
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        out_dir: str,
+        cycle_times: Sequence[float],
+        algorithms: Sequence[str] = ("rpw",),
+        resolve: bool = False,
+        log: Callable[[str], None] = print,
+    ):
+        unknown = [a for a in algorithms if a not in SOLVERS]
+        if unknown:
+            raise ValueError(f"Unknown algorithm '{unknown[0]}'. Expected one of: {', '.join(SOLVERS)}")
+        self.directory = directory
+        self.out_dir = out_dir
+        self.cycle_times = [float(ct) for ct in cycle_times]
+        self.algorithms = list(algorithms)
+        self.resolve = resolve
+        self.log = log
+        self.lines: Dict[str, LineState] = {}
+
+    # ------------------------------------------------------------------ #
+    #  Polling
+    # ------------------------------------------------------------------ #
+
+    def scan(self) -> List[Dict[str, Any]]:
+        """One poll: process new, changed and removed files. Returns one event per processed file."""
+        events = []
+        seen = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(".csv") or not entry.is_file():
+                    continue
+                seen.add(entry.path)
+                st = entry.stat()
+                signature = (st.st_mtime_ns, st.st_size)
+                state = self.lines.get(entry.path)
+                if state is not None and state.signature == signature:
+                    continue
+                event = self._process(entry.path, signature)
+                if event is not None:
+                    events.append(event)
+
+        for path in [p for p in self.lines if p not in seen]:
+            del self.lines[path]
+            events.append(self._event(path, "removed"))
+        return events
+
+    def run(self, interval: float = 2.0, stop: Optional[Callable[[], bool]] = None) -> None:
+        """Poll every interval seconds until stop() returns True (or forever)."""
+        while True:
+            self.scan()
+            if stop is not None and stop():
+                return
+            time.sleep(interval)
+
+    # ------------------------------------------------------------------ #
+    #  Processing
+    # ------------------------------------------------------------------ #
+
+    def _event(self, path: str, action: str, **extra) -> Dict[str, Any]:
+        event = {"line": _line_name(path), "action": action, **extra}
+        detail = ", ".join(f"{k}={v}" for k, v in extra.items())
+        self.log(f"[{jes_timestamp()}] {event['line']}: {action}" + (f" ({detail})" if detail else ""))
+        return event
+
+    def _process(self, path: str, signature: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        state = self.lines.get(path)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            return self._event(path, "error", error=str(e))
+
+        content_hash = bytes_hash(data)
+        if state is not None and state.content_hash == content_hash:
+            state.signature = signature  # touched, not changed
+            return None
+
+        new = PrecedenceGraph()
+        try:
+            new.load_from_records(csv_records(io.StringIO(data.decode("utf-8-sig"), newline="")), validate=True)
+        except (KeyError, ValueError, UnicodeDecodeError) as e:
+            # Keep the previous graph (e.g. the file is still being written); retried on the next change
+            if state is not None:
+                state.signature = signature
+            else:
+                self.lines[path] = LineState(path, signature)
+            return self._event(path, "error", error=str(e))
+
+        if state is None or state.graph is None:
+            state = self.lines[path] = LineState(path, signature, content_hash, new)
+            counts = self._update_solutions(state, None)
+            return self._event(path, "loaded", tasks=len(new.tasks), **counts)
+
+        diff = diff_graphs(state.graph, new)
+        state.signature, state.content_hash = signature, content_hash
+        state.graph = new
+        if diff.empty:
+            return self._event(path, "unchanged")
+        counts = self._update_solutions(state, diff)
+        return self._event(path, "updated", diff=diff.summary(), **counts)
+
+    def _update_solutions(self, state: LineState, diff) -> Dict[str, int]:
+        """Repair or re-solve every (cycle time, algorithm) of a line and write what changed."""
+        graph = state.graph
+        g_hash = graph_hash(graph)
+        counts = {"repaired": 0, "solved": 0, "failed": 0, "jes_written": 0}
+        for ct in self.cycle_times:
+            for algo in self.algorithms:
+                previous = state.solutions.get((ct, algo))
+                stations = None
+                if previous is not None and diff is not None and not self.resolve:
+                    stations = repair_stations(graph, previous, ct, diff)
+                mode = "repaired" if stations is not None else "solved"
+                if stations is None:
+                    try:
+                        stations = SOLVERS[algo](graph, ct)
+                    except ValueError as e:
+                        state.solutions.pop((ct, algo), None)
+                        counts["failed"] += 1
+                        self._write_error(state.path, ct, algo, g_hash, str(e))
+                        continue
+                counts[mode] += 1
+                counts["jes_written"] += self._write_solution(state.path, ct, algo, g_hash, graph, stations, previous, mode)
+                state.solutions[(ct, algo)] = stations
+        return counts
+
+    # ------------------------------------------------------------------ #
+    #  Output
+    # ------------------------------------------------------------------ #
+
+    def _solution_dir(self, path: str, ct: float, algo: str) -> str:
+        d = os.path.join(self.out_dir, _line_name(path), f"{algo}_ct{ct:g}")
+        os.makedirs(d, exist_ok=True)
+        return d
+
+    def _write_error(self, path, ct, algo, g_hash, error) -> None:
+        d = self._solution_dir(path, ct, algo)
+        _write_atomic(os.path.join(d, "result.json"), json.dumps({
+            "line": _line_name(path), "cycle_time": ct, "algorithm": algo, "graph_hash": g_hash,
+            "status": "error", "error": error, "updated_at": jes_timestamp(),
+        }, indent=2))
+
+    def _write_solution(self, path, ct, algo, g_hash, graph, stations, previous, mode) -> int:
+        """Write result.json and the JES of changed stations; returns the number of JES files written."""
+        d = self._solution_dir(path, ct, algo)
+        metrics = compute_all_metrics(stations, ct, graph.total_work_content())
+        _write_atomic(os.path.join(d, "result.json"), json.dumps({
+            "line": _line_name(path), "cycle_time": ct, "algorithm": algo, "graph_hash": g_hash,
+            "status": "ok", "mode": mode, "metrics": metrics,
+            "assignment": stations_to_assignment(stations), "updated_at": jes_timestamp(),
+        }, indent=2))
+
+        old_hashes = {s["station_id"]: station_hash(s, ct) for s in previous or []}
+        line_name = _line_name(path)
+        written = 0
+        for s in stations:
+            if old_hashes.get(s["station_id"]) == station_hash(s, ct):
+                continue
+            jes = generate_station_jes(s, ct, line_name)
+            _write_atomic(os.path.join(d, f"station_{s['station_id']}.md"), format_jes_markdown(jes))
+            written += 1
+        for sid in set(old_hashes) - {s["station_id"] for s in stations}:
+            stale = os.path.join(d, f"station_{sid}.md")
+            if os.path.exists(stale):
+                os.remove(stale)
+        return written
+
+
+def _line_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
@@ -0,0 +1,209 @@
+"""
+test_api.py — Tests for the HTTP/JSON solve service
+"""
+
+import json
+import sys
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import data.database as database
+from api import SOLVE_TIMEOUT, make_server, task_rows
+
+
+TASKS = [
+    {"task_id": "T1", "task_name": "Cutting", "duration": 6, "predecessors": ""},
+    {"task_id": "T2", "task_name": "Drilling", "duration": 4, "predecessors": "T1"},
+    {"task_id": "T3", "task_name": "Bending", "duration": 3, "predecessors": ["T1"]},
+    {"task_id": "T4", "task_name": "Welding", "duration": 5, "predecessors": "T2"},
+    {"task_id": "T5", "task_name": "Assembly", "duration": 2, "predecessors": "T3 T4"},
+]
+CSV = "task_id,task_name,duration,predecessors\n" + "\n".join(
+    f"{t['task_id']},{t['task_name']},{t['duration']},{' '.join(t['predecessors']) if isinstance(t['predecessors'], list) else t['predecessors']}"
+    for t in TASKS
+)
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    srv = make_server("127.0.0.1", 0, workers=2, db_path=str(tmp_path_factory.mktemp("api") / "api.db"))
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+    srv.service.pool.shutdown()
+    database.close_pools()
+
+
+def request(server, path, payload=None, raw=None):
+    """(status, JSON body) of a GET (no payload) or POST request."""
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    data = raw if raw is not None else (json.dumps(payload).encode() if payload is not None else None)
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+# ------------------------------------------------------------------ #
+#  Payload Parsing
+# ------------------------------------------------------------------ #
+
+class TestTaskRows:
+
+    def test_tasks_and_csv_agree(self):
+        assert task_rows({"tasks": TASKS}) == task_rows({"csv": CSV})
+
+    def test_predecessor_forms(self):
+        rows = task_rows({"tasks": TASKS})
+        assert rows[2][3] == ["T1"]
+        assert rows[4][3] == ["T3", "T4"]
+
+
+# ------------------------------------------------------------------ #
+#  Endpoints
+# ------------------------------------------------------------------ #
+
+class TestEndpoints:
+
+    def test_health(self, server):
+        assert request(server, "/health") == (200, {"status": "ok"})
+
+    def test_solve(self, server):
+        status, body = request(server, "/solve", {"tasks": TASKS, "cycle_time": 10})
+        assert status == 200
+        assert body["algorithm"] == "rpw"
+        assert sorted(t for s in body["stations"] for t in s["tasks"]) == ["T1", "T2", "T3", "T4", "T5"]
+        assert body["metrics"]["num_stations"] == len(body["stations"])
+
+    def test_metrics_from_csv(self, server):
+        status, body = request(server, "/metrics", {"csv": CSV, "cycle_time": 10, "algorithm": "greedy"})
+        assert status == 200
+        assert body["algorithm"] == "greedy"
+        assert len(body["assignment"]) == body["metrics"]["num_stations"]
+
+    def test_energy(self, server):
+        base = {"tasks": TASKS, "cycle_time": 12}
+        _, default = request(server, "/energy", base)
+        status, body = request(server, "/energy", {**base, "kwh_per_sec": 0.01, "co2_factor": 1.0})
+        assert status == 200
+        assert body["energy"]["total_idle_time"] == default["energy"]["total_idle_time"]
+        assert body["energy"]["total_energy_kwh"] > default["energy"]["total_energy_kwh"]
+        assert body["energy"]["total_co2_kg"] == pytest.approx(body["energy"]["total_energy_kwh"])
+
+    def test_jes(self, server):
+        status, body = request(server, "/jes", {"tasks": TASKS, "cycle_time": 10})
+        assert status == 200
+        assert [d["station_id"] for d in body["jes"]] == list(range(1, len(body["jes"]) + 1))
+
+        status, body = request(server, "/jes", {"tasks": TASKS, "cycle_time": 10, "station_id": "1", "format": "markdown"})
+        assert status == 200
+        assert len(body["jes"]) == 1
+        assert body["jes"][0]["station_id"] == 1
+        assert "Cutting" in body["jes"][0]["markdown"]
+
+    def test_stats(self, server):
+        request(server, "/solve", {"tasks": TASKS, "cycle_time": 12})
+        status, body = request(server, "/stats")
+        assert status == 200
+        assert body["latency"]["/solve"]["requests"] >= 1
+        assert body["pool"]["submitted"] >= 1
+        assert body["solver_cache"]["misses"] >= 1
+
+    def test_unknown_endpoint(self, server):
+        assert request(server, "/nope")[0] == 404
+        assert request(server, "/nope", {})[0] == 404
+
+
+class TestBadRequests:
+
+    @pytest.mark.parametrize("payload, message", [
+        ({"tasks": [{**TASKS[0], "predecessors": "T2"}, TASKS[1]], "cycle_time": 10}, "cycle"),
+        ({"tasks": TASKS, "cycle_time": 5}, "exceeds cycle time"),
+        ({"tasks": TASKS + [TASKS[0]], "cycle_time": 10}, "Duplicate task ID"),
+        ({"tasks": [{**TASKS[0], "duration": 0}], "cycle_time": 10}, "positive"),
+        ({"csv": 5, "cycle_time": 10}, "'csv' must be"),
+        ({"tasks": [], "cycle_time": 10}, "needs 'tasks'"),
+        ({"tasks": TASKS}, "cycle_time"),
+        ({"tasks": TASKS, "cycle_time": 10, "algorithm": "magic"}, "Unknown algorithm"),
+    ])
+    def test_solve_rejects(self, server, payload, message):
+        status, body = request(server, "/solve", payload)
+        assert status == 400
+        assert message.lower() in body["error"].lower()
+
+    def test_bad_json(self, server):
+        status, body = request(server, "/solve", raw=b"{not json")
+        assert status == 400
+        assert "Invalid JSON" in body["error"]
+        assert request(server, "/solve", raw=b"[1, 2]")[0] == 400
+
+    def test_energy_params(self, server):
+        status, body = request(server, "/energy", {"tasks": TASKS, "cycle_time": 10, "kwh_per_sec": "lots"})
+        assert status == 400
+        assert "numeric" in body["error"]
+
+    @pytest.mark.parametrize("extra", [{"station_id": "first"}, {"station_id": 99}, {"format": "pdf"}])
+    def test_jes_params(self, server, extra):
+        assert request(server, "/jes", {"tasks": TASKS, "cycle_time": 10, **extra})[0] == 400
+
+    def test_timeout(self, server):
+        pool = server.service.pool
+        blockers = [pool._pool.submit(time.sleep, 0.5) for _ in range(2)]
+        server.service.timeout = 0.01
+        try:
+            status, body = request(server, "/solve", {"tasks": TASKS, "cycle_time": 19})
+        finally:
+            server.service.timeout = SOLVE_TIMEOUT
+            for b in blockers:
+                b.result()
+        assert status == 504
+        assert "timed out" in body["error"]
+
+    def test_errors_counted(self, server):
+        request(server, "/metrics", {"tasks": TASKS, "cycle_time": -1})
+        assert request(server, "/stats")[1]["latency"]["/metrics"]["errors"] >= 1
+
+
+# ------------------------------------------------------------------ #
+#  Coalescing
+# ------------------------------------------------------------------ #
+
+class TestCoalescing:
+
+    def test_identical_inflight_solves_share_a_job(self, server):
+        pool = server.service.pool
+        rows = task_rows({"tasks": TASKS})
+        # Occupy both workers so the solve is still in flight while the copies arrive
+        blockers = [pool._pool.submit(time.sleep, 0.5) for _ in range(2)]
+        before = pool.stats()
+        futures = [pool.solve(rows, 17.0, "rpw") for _ in range(5)]
+        assert len({id(f) for f in futures}) == 1
+        results = [f.result(timeout=60) for f in futures]
+        assert all(r == results[0] for r in results)
+
+        for b in blockers:
+            b.result()
+        after = pool.stats()
+        assert after["submitted"] - before["submitted"] == 1
+        assert after["coalesced"] - before["coalesced"] == 4
+
+    def test_different_solves_not_coalesced(self, server):
+        pool = server.service.pool
+        rows = task_rows({"tasks": TASKS})
+        before = pool.stats()
+        futures = [pool.solve(rows, 18.0, "rpw"), pool.solve(rows, 18.0, "greedy")]
+        for f in futures:
+            f.result(timeout=60)
+        assert pool.stats()["submitted"] - before["submitted"] == 2
+        assert pool.stats()["coalesced"] == before["coalesced"]
@@ -0,0 +1,622 @@
+"""
+test_data.py — Unit tests for data modules
+"""
+
+import asyncio
+import io
+import json
+import sqlite3
+import subprocess
+import sys
+import os
+import threading
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import data.database as database
+import data.parser as parser
+from data.database import (
+    compare_scenarios,
+    connection,
+    delete_scenario,
+    get_pool,
+    list_scenarios,
+    list_scenarios_page,
+    load_scenario,
+    load_scenario_lazy,
+    load_scenario_metrics,
+    load_station_loads,
+    save_scenario,
+    save_scenarios,
+    scenarios_with_task_at_station,
+    station_load_summary,
+    transaction,
+)
+from data.aio import (
+    delete_scenario_async,
+    list_scenarios_async,
+    load_scenario_async,
+    save_scenario_async,
+    save_scenarios_async,
+    shutdown_executor,
+)
+from data.parser import load_tasks_csv, parse_csv
+import data.solver_cache as solver_cache
+from data.solver_cache import cache_stats, clear_cache, put_cached, solve_cached
+from engine.graph import PrecedenceGraph
+from engine.hashing import graph_hash
+from engine.metrics import compute_all_metrics
+from engine.rpw_solver import solve_rpw
+
+
+CSV_HEADER = "task_id,task_name,duration,predecessors\n"
+
+
+def _csv(rows):
+    return io.BytesIO((CSV_HEADER + "".join(r + "\n" for r in rows)).encode("utf-8"))
+
+
+@pytest.fixture(params=["pyarrow", "c"])
+def engine(request, monkeypatch):
+    if request.param == "pyarrow":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(parser, "csv_engine", lambda: request.param)
+    return request.param
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    yield path
+    database.close_pools()
+
+
+@pytest.fixture
+def scenario_args():
+    df = parse_csv("sample_tasks.csv")
+    g = PrecedenceGraph()
+    g.load_from_dataframe(df)
+    stations = solve_rpw(g, 15)
+    metrics = compute_all_metrics(stations, 15, g.total_work_content())
+    return dict(
+        name="RPW_CT15", cycle_time=15, algorithm="rpw",
+        tasks_data=df.to_dict("records"), metrics=metrics, stations=stations,
+        energy_report={"total_energy_kwh": 0.01, "total_co2_kg": 0.005, "total_cost": 0.02},
+    )
+
+
+# ------------------------------------------------------------------ #
+#  Chunked Import Tests
+# ------------------------------------------------------------------ #
+
+class TestChunkedImport:
+
+    def test_matches_parse_csv(self, engine):
+        df, graph = load_tasks_csv("sample_tasks.csv", chunksize=3)
+        ref = parse_csv("sample_tasks.csv")
+        assert df["task_id"].tolist() == ref["task_id"].tolist()
+        assert df["duration"].tolist() == ref["duration"].tolist()
+        assert len(graph.tasks) == 10
+        assert graph.predecessors["T8"] == ["T6", "T7"]
+
+    def test_forward_reference_across_chunks(self, engine):
+        df, graph = load_tasks_csv(_csv(["A,a,1,C", "B,b,2,A", "C,c,3,"]), chunksize=1)
+        assert graph.predecessors["A"] == ["C"]
+
+    def test_duplicate_across_chunks(self, engine):
+        with pytest.raises(ValueError, match="Duplicate task IDs: A"):
+            load_tasks_csv(_csv(["A,a,1,", "B,b,2,A", "A,c,3,"]), chunksize=2)
+
+    def test_invalid_duration(self, engine):
+        with pytest.raises(ValueError, match="Invalid duration"):
+            load_tasks_csv(_csv(["A,a,abc,", "B,b,0,A"]))
+
+    def test_unknown_predecessor(self, engine):
+        with pytest.raises(ValueError, match="unknown predecessor: 'Z'"):
+            load_tasks_csv(_csv(["A,a,1,Z"]))
+
+    def test_cycle(self, engine):
+        with pytest.raises(ValueError, match="[Cc]ycle"):
+            load_tasks_csv(_csv(["A,a,1,B", "B,b,2,A"]))
+
+    def test_short_row(self, engine):
+        # No trailing comma for the empty predecessors field
+        df, graph = load_tasks_csv(_csv(["A,a,6", "B,b,4,A"]))
+        assert df["predecessors"].tolist() == ["", "A"]
+        assert graph.predecessors["B"] == ["A"]
+
+    def test_multiline_quoted_value(self, engine):
+        df, graph = load_tasks_csv(_csv(['A,"Cut\nand trim",6,', "B,b,4,A"]))
+        assert df["task_name"].tolist() == ["Cut\nand trim", "b"]
+        assert graph.tasks["A"]["name"] == "Cut\nand trim"
+
+    def test_missing_columns(self, engine):
+        with pytest.raises(ValueError, match="Missing columns"):
+            load_tasks_csv(io.BytesIO(b"task_id,task_name\nA,a\n"))
+
+    def test_progress_and_deep_chain(self, engine):
+        rows = [f"T{i},Task,1,{'T' + str(i - 1) if i else ''}" for i in range(5000)]
+        calls = []
+        df, graph = load_tasks_csv(_csv(rows), chunksize=1000, progress=lambda r, f: calls.append((r, f)))
+        assert len(graph.tasks) == 5000
+        assert calls[-1] == (5000, 1.0)
+        # Deep chains must not hit the recursion limit
+        assert graph.all_positional_weights()["T0"] == 5000
+
+
+# ------------------------------------------------------------------ #
+#  Database Tests
+# ------------------------------------------------------------------ #
+
+class TestDatabase:
+
+    def test_db_path_from_env(self, tmp_path):
+        path = str(tmp_path / "shared" / "alb.db")
+        code = "import data.database as d; d.init_db(); print(d.DB_PATH)"
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__)) or ".",
+            env={**os.environ, "ALB_DB_PATH": path}, capture_output=True, text=True, check=True,
+        )
+        assert out.stdout.strip() == path
+        assert os.path.exists(path)  # parent directory created on first connect
+
+    def test_save_load_roundtrip(self, db_path, scenario_args):
+        sid = save_scenario(**scenario_args, db_path=db_path)
+        sc = load_scenario(sid, db_path=db_path)
+        assert sc["name"] == "RPW_CT15"
+        assert len(sc["tasks"]) == 10
+        assert sc["results"]["num_stations"] == scenario_args["metrics"]["num_stations"]
+        assert sc["results"]["stations"] == scenario_args["stations"]
+
+    def test_list_and_delete(self, db_path, scenario_args):
+        a = save_scenario(**scenario_args, db_path=db_path)
+        b = save_scenario(**scenario_args, db_path=db_path)
+        assert {s["id"] for s in list_scenarios(db_path=db_path)} == {a, b}
+        assert delete_scenario(a, db_path=db_path) is True
+        assert delete_scenario(a, db_path=db_path) is False
+        assert load_scenario(a, db_path=db_path) is None
+        with connection(db_path) as conn:
+            # CASCADE removed the station rows too
+            assert conn.execute("SELECT COUNT(*) FROM station_loads WHERE scenario_id = ?", (a,)).fetchone()[0] == 0
+
+    def test_connections_are_reused(self, db_path):
+        with connection(db_path) as first:
+            pass
+        with connection(db_path) as second:
+            pass
+        assert first is second
+        assert get_pool(db_path) is get_pool(db_path)
+
+    def test_memory_database_shared_by_pool(self, scenario_args):
+        pool = database.ConnectionPool(":memory:", max_size=2)
+        try:
+            sid = save_scenario(**scenario_args, db_path=":memory:")
+            assert load_scenario(sid, db_path=":memory:")["name"] == "RPW_CT15"
+            with connection(":memory:") as first, connection(":memory:") as second:
+                assert first is not second
+                assert second.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0] == 1
+            # Another pool is another database
+            with pool.connection() as conn:
+                assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'scenarios'").fetchone() is None
+        finally:
+            pool.close()
+            database.close_pools()
+
+    def test_transaction_rolls_back(self, db_path, scenario_args):
+        with pytest.raises(RuntimeError):
+            with transaction(db_path) as conn:
+                conn.execute(database.SQL_INSERT_SCENARIO, ("x", 10, "rpw", "2024-01-01", None))
+                raise RuntimeError("boom")
+        assert list_scenarios(db_path=db_path) == []
+
+    def test_save_scenarios_bulk(self, db_path, scenario_args):
+        batch = [dict(scenario_args, name=f"sweep_{ct}", cycle_time=ct) for ct in (15, 16, 17)]
+        ids = save_scenarios(batch, db_path=db_path)
+        assert len(ids) == 3
+        assert [load_scenario(i, db_path=db_path)["cycle_time"] for i in ids] == [15, 16, 17]
+        assert len(load_scenario(ids[-1], db_path=db_path)["tasks"]) == 10
+
+    def test_save_scenarios_is_atomic(self, db_path, scenario_args):
+        bad = dict(scenario_args, tasks_data=[{"task_id": "T1"}])  # missing fields
+        with pytest.raises(KeyError):
+            save_scenarios([scenario_args, bad], db_path=db_path)
+        assert list_scenarios(db_path=db_path) == []
+
+    def test_migrations_add_indexes(self, db_path):
+        with connection(db_path) as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            plan = " ".join(r[-1] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM scenarios ORDER BY created_at DESC, id DESC LIMIT 10"
+            ))
+        assert version == len(database.MIGRATIONS)
+        assert {"idx_scenarios_created", "idx_assign_task", "idx_scenarios_graph"} <= indexes
+        assert "idx_scenarios_created" in plan
+
+    def test_keyset_pagination(self, db_path, scenario_args):
+        names = [f"line_{i:02d}" for i in range(7)] + ["other_50%"]
+        save_scenarios([dict(scenario_args, name=n) for n in names], db_path=db_path)
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = list_scenarios_page(limit=3, cursor=cursor, db_path=db_path)
+            seen.extend(r["name"] for r in rows)
+            if cursor is None:
+                break
+        # Same timestamp for the whole batch -> id breaks ties, newest first
+        assert seen == list(reversed(names))
+
+        rows, cursor = list_scenarios_page(search="50%", db_path=db_path)
+        assert [r["name"] for r in rows] == ["other_50%"] and cursor is None
+        rows, _ = list_scenarios_page(search="LINE_0", algorithm="greedy", db_path=db_path)
+        assert rows == []
+
+    def test_stations_rebuilt_without_json(self, db_path, scenario_args):
+        sid = save_scenario(**scenario_args, db_path=db_path)
+        sc = load_scenario(sid, db_path=db_path)
+        assert sc["results"]["stations_json"] is None
+        assert sc["results"]["stations"] == scenario_args["stations"]
+
+        cached = save_scenario(**scenario_args, cache_json=True, db_path=db_path)
+        assert load_scenario(cached, db_path=db_path)["results"]["stations_json"]
+
+    def test_cross_scenario_queries(self, db_path, scenario_args):
+        first_station = scenario_args["stations"][0]
+        a, b = save_scenarios([scenario_args, scenario_args], db_path=db_path)
+        hits = scenarios_with_task_at_station(first_station["tasks"][0], 1, db_path=db_path)
+        assert {h["id"] for h in hits} == {a, b}
+
+        summary = station_load_summary(station_id=1, db_path=db_path)
+        assert summary == [{
+            "station_id": 1, "scenarios": 2,
+            "avg_load": first_station["total_time"], "min_load": first_station["total_time"],
+            "max_load": first_station["total_time"], "avg_idle": first_station["idle_time"],
+        }]
+
+        delete_scenario(a, db_path=db_path)
+        assert station_load_summary(station_id=1, db_path=db_path)[0]["scenarios"] == 1
+
+    def test_migration_backfills_legacy_json(self, db_path, scenario_args):
+        conn = sqlite3.connect(db_path)
+        conn.executescript(database.SCHEMA)
+        conn.execute("INSERT INTO scenarios (id, name, cycle_time, algorithm, created_at) VALUES (1, 'old', 15, 'rpw', 'x')")
+        conn.execute(
+            "INSERT INTO results (scenario_id, num_stations, stations_json, created_at) VALUES (1, ?, ?, 'x')",
+            (len(scenario_args["stations"]), json.dumps(scenario_args["stations"])),
+        )
+        conn.commit()
+        conn.close()
+
+        summary = station_load_summary(db_path=db_path)
+        assert len(summary) == len(scenario_args["stations"])
+
+    def test_task_graph_deduplicated(self, db_path, scenario_args):
+        batch = [dict(scenario_args, cycle_time=ct) for ct in (15, 16, 17)]
+        a, b, c = save_scenarios(batch, db_path=db_path)
+        # Equal content from a different list object still dedupes
+        d = save_scenario(**dict(scenario_args, tasks_data=[dict(t) for t in scenario_args["tasks_data"]]), db_path=db_path)
+
+        def graph_rows():
+            with connection(db_path) as conn:
+                return (
+                    conn.execute("SELECT hash, refcount FROM task_graphs").fetchall(),
+                    conn.execute("SELECT COUNT(*) FROM graph_tasks").fetchone()[0],
+                )
+
+        graphs, task_rows = graph_rows()
+        assert [tuple(g)[1] for g in graphs] == [4]
+        assert task_rows == 10
+        assert [t["task_id"] for t in load_scenario(d, db_path=db_path)["tasks"]][:3] == ["T1", "T2", "T3"]
+
+        for sid in (a, b, c):
+            delete_scenario(sid, db_path=db_path)
+        assert [tuple(g)[1] for g in graph_rows()[0]] == [1]
+        delete_scenario(d, db_path=db_path)
+        assert graph_rows() == ([], 0)
+
+    def test_migration_moves_legacy_tasks(self, db_path, scenario_args):
+        conn = sqlite3.connect(db_path)
+        conn.executescript(database.SCHEMA)
+        for sid in (1, 2):
+            conn.execute("INSERT INTO scenarios (id, name, cycle_time, algorithm, created_at) VALUES (?, 'old', 15, 'rpw', 'x')", (sid,))
+            conn.executemany(
+                "INSERT INTO tasks (scenario_id, task_id, task_name, duration, predecessors) VALUES (?, ?, ?, ?, ?)",
+                [(sid, t["task_id"], t["task_name"], t["duration"], t["predecessors"]) for t in scenario_args["tasks_data"]],
+            )
+        conn.commit()
+        conn.close()
+
+        assert len(load_scenario(1, db_path=db_path)["tasks"]) == 10
+        with connection(db_path) as conn:
+            assert conn.execute("SELECT refcount FROM task_graphs").fetchall()[0][0] == 2
+            assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'tasks'").fetchone() is None
+
+
+# ------------------------------------------------------------------ #
+#  Concurrent Write Tests
+# ------------------------------------------------------------------ #
+
+class TestConcurrentWrites:
+
+    def test_retry_locked_backs_off(self, monkeypatch):
+        monkeypatch.setattr(database, "RETRY_BACKOFF", 0)
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise sqlite3.OperationalError("database is locked")
+            return "ok"
+
+        assert database.retry_locked(flaky) == "ok"
+        assert len(calls) == 3
+        with pytest.raises(sqlite3.OperationalError, match="no such table"):
+            database.retry_locked(lambda: (_ for _ in ()).throw(sqlite3.OperationalError("no such table: x")))
+
+    def test_retry_gives_up(self, monkeypatch):
+        monkeypatch.setattr(database, "RETRY_BACKOFF", 0)
+
+        def locked():
+            raise sqlite3.OperationalError("database is locked")
+
+        with pytest.raises(sqlite3.OperationalError):
+            database.retry_locked(locked, retries=2)
+
+    def test_save_waits_for_external_lock(self, db_path, scenario_args):
+        database.init_db(db_path)
+        other = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        other.execute("BEGIN IMMEDIATE")
+        timer = threading.Timer(0.3, other.commit)
+        timer.start()
+        sid = save_scenario(**scenario_args, db_path=db_path)
+        timer.join()
+        other.close()
+        assert load_scenario(sid, db_path=db_path)["name"] == "RPW_CT15"
+
+    def test_concurrent_queued_saves(self, db_path, scenario_args):
+        ids, errors = [], []
+
+        def worker(i):
+            try:
+                ids.extend(save_scenarios([dict(scenario_args, name=f"w{i}_{j}") for j in range(5)], db_path=db_path, queued=True))
+            except Exception as e:  # pragma: no cover - failure path
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert len(set(ids)) == 40
+        assert len(list_scenarios(db_path)) == 40
+
+    def test_queue_isolates_bad_save(self, db_path, scenario_args):
+        wq = database.WriteQueue(db_path)
+        bad = dict(scenario_args, name=None)  # NOT NULL violation
+        good = wq.submit([scenario_args])
+        failing = wq.submit([bad])
+        wq.close()
+        assert len(good.result()) == 1
+        with pytest.raises(sqlite3.IntegrityError):
+            failing.result()
+        assert [s["name"] for s in list_scenarios(db_path)] == ["RPW_CT15"]
+
+
+class TestAsyncAPI:
+
+    def test_crud_roundtrip(self, db_path, scenario_args):
+        async def scenario():
+            ids = await asyncio.gather(*(
+                save_scenario_async(**dict(scenario_args, name=f"a{i}"), db_path=db_path) for i in range(6)
+            ))
+            ids += await save_scenarios_async([dict(scenario_args, name="bulk")], db_path=db_path)
+            loaded = await asyncio.gather(*(load_scenario_async(i, db_path=db_path) for i in ids))
+            deleted = await delete_scenario_async(ids[0], db_path=db_path)
+            return ids, loaded, deleted, await list_scenarios_async(db_path=db_path)
+
+        try:
+            ids, loaded, deleted, remaining = asyncio.run(scenario())
+        finally:
+            shutdown_executor()
+        assert len(set(ids)) == 7
+        assert sorted(s["name"] for s in loaded) == sorted([f"a{i}" for i in range(6)] + ["bulk"])
+        assert deleted is True
+        assert len(remaining) == 6
+
+
+# ------------------------------------------------------------------ #
+#  Projection Loader Tests
+# ------------------------------------------------------------------ #
+
+class TestProjections:
+
+    def test_metrics_only(self, db_path, scenario_args):
+        sid = save_scenario(**scenario_args, db_path=db_path)
+        m = load_scenario_metrics(sid, db_path=db_path)
+        assert m["name"] == "RPW_CT15"
+        assert m["line_efficiency"] == scenario_args["metrics"]["line_efficiency"]
+        assert m["total_energy_kwh"] == 0.01
+        assert "stations_json" not in m and "tasks" not in m
+        assert load_scenario_metrics(999, db_path=db_path) is None
+
+    def test_loads_only(self, db_path, scenario_args):
+        sid = save_scenario(**scenario_args, db_path=db_path)
+        loads = load_station_loads(sid, db_path=db_path)
+        stations = scenario_args["stations"]
+        assert [l["total_time"] for l in loads] == [s["total_time"] for s in stations]
+        assert [l["task_count"] for l in loads] == [len(s["tasks"]) for s in stations]
+
+    @pytest.mark.parametrize("cache_json", [False, True])
+    def test_lazy_scenario(self, db_path, scenario_args, cache_json):
+        sid = save_scenario(**scenario_args, db_path=db_path, cache_json=cache_json)
+        sc = load_scenario_lazy(sid, db_path=db_path)
+        assert sc["num_stations"] == len(scenario_args["stations"])
+        assert not sc.is_loaded("stations") and not sc.is_loaded("tasks")
+
+        full = load_scenario(sid, db_path=db_path)
+        assert [s["tasks"] for s in sc["stations"]] == [s["tasks"] for s in full["results"]["stations"]]
+        assert sc["tasks"] == full["tasks"]
+        assert sc.is_loaded("stations") and not sc.is_loaded("loads")
+        assert set(sc) >= {"id", "loads", "stations", "tasks"}
+        assert load_scenario_lazy(999, db_path=db_path) is None
+
+
+class TestCompareScenarios:
+
+    def _save(self, db_path, scenario_args, cts):
+        g = PrecedenceGraph()
+        g.load_from_dataframe(parse_csv("sample_tasks.csv"))
+        batch = []
+        for ct in cts:
+            stations = solve_rpw(g, ct)
+            batch.append(dict(
+                scenario_args, name=f"CT{ct}", cycle_time=ct, stations=stations,
+                metrics=compute_all_metrics(stations, ct, g.total_work_content()),
+                energy_report={"total_energy_kwh": ct / 10},
+            ))
+        return save_scenarios(batch, db_path=db_path)
+
+    def test_deltas_ranks_and_loads(self, db_path, scenario_args):
+        ids = self._save(db_path, scenario_args, [20, 15, 25])
+        rows = compare_scenarios(ids, db_path=db_path)
+        assert [r["id"] for r in rows] == ids
+        base, ct15, ct25 = rows
+        assert base["delta_line_efficiency"] == 0
+        assert ct15["delta_line_efficiency"] == pytest.approx(ct15["line_efficiency"] - base["line_efficiency"])
+        assert ct25["delta_num_stations"] == ct25["num_stations"] - base["num_stations"]
+        assert ct15["rank_line_efficiency"] == 1
+        assert [r["rank_total_energy_kwh"] for r in rows] == [2, 1, 3]
+        assert ct15["loads"] == [l["total_time"] for l in load_station_loads(ids[1], db_path=db_path)]
+        assert ct15["max_load"] == max(ct15["loads"])
+
+    def test_loads_in_station_order(self, db_path, scenario_args):
+        ids = self._save(db_path, scenario_args, [15, 20])
+        expected = [l["total_time"] for l in load_station_loads(ids[0], db_path=db_path)]
+        with transaction(db_path) as conn:  # store the rows in reverse station order
+            rows = conn.execute("SELECT * FROM station_loads WHERE scenario_id = ? ORDER BY station_id DESC", (ids[0],)).fetchall()
+            conn.execute("DELETE FROM station_loads WHERE scenario_id = ?", (ids[0],))
+            conn.executemany("INSERT INTO station_loads VALUES (?, ?, ?, ?, ?)", [tuple(r) for r in rows])
+        assert compare_scenarios(ids, db_path=db_path)[0]["loads"] == expected
+
+    def test_baseline_and_missing(self, db_path, scenario_args):
+        ids = self._save(db_path, scenario_args, [15, 20])
+        rows = compare_scenarios(ids + [999], baseline_id=ids[1], db_path=db_path)
+        assert len(rows) == 2
+        assert rows[1]["delta_line_efficiency"] == 0
+        assert compare_scenarios([], db_path=db_path) == []
+
+    def test_many_scenarios(self, db_path, scenario_args):
+        ids = self._save(db_path, scenario_args, [15 + i * 0.5 for i in range(50)])
+        rows = compare_scenarios(ids, db_path=db_path)
+        assert len(rows) == 50
+        assert min(r["rank_line_efficiency"] for r in rows) == 1
+
+
+# ------------------------------------------------------------------ #
+#  Solver Cache Tests
+# ------------------------------------------------------------------ #
+
+@pytest.fixture
+def sample_graph():
+    g = PrecedenceGraph()
+    g.load_from_dataframe(parse_csv("sample_tasks.csv"))
+    return g
+
+
+class TestSolverCache:
+
+    def test_miss_then_hit(self, db_path, sample_graph):
+        stations, metrics = solve_cached(sample_graph, 15, "rpw", db_path=db_path)
+        assert stations == solve_rpw(sample_graph, 15)
+        again, cached_metrics = solve_cached(sample_graph, 15, "rpw", db_path=db_path)
+        assert again == stations
+        assert cached_metrics == metrics
+        stats = cache_stats(db_path)
+        assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+    def test_key_includes_graph_ct_and_algorithm(self, db_path, sample_graph):
+        solve_cached(sample_graph, 15, "rpw", db_path=db_path)
+        solve_cached(sample_graph, 16, "rpw", db_path=db_path)
+        solve_cached(sample_graph, 15, "greedy", db_path=db_path)
+        other = PrecedenceGraph()
+        other.load_from_records([("T1", "Only", 5.0, [])])
+        solve_cached(other, 15, "rpw", db_path=db_path)
+        assert cache_stats(db_path)["misses"] == 4
+
+    def test_rebuilt_from_callers_graph(self, db_path, sample_graph):
+        solve_cached(sample_graph, 15, "rpw", db_path=db_path)
+        # Same content, new object: the hit is rebuilt from this graph's task data
+        g2 = PrecedenceGraph()
+        g2.load_from_dataframe(parse_csv("sample_tasks.csv"))
+        stations, _ = solve_cached(g2, 15, "rpw", db_path=db_path)
+        assert stations[0]["task_details"][0]["name"] == g2.tasks[stations[0]["tasks"][0]]["name"]
+        assert cache_stats(db_path)["hits"] == 1
+
+    def test_lru_eviction(self, db_path):
+        for i in range(5):
+            put_cached("g", 10 + i, "rpw", [["T1"]], {}, db_path=db_path, max_entries=3)
+        with connection(db_path) as conn:
+            cts = [r[0] for r in conn.execute("SELECT cycle_time FROM solver_cache ORDER BY cycle_time")]
+        assert cts == [12, 13, 14]
+        assert cache_stats(db_path)["evictions"] == 2
+
+    def test_size_eviction(self, db_path):
+        put_cached("g", 10, "rpw", [["T1"] * 50], {}, db_path=db_path)
+        put_cached("g", 11, "rpw", [["T1"] * 50], {}, db_path=db_path, max_bytes=300)
+        assert cache_stats(db_path)["entries"] == 1
+
+    def test_errors_not_cached(self, db_path, sample_graph):
+        with pytest.raises(ValueError):
+            solve_cached(sample_graph, 1, "rpw", db_path=db_path)
+        with pytest.raises(ValueError, match="Unknown algorithm"):
+            solve_cached(sample_graph, 15, "nope", db_path=db_path)
+        assert cache_stats(db_path)["entries"] == 0
+
+    def test_hit_is_read_only(self, db_path, sample_graph, monkeypatch):
+        monkeypatch.setattr(solver_cache, "FLUSH_EVERY", 1000)
+        monkeypatch.setattr(solver_cache, "FLUSH_INTERVAL", 1e9)
+        solve_cached(sample_graph, 15, "rpw", db_path=db_path)
+        writer = sqlite3.connect(db_path, timeout=0.1, isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")  # another process holds the write lock
+        try:
+            assert solve_cached(sample_graph, 15, "rpw", db_path=db_path)[0] == solve_rpw(sample_graph, 15)
+        finally:
+            writer.rollback()
+            writer.close()
+
+        def stored():
+            with connection(db_path) as conn:
+                hits = conn.execute("SELECT hits FROM solver_cache").fetchone()[0]
+                return hits, dict(conn.execute("SELECT name, value FROM solver_cache_stats").fetchall())["hits"]
+
+        assert stored() == (0, 0)
+        assert cache_stats(db_path)["hits"] == 1  # buffered counts are included
+        solver_cache.flush_counters(db_path)
+        assert stored() == (1, 1)
+        assert cache_stats(db_path)["hits"] == 1
+
+    def test_last_used_updated_lazily(self, db_path, sample_graph):
+        solve_cached(sample_graph, 15, "rpw", db_path=db_path)
+
+        def last_used():
+            with connection(db_path) as conn:
+                return conn.execute("SELECT last_used FROM solver_cache").fetchone()[0]
+
+        fresh = last_used()
+        solve_cached(sample_graph, 15, "rpw", db_path=db_path)
+        solver_cache.flush_counters(db_path)
+        assert last_used() == fresh
+
+        with transaction(db_path) as conn:
+            conn.execute("UPDATE solver_cache SET last_used = ?", (fresh - solver_cache.TOUCH_INTERVAL - 1,))
+        solve_cached(sample_graph, 15, "rpw", db_path=db_path)
+        solver_cache.flush_counters(db_path)
+        assert last_used() >= fresh
+
+    def test_clear(self, db_path, sample_graph):
+        solve_cached(sample_graph, 15, "rpw", g_hash=graph_hash(sample_graph), db_path=db_path)
+        clear_cache(db_path)
+        assert cache_stats(db_path) == {"entries": 0, "size_bytes": 0, "hits": 0, "misses": 0, "evictions": 0}
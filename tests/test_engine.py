@@ -2,15 +2,20 @@
 test_engine.py — Unit tests for engine modules
 """
 
+import io
+import json
 import sys
 import os
+import subprocess
+import threading
+import zipfile
 import pytest
 import pandas as pd
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from engine.graph import PrecedenceGraph
+from engine.graph import PrecedenceGraph, validate_records
 from engine.rpw_solver import solve_rpw
 from engine.greedy_solver import solve_greedy
 from engine.metrics import (
@@ -22,7 +27,21 @@ from engine.metrics import (
     compute_all_metrics,
 )
 from engine.energy_waste import calculate_energy_waste, annual_savings
-from engine.jes_generator import generate_jes, format_jes_markdown
+from engine.jes_generator import (
+    generate_jes,
+    generate_station_jes,
+    format_jes_markdown,
+    format_jes_html,
+)
+from engine.jes_export import export_jes_archive
+from engine.solution import build_stations, stations_to_assignment
+from engine.hashing import graph_hash, parts_hash, station_hash
+from engine.cache import LRUCache
+from engine.jobs import CANCELLED, DONE, FAILED, JobManager
+from engine.store import ResultStore, StoreRefs, estimate_size
+from engine.cli import main as cli_main, parse_cycle_times, run_jobs, solve_job
+from engine.incremental import apply_diff, diff_graphs, repair_stations
+from engine.watch import DirectoryWatcher
 
 
 # ------------------------------------------------------------------ #
@@ -113,6 +132,47 @@ class TestPrecedenceGraph:
         assert rpw["T1"] == max(rpw.values())
         # T5 should have the lowest RPW (only its own duration)
         assert rpw["T5"] == 2
+        assert {t: sample_graph.positional_weight(t) for t in sample_graph.tasks} == rpw
+
+    def test_positional_weight_deep_and_cyclic(self):
+        g = PrecedenceGraph()
+        g.load_from_records((f"T{i}", "t", 1, f"T{i - 1}" if i else "") for i in range(5000))
+        assert g.positional_weight("T0") == 5000
+        assert g.positional_weight("T4990") == 10
+        g.predecessors["T0"].append("T4999")
+        g.successors["T4999"].append("T0")
+        with pytest.raises(ValueError, match="cycle"):
+            g.positional_weight("T10")
+
+    @pytest.mark.parametrize("rows, message", [
+        ([], "No tasks"),
+        ([("A", "a", 0, ""), ("B", "b", -1, "A")], "'A': duration must be positive"),
+        ([("A", "a", "fast", "")], "is not a number"),
+        ([("A", "a", 1, ""), ("A", "again", 2, "")], "Duplicate task IDs: A"),
+        ([(" ", "a", 1, "")], "Row 1: missing task_id"),
+    ])
+    def test_validate_records(self, rows, message):
+        with pytest.raises(ValueError, match=message):
+            validate_records(rows)
+
+    def test_validate_records_normalizes(self):
+        assert validate_records([(" A ", "a", "1.5", "")]) == [("A", "a", 1.5, "")]
+
+    def test_load_from_csv(self, tmp_path, sample_df, sample_graph):
+        path = tmp_path / "tasks.csv"
+        sample_df.to_csv(path, index=False)
+        g = PrecedenceGraph()
+        g.load_from_csv(str(path))
+        assert g.tasks == sample_graph.tasks
+        assert dict(g.predecessors) == dict(sample_graph.predecessors)
+
+    def test_engine_imports_without_pandas(self):
+        code = "import sys, engine, engine.jes_export; print(sorted(m for m in ('pandas', 'plotly') if m in sys.modules))"
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__)) or ".",
+            capture_output=True, text=True, check=True,
+        )
+        assert out.stdout.strip() == "[]"
 
 
 # ------------------------------------------------------------------ #
@@ -263,6 +323,432 @@ class TestJESGenerator:
         assert "Step 1" in md
         assert "Station" in md
 
+    def test_generated_at_is_deterministic(self, sample_graph):
+        stations = solve_rpw(sample_graph, cycle_time=15)
+        a = generate_jes(stations, cycle_time=15, generated_at="2024-01-01 08:00")
+        b = generate_jes(stations, cycle_time=15, generated_at="2024-01-01 08:00")
+        assert a == b
+        assert all(j["generated_at"] == "2024-01-01 08:00" for j in a.values())
+
+    def test_station_jes_memoized(self, sample_graph):
+        stations = solve_rpw(sample_graph, cycle_time=15)
+        first = generate_station_jes(stations[0], 15, generated_at="x")
+        again = generate_station_jes(stations[0], 15, generated_at="y")
+        # Same content -> same cached steps object; header fields still per call
+        assert first["steps"] is again["steps"]
+        assert again["generated_at"] == "y"
+        assert first == generate_jes(stations, 15, generated_at="x")[stations[0]["station_id"]]
+
+    def test_station_hash_depends_on_cycle_time(self, sample_graph):
+        stations = solve_rpw(sample_graph, cycle_time=15)
+        assert station_hash(stations[0], 15) == station_hash(stations[0], 15.0)
+        assert station_hash(stations[0], 15) != station_hash(stations[0], 16)
+
+    def test_parts_hash(self):
+        assert parts_hash(["g", 15.0, "rpw"]) == parts_hash(("g", 15.0, "rpw"))
+        assert parts_hash(["g", 15.0, "rpw"]) != parts_hash(["g", 15.0, "greedy"])
+        assert parts_hash(["ab", "c"]) != parts_hash(["a", "bc"])  # parts are delimited
+
+    def test_html_output_escapes(self):
+        stations = [{
+            "station_id": 1, "tasks": ["T1"], "total_time": 4, "idle_time": 6,
+            "task_details": [{"id": "T1", "name": "<b>Weld</b>", "duration": 4}],
+        }]
+        page = format_jes_html(generate_jes(stations, 10)[1])
+        assert "Station 1" in page
+        assert "&lt;b&gt;Weld&lt;/b&gt;" in page
+
+    def test_export_archive(self, sample_graph):
+        stations = solve_rpw(sample_graph, cycle_time=10)
+        buf = io.BytesIO()
+        n = export_jes_archive(stations, 10, buf, generated_at="fixed", max_workers=2)
+        assert n == 2 * len(stations)
+        with zipfile.ZipFile(buf) as zf:
+            names = zf.namelist()
+            assert "html/index.html" in names
+            md = zf.read("md/JES_Station_1.md").decode("utf-8")
+        assert md == format_jes_markdown(generate_jes(stations, 10, generated_at="fixed")[1])
+
+    def test_export_archive_rejects_unknown_format(self, sample_graph):
+        stations = solve_rpw(sample_graph, cycle_time=10)
+        with pytest.raises(ValueError, match="Unknown JES format"):
+            export_jes_archive(stations, 10, io.BytesIO(), formats=["pdf"])
+
+
+# ------------------------------------------------------------------ #
+#  Solution / Columnar Tests
+# ------------------------------------------------------------------ #
+
+class TestSolution:
+
+    def test_load_from_records(self, sample_graph):
+        g = PrecedenceGraph()
+        g.load_from_records([
+            ("T1", "Cutting", 6, ""),
+            ("T2", "Drilling", 4, ["T1"]),
+            ("T3", "Bending", 3, "T1 T2"),
+        ])
+        assert g.predecessors["T3"] == ["T1", "T2"]
+        assert g.successors["T1"] == ["T2", "T3"]
+
+    def test_assignment_roundtrip(self, sample_graph):
+        stations = solve_rpw(sample_graph, cycle_time=10)
+        assignment = stations_to_assignment(stations)
+        assert build_stations(sample_graph, assignment, 10) == stations
+
+    def test_build_stations_unknown_task(self, sample_graph):
+        with pytest.raises(ValueError, match="unknown task"):
+            build_stations(sample_graph, [["T1", "TX"]], 10)
+
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+    def test_columnar_roundtrip(self, sample_graph, tmp_path, fmt):
+        pytest.importorskip("pyarrow")
+        from engine.columnar import write_solution, read_solution
+
+        stations = solve_rpw(sample_graph, cycle_time=10)
+        energy = calculate_energy_waste(stations, 10)
+        write_solution(str(tmp_path), sample_graph, stations, 10, energy, algorithm="rpw", fmt=fmt)
+
+        sol = read_solution(str(tmp_path))
+        assert sol.cycle_time == 10
+        assert sol.algorithm == "rpw"
+        assert sol.tables["stations"].num_rows == len(stations)
+        assert sol.tables["energy"].num_rows == len(stations)
+        assert sol.stations() == stations
+
+
+# ------------------------------------------------------------------ #
+#  Cache Tests
+# ------------------------------------------------------------------ #
+
+class TestLRUCache:
+
+    def test_evicts_least_recent(self):
+        c = LRUCache(maxsize=2)
+        c.put("a", 1)
+        c.put("b", 2)
+        c.get("a")
+        c.put("c", 3)
+        assert "a" in c and "c" in c and "b" not in c
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("engine.cache.time.monotonic", lambda: now[0])
+        c = LRUCache(maxsize=4, ttl=10)
+        c.put("k", "v")
+        now[0] += 5
+        assert c.get("k") == "v"
+        now[0] += 6
+        assert "k" not in c
+        assert c.get("k") is None
+        assert len(c) == 0
+
+    def test_get_or_set(self):
+        c = LRUCache()
+        calls = []
+        for _ in range(3):
+            assert c.get_or_set("k", lambda: calls.append(1) or None) is None
+        assert len(calls) == 1
+        assert c.stats()["hits"] == 2
+
+
+# ------------------------------------------------------------------ #
+#  Background Job Tests
+# ------------------------------------------------------------------ #
+
+class TestJobs:
+
+    @pytest.mark.parametrize("solver", [solve_rpw, solve_greedy])
+    def test_solver_progress(self, full_df, solver):
+        g = PrecedenceGraph()
+        g.load_from_dataframe(full_df)
+        calls = []
+        stations = solver(g, 15, progress=lambda st, done, total: calls.append((len(st), done, total)))
+        assert [c[0] for c in calls] == list(range(1, len(stations) + 1))
+        assert calls[-1][1:] == (10, 10)
+
+    def test_dedup_and_result(self):
+        gate = threading.Event()
+        runs = []
+
+        def work(x, progress):
+            runs.append(x)
+            progress(0.5, partial=[x])
+            gate.wait(5)
+            return x * 2
+
+        jm = JobManager(max_workers=2)
+        a = jm.submit("k", work, 21)
+        b = jm.submit("k", work, 21)
+        assert a is b
+        gate.set()
+        assert a.wait(5)
+        assert (a.status, a.result, a.progress, a.partial) == (DONE, 42, 1.0, [21])
+        assert jm.submit("k", work, 21) is a  # finished jobs are reused
+        assert jm.get(a.job_id) is a
+        assert runs == [21]
+        jm.shutdown()
+
+    def test_failure(self):
+        def boom(progress):
+            raise ValueError("bad cycle time")
+
+        jm = JobManager(max_workers=1)
+        job = jm.submit("x", boom)
+        job.wait(5)
+        assert job.status == FAILED
+        assert isinstance(job.error, ValueError)
+        assert jm.get(job.job_id) is job
+        retry = jm.submit("x", boom)  # failed jobs are not reused
+        assert retry is not job
+        retry.wait(5)
+        jm.shutdown()
+
+    def test_release_cancels_unowned_pending_job(self):
+        gate = threading.Event()
+        jm = JobManager(max_workers=1)
+        busy = jm.submit("busy", lambda progress: gate.wait(5))
+        shared = jm.submit("shared", lambda progress: "s", owner="a")
+        assert jm.submit("shared", lambda progress: "s", owner="b") is shared
+        queued = jm.submit("queued", lambda progress: "q", owner="a")
+
+        assert not jm.release(shared.job_id, "a")  # "b" still waits for it
+        assert jm.release(queued.job_id, "a")
+        assert queued.status == CANCELLED and queued.wait(0)
+        assert not jm.release(busy.job_id, None)  # ownerless and running
+        assert jm.submit("queued", lambda progress: "q2", owner="a") is not queued
+
+        gate.set()
+        assert shared.wait(5) and shared.result == "s"
+        jm.shutdown()
+
+
+# ------------------------------------------------------------------ #
+#  Shared Result Store Tests
+# ------------------------------------------------------------------ #
+
+class TestResultStore:
+
+    def test_budget_evicts_lru_unpinned(self):
+        store = ResultStore(budget_bytes=250)
+        store.put("a", "x", size=100)
+        store.put("b", "y", size=100)
+        store.acquire("a")
+        store.put("c", "z", size=100)  # over budget: "b" goes, pinned "a" stays
+        assert "a" in store and "c" in store and "b" not in store
+        assert store.stats()["evictions"] == 1
+
+    def test_release_makes_evictable(self):
+        store = ResultStore(budget_bytes=150)
+        store.put("a", "x", size=100)
+        store.acquire("a")
+        store.put("b", "y", size=100)
+        assert "a" in store and "b" not in store  # pinned entries may exceed the budget
+        store.release("a")
+        store.put("b", "y", size=100)
+        assert "a" not in store and "b" in store
+
+    def test_acquire_restores_evicted_value(self):
+        store = ResultStore(budget_bytes=1000)
+        with pytest.raises(KeyError):
+            store.acquire("k")
+        assert store.acquire("k", [1, 2]) == [1, 2]
+        assert store.refcount("k") == 1
+
+    def test_refs_slots_and_finalizer(self):
+        store = ResultStore(budget_bytes=10_000)
+        refs = StoreRefs(store)
+        refs.hold("input", "k1", "v1")
+        refs.hold("input", "k1", "v1")  # same key: no extra reference
+        assert store.refcount("k1") == 1
+        refs.hold("input", "k2", "v2")
+        assert (store.refcount("k1"), store.refcount("k2")) == (0, 1)
+        assert refs.get("input") == "v2" and refs.get("missing") is None
+
+        other = StoreRefs(store)
+        other.hold("input", "k2")
+        assert store.refcount("k2") == 2
+        del refs, other
+        assert store.refcount("k2") == 0
+
+    def test_estimate_size_dataframe(self, full_df):
+        assert estimate_size(full_df) == int(full_df.memory_usage(deep=True).sum())
+        assert estimate_size([full_df, full_df]) > 2 * estimate_size(full_df)
+
+
+# ------------------------------------------------------------------ #
+#  Batch CLI Tests
+# ------------------------------------------------------------------ #
+
+class TestCLI:
+
+    def test_parse_cycle_times(self):
+        assert parse_cycle_times("15") == [15.0]
+        assert parse_cycle_times("10:12:0.5,20") == [10.0, 10.5, 11.0, 11.5, 12.0, 20.0]
+        for bad in ("0", "20:10", "10:20:0", "a"):
+            with pytest.raises(ValueError):
+                parse_cycle_times(bad)
+
+    def test_solve_jsonl(self, tmp_path, full_df, capsys):
+        lines = tmp_path / "lines"
+        lines.mkdir()
+        full_df.to_csv(lines / "a.csv", index=False)
+        full_df.to_csv(lines / "b.csv", index=False)
+        out = tmp_path / "results.jsonl"
+
+        rc = cli_main(["solve", str(lines), "-c", "5,15", "-a", "all", "-j", "1", "-o", str(out)])
+        records = [json.loads(line) for line in out.read_text().splitlines()]
+        assert rc == 1  # CT=5 is below the longest task
+        assert [(r["line"], r["cycle_time"], r["algorithm"]) for r in records][:3] == [
+            ("a", 5.0, "rpw"), ("a", 5.0, "greedy"), ("a", 15.0, "rpw"),
+        ]
+        ok = [r for r in records if r["status"] == "ok"]
+        assert len(ok) == 4 and all(r["metrics"]["num_stations"] == len(r["assignment"]) for r in ok)
+        assert "Solved 4/8 jobs" in capsys.readouterr().err
+
+    def test_solve_save(self, tmp_path, full_df):
+        from data.database import list_scenarios
+
+        full_df.to_csv(tmp_path / "line.csv", index=False)
+        db = str(tmp_path / "cli.db")
+        rc = cli_main(["solve", str(tmp_path / "line.csv"), "-c", "15:16", "-j", "1",
+                       "--cache", "--save", "--db", db, "-o", str(tmp_path / "r.jsonl")])
+        assert rc == 0
+        assert sorted(s["name"] for s in list_scenarios(db_path=db)) == ["line_RPW_CT15", "line_RPW_CT16"]
+
+    @pytest.mark.parametrize("content", [
+        "",
+        "task_id,task_name,duration,predecessors\n",
+        "task_id,task_name,duration,predecessors\nA,a,0,\n",
+        "task_id,task_name,duration,predecessors\nA,a,1,\nA,b,2,\n",
+    ])
+    def test_solve_job_invalid_file(self, tmp_path, content):
+        path = tmp_path / "bad.csv"
+        path.write_text(content)
+        record = solve_job(str(path), 10.0, "rpw")
+        assert record["status"] == "error"
+        assert "Task data errors" in record["error"]
+
+    def test_bad_file_does_not_abort_batch(self, tmp_path, full_df):
+        full_df.to_csv(tmp_path / "a.csv", index=False)
+        full_df.to_csv(tmp_path / "c.csv", index=False)
+        # A field over csv.field_size_limit() raises csv.Error while reading
+        (tmp_path / "b.csv").write_text("task_id,task_name,duration,predecessors\nA," + "x" * 200_000 + ",1,\n")
+        bad_cache = tmp_path / "cache.db"
+        bad_cache.write_bytes(b"not a database" * 100)
+
+        jobs = [(str(tmp_path / f"{name}.csv"), 15.0, "rpw") for name in "abc"]
+        records = list(run_jobs(jobs, workers=2))
+        assert [r["status"] for r in records] == ["ok", "error", "ok"]
+        assert "field larger than field limit" in records[1]["error"]
+
+        record = solve_job(str(tmp_path / "a.csv"), 15.0, "rpw", cache_db=str(bad_cache))
+        assert record["status"] == "error"
+        assert "not a database" in record["error"]
+
+
+# ------------------------------------------------------------------ #
+#  Incremental Update & Watch Mode Tests
+# ------------------------------------------------------------------ #
+
+class TestIncremental:
+
+    def _graph(self, df):
+        g = PrecedenceGraph()
+        g.load_from_dataframe(df)
+        return g
+
+    def test_diff_and_apply(self, full_df):
+        old = self._graph(full_df)
+        changed = full_df.copy()
+        changed.loc[changed["task_id"] == "T8", "duration"] = 5
+        changed.loc[changed["task_id"] == "T7", "predecessors"] = "T5 T3"
+        changed = changed[changed["task_id"] != "T10"]
+        new = self._graph(changed)
+
+        diff = diff_graphs(old, new)
+        assert diff.durations == {"T8": 5.0}
+        assert diff.edges_added == [("T3", "T7")]
+        assert diff.removed == ["T10"] and not diff.added
+        apply_diff(old, diff)
+        assert old.tasks == new.tasks
+        assert {t: sorted(p) for t, p in old.predecessors.items() if t in old.tasks} == \
+            {t: sorted(p) for t, p in new.predecessors.items() if t in new.tasks}
+        assert diff_graphs(old, new).empty
+
+    def test_repair_reuses_untouched_stations(self, full_df):
+        graph = self._graph(full_df)
+        stations = solve_rpw(graph, 15)
+        changed = full_df.copy()
+        changed.loc[changed["task_id"] == "T10", "duration"] = 1
+        diff = diff_graphs(graph, self._graph(changed))
+        apply_diff(graph, diff)
+
+        repaired = repair_stations(graph, stations, 15, diff)
+        last = max(s["station_id"] for s in stations)
+        assert [s is old for s, old in zip(repaired, stations)] == [s["station_id"] != last for s in stations]
+        assert repaired[-1]["total_time"] == stations[-1]["total_time"] - 1
+
+        # A duration that overflows its station needs a re-solve
+        changed.loc[changed["task_id"] == "T10", "duration"] = 14
+        diff = diff_graphs(graph, self._graph(changed))
+        apply_diff(graph, diff)
+        assert repair_stations(graph, repaired, 15, diff) is None
+
+    def test_watch_directory(self, tmp_path, full_df):
+        src, out = tmp_path / "in", tmp_path / "out"
+        src.mkdir()
+        full_df.to_csv(src / "line.csv", index=False)
+        w = DirectoryWatcher(str(src), str(out), [15], ["rpw"], log=lambda msg: None)
+
+        [loaded] = w.scan()
+        assert loaded["action"] == "loaded" and loaded["solved"] == 1
+        jes_dir = out / "line" / "rpw_ct15"
+        n_stations = len(json.loads((jes_dir / "result.json").read_text())["assignment"])
+        assert loaded["jes_written"] == n_stations
+        assert w.scan() == []  # nothing changed
+
+        changed = full_df.copy()
+        changed.loc[changed["task_id"] == "T10", "duration"] = 1
+        changed.to_csv(src / "line.csv", index=False)
+        os.utime(src / "line.csv", ns=(0, 1))  # make sure the signature changes
+        [updated] = w.scan()
+        assert (updated["action"], updated["repaired"], updated["jes_written"]) == ("updated", 1, 1)
+        assert json.loads((jes_dir / "result.json").read_text())["mode"] == "repaired"
+
+        (src / "line.csv").write_text("")  # truncated file: keep the previous graph
+        [error] = w.scan()
+        assert error["action"] == "error"
+        assert len(w.lines[str(src / "line.csv")].graph.tasks) == 10
+
+    def test_watch_graph_follows_file(self, tmp_path, full_df):
+        src = tmp_path / "in"
+        src.mkdir()
+        path = src / "line.csv"
+        full_df.to_csv(path, index=False)
+        w = DirectoryWatcher(str(src), str(tmp_path / "out"), [15], ["rpw"], log=lambda msg: None)
+        w.scan()
+
+        new_task = pd.DataFrame({"task_id": ["T0"], "task_name": ["Kitting"], "duration": [2], "predecessors": [""]})
+        changed = pd.concat([new_task, full_df], ignore_index=True)
+        changed.to_csv(path, index=False)
+        os.utime(path, ns=(0, 1))
+        [updated] = w.scan()
+        assert updated["action"] == "updated"
+        graph = w.lines[str(path)].graph
+        assert list(graph.tasks) == list(changed["task_id"])
+        fresh = PrecedenceGraph()
+        fresh.load_from_dataframe(changed)
+        assert graph_hash(graph) == graph_hash(fresh)
+
+        # Invalid data is rejected and the previous graph kept
+        for bad in (changed.assign(duration=0), pd.concat([changed, changed.tail(1)])):
+            bad.to_csv(path, index=False)
+            os.utime(path, ns=(0, 2))
+            [error] = w.scan()
+            assert error["action"] == "error" and "Task data errors" in error["error"]
+            assert w.lines[str(path)].graph is graph
+
 
 # ------------------------------------------------------------------ #
 #  Integration Test
@@ -0,0 +1,309 @@
+"""
+test_ui.py — Unit tests for the dashboard components (no Streamlit session needed)
+"""
+
+import io
+import sys
+import os
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pandas as pd
+
+import ui.components as components
+from ui import pipeline
+from engine.energy_waste import calculate_energy_waste
+from engine.graph import PrecedenceGraph
+from engine.hashing import station_hash
+from engine.metrics import compute_all_metrics
+from engine.rpw_solver import solve_rpw
+from ui.components import (
+    DAG_DETAIL_LIMIT,
+    DAG_LABEL_LIMIT,
+    LOAD_LABEL_LIMIT,
+    bottleneck_grid,
+    bottleneck_page,
+    create_load_figure,
+    create_dag_figure,
+    dag_drilldown_views,
+    dag_layer_groups,
+    dag_layout,
+    dag_view_label,
+    generate_excel_export,
+    jes_steps_html,
+)
+
+
+# ------------------------------------------------------------------ #
+#  Test Fixtures
+# ------------------------------------------------------------------ #
+
+@pytest.fixture
+def graph():
+    """10-task line (same as sample_tasks.csv)."""
+    g = PrecedenceGraph()
+    g.load_from_csv(os.path.join(os.path.dirname(os.path.dirname(__file__)), "sample_tasks.csv"))
+    return g
+
+
+def chain_graph(n_layers, width=1):
+    """n_layers layers of width tasks; every task depends on the first task of the previous layer."""
+    g = PrecedenceGraph()
+    g.load_from_records(
+        (f"L{d}_{i}", f"Task {d}.{i}", 1.0, f"L{d - 1}_0" if d else "")
+        for d in range(n_layers) for i in range(width)
+    )
+    return g
+
+
+def solution(graph, ct):
+    stations = solve_rpw(graph, ct)
+    metrics = compute_all_metrics(stations, ct, graph.total_work_content())
+    return metrics, stations, calculate_energy_waste(stations, ct)
+
+
+def wide_line(n):
+    """n stations with loads 1..n (shuffled) at cycle time n."""
+    loads = [(i * 7) % n + 1 for i in range(n)]
+    return [
+        {"station_id": i + 1, "tasks": [f"T{i + 1}", f"<T{i + 1}b>"], "total_time": load, "idle_time": n - load}
+        for i, load in enumerate(loads)
+    ]
+
+
+# ------------------------------------------------------------------ #
+#  Pipeline Tests
+# ------------------------------------------------------------------ #
+
+class TestFrameInput:
+
+    def test_key_follows_contents(self):
+        df = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(__file__)), "sample_tasks.csv")).fillna("")
+        key, (_, graph, _) = pipeline.frame_input(df)
+        assert len(graph.tasks) == 10
+        assert pipeline.frame_input(df.copy())[0] == key
+        assert pipeline.frame_input(df.set_axis(range(100, 110)))[0] == key  # index is ignored
+
+        edited = df.copy()
+        edited.loc[3, "duration"] = 9
+        assert pipeline.frame_input(edited)[0] != key
+        assert pipeline.frame_input(df[["task_name", "task_id", "duration", "predecessors"]])[0] != key
+
+    def test_validated_like_an_upload(self):
+        df = pd.DataFrame({"task_id": ["T1", "T2"], "task_name": ["a", "b"], "duration": [5.0, 0.0], "predecessors": ["", "T1"]})
+        with pytest.raises(ValueError, match="Invalid duration"):
+            pipeline.frame_input(df)
+        with pytest.raises(ValueError, match="unknown predecessor: 'T9'"):
+            pipeline.frame_input(df.assign(duration=[5.0, 4.0], predecessors=["", "T9"]))
+
+
+# ------------------------------------------------------------------ #
+#  Results Tab Component Tests
+# ------------------------------------------------------------------ #
+
+class TestBottlenecks:
+
+    def scores(self, n):
+        return [
+            {"station_id": s["station_id"], "load_percent": s["total_time"], "is_bottleneck": s["total_time"] == 50}
+            for s in wide_line(n)
+        ]
+
+    def test_sorted_by_load(self):
+        shown, pages = bottleneck_page(self.scores(10))
+        assert pages == 1
+        assert [b["load_percent"] for b in shown] == list(range(10, 0, -1))
+
+    def test_pagination(self):
+        scores = self.scores(50)
+        pages = [bottleneck_page(scores, p)[0] for p in (1, 2, 3)]
+        assert bottleneck_page(scores)[1] == 3
+        assert [len(p) for p in pages] == [24, 24, 2]
+        assert [b["load_percent"] for p in pages for b in p] == list(range(50, 0, -1))
+        assert bottleneck_page(scores, 99)[0] == pages[-1]  # clamped to the last page
+        assert bottleneck_page([], 1) == ([], 1)
+
+    def test_grid_is_one_block(self):
+        shown, _ = bottleneck_page(self.scores(50))
+        block = bottleneck_grid(shown)
+        assert block.count('class="bn"') == 24
+        first = block.split('class="bn"')[1]
+        assert ">50%<" in first and "BOTTLENECK" in first  # most loaded station leads
+
+
+class TestLoadFigure:
+
+    def test_two_traces_with_customdata(self):
+        stations = wide_line(100)
+        fig = create_load_figure(stations, 100, "Loads")
+        assert [t.name for t in fig.data] == ["Load", "Idle"]
+        assert list(fig.data[0].x) == [s["total_time"] for s in stations]
+        assert list(fig.data[1].x) == [s["idle_time"] for s in stations]
+        sid, idle, tasks = fig.data[0].customdata[3]
+        assert (sid, idle) == (4, stations[3]["idle_time"])
+        assert tasks == "T4, &lt;T4b&gt;"  # task names are escaped for the hover
+        assert fig.data[1].hoverinfo == "skip"
+
+    def test_labels_only_for_small_lines(self):
+        assert create_load_figure(wide_line(LOAD_LABEL_LIMIT), 40, "x").data[0].text is not None
+        assert create_load_figure(wide_line(LOAD_LABEL_LIMIT + 1), 41, "x").data[0].text is None
+
+    def test_negative_idle_is_clipped(self):
+        stations = [{"station_id": 1, "tasks": ["T1"], "total_time": 12, "idle_time": -2}]
+        assert list(create_load_figure(stations, 10, "x").data[1].x) == [0]
+
+
+class TestJesStepsHtml:
+
+    def test_cached_per_station_hash(self, graph):
+        components._STEPS_HTML_CACHE.clear()
+        station = solve_rpw(graph, 15)[0]
+        block = jes_steps_html(station, 15)
+        assert block.count('class="js"') == len(station["tasks"])
+        assert jes_steps_html(dict(station), 15) is block  # same content, new dict: cache hit
+        assert components._STEPS_HTML_CACHE.get(station_hash(station, 15)) is block
+        assert jes_steps_html(station, 16) is not block  # cycle time is part of the key
+        assert components._STEPS_HTML_CACHE.stats()["hits"] >= 1
+
+    def test_task_names_escaped(self):
+        g = PrecedenceGraph()
+        g.load_from_records([("<T1>", "<script>alert('x')</script> & weld", 4, "")])
+        station = solve_rpw(g, 10)[0]
+        block = jes_steps_html(station, 10)
+        assert "<script>" not in block and "<T1>" not in block
+        assert "&lt;script&gt;" in block and "&amp; weld" in block
+        assert "<code>&lt;T1&gt;</code>" in block
+
+
+# ------------------------------------------------------------------ #
+#  Excel Export Tests
+# ------------------------------------------------------------------ #
+
+class TestExcelExport:
+
+    def test_cached_per_solution(self, graph):
+        components._EXCEL_CACHE.clear()
+        metrics, stations, energy = solution(graph, 15)
+        first = generate_excel_export(metrics, stations, energy, 15, "RPW")
+        again = generate_excel_export(metrics, [dict(s) for s in stations], energy, 15, "RPW")
+        assert again is first  # same solution hash: served from _EXCEL_CACHE
+        assert components._EXCEL_CACHE.stats()["hits"] == 1
+
+    def test_new_workbook_when_stations_change(self, graph):
+        metrics, stations, energy = solution(graph, 15)
+        first = generate_excel_export(metrics, stations, energy, 15, "RPW")
+        metrics2, stations2, energy2 = solution(graph, 20)
+        assert stations2 != stations
+        assert generate_excel_export(metrics2, stations2, energy2, 20, "RPW") != first
+
+    def test_sheet_contents(self, graph):
+        from openpyxl import load_workbook
+
+        metrics, stations, energy = solution(graph, 15)
+        wb = load_workbook(io.BytesIO(generate_excel_export(metrics, stations, energy, 15, "RPW")), read_only=True)
+        assert wb.sheetnames == ["Summary", "Stations", "Energy", "JES Works Instructions"]
+
+        summary = list(wb["Summary"].values)
+        assert summary[1][:4] == ("RPW", 15, metrics["line_efficiency"], len(stations))
+
+        rows = list(wb["Stations"].values)[1:]
+        assert [(r[0], r[1]) for r in rows] == [(s["station_id"], t) for s in stations for t in s["tasks"]]
+        assert {r[1]: r[3] for r in rows} == {t: graph.tasks[t]["duration"] for t in graph.tasks}
+
+        energy_rows = list(wb["Energy"].values)[1:]
+        assert [r[0] for r in energy_rows] == [s["station_id"] for s in stations]
+        assert sum(r[1] for r in energy_rows) == pytest.approx(energy.total_idle_time)
+
+        jes_rows = list(wb["JES Works Instructions"].values)[1:]
+        assert len(jes_rows) == len(graph.tasks)
+        assert jes_rows[0][:3] == (stations[0]["station_id"], 1, stations[0]["tasks"][0])
+        wb.close()
+
+    def test_bold_headers(self, graph):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(io.BytesIO(generate_excel_export(*solution(graph, 15), 15, "RPW")))
+        for ws in wb.worksheets:
+            assert all(c.font.bold for c in ws[1])
+            assert not any(c.font.bold for c in ws[2])
+
+    def test_cache_bounded_by_bytes(self, graph, monkeypatch):
+        monkeypatch.setattr(components, "_EXCEL_CACHE", components.ResultStore(1))
+        data = generate_excel_export(*solution(graph, 15), 15, "RPW")
+        stats = components._EXCEL_CACHE.stats()
+        assert stats["entries"] == 0 and stats["evictions"] == 1  # larger than the whole budget
+
+        monkeypatch.setattr(components, "_EXCEL_CACHE", components.ResultStore(2 * len(data)))
+        for ct in (15, 16, 20):
+            generate_excel_export(*solution(graph, ct), ct, "RPW")
+        assert components._EXCEL_CACHE.stats()["size_bytes"] <= 2 * len(data)
+        assert components._EXCEL_CACHE.stats()["evictions"] >= 1
+
+
+# ------------------------------------------------------------------ #
+#  DAG Figure Tests
+# ------------------------------------------------------------------ #
+
+class TestDag:
+
+    def test_layout_layers(self, graph):
+        lay = dag_layout(graph)
+        assert lay["layers"][:3] == [["T1"], ["T2", "T3"], ["T4", "T5"]]
+        assert sum(len(layer) for layer in lay["layers"]) == len(graph.tasks)
+        # every edge goes to a later layer; nodes of a layer are centred on y=0
+        for tid, preds in graph.predecessors.items():
+            assert all(lay["pos"][p][0] < lay["pos"][tid][0] for p in preds)
+        assert lay["pos"]["T2"] == (1, 0.5) and lay["pos"]["T3"] == (1, -0.5)
+
+    def test_layout_cycle(self):
+        g = chain_graph(2)
+        g.predecessors["L0_0"].append("L1_0")
+        g.successors["L1_0"].append("L0_0")
+        with pytest.raises(ValueError):
+            dag_layout(g)
+
+    def test_layer_groups(self):
+        lay = dag_layout(chain_graph(10))
+        assert dag_layer_groups(lay, max_groups=4) == [(0, 2), (3, 5), (6, 8), (9, 9)]
+        assert dag_layer_groups(lay, max_groups=20) == [(d, d) for d in range(10)]
+        groups = dag_layer_groups(dag_layout(chain_graph(1000)))
+        assert len(groups) <= 120
+        assert groups[0][0] == 0 and groups[-1][1] == 999
+        assert all(a[1] + 1 == b[0] for a, b in zip(groups, groups[1:]))
+
+    def test_scattergl_switch(self):
+        small = create_dag_figure(chain_graph(DAG_LABEL_LIMIT))
+        assert {t.type for t in small.data} == {"scatter"}
+        assert small.data[1].text is not None
+
+        medium = create_dag_figure(chain_graph(DAG_LABEL_LIMIT + 1))
+        assert {t.type for t in medium.data} == {"scattergl"}
+        assert medium.data[1].text is None
+
+        large = chain_graph(DAG_DETAIL_LIMIT + 1)
+        overview = create_dag_figure(large)
+        assert {t.type for t in overview.data} == {"scattergl"}
+        assert len(overview.data[1].x) == len(dag_layer_groups(dag_layout(large)))
+
+    def test_wide_layer_is_paged(self):
+        width = DAG_DETAIL_LIMIT + 100
+        g = chain_graph(1, width=width)
+        lay = dag_layout(g)
+        views = dag_drilldown_views(lay)
+        assert views == [(0, 0, 0), (0, 0, 1)]
+        assert "tasks 1,501–1,600" in dag_view_label(lay, views[1])
+
+        shown = []
+        for view in views:
+            fig = create_dag_figure(g, lay, view)
+            shown.extend(fig.data[1].hovertext)
+        assert len(shown) == width  # every task is reachable, none twice
+        assert len(set(shown)) == width
+        assert "tasks 1,501–1,600 of 1,600" in create_dag_figure(g, lay, views[1]).layout.title.text
+
+    def test_two_element_range_still_accepted(self, graph):
+        lay = dag_layout(graph)
+        fig = create_dag_figure(graph, lay, (0, 1))
+        assert list(fig.data[1].x) == [0, 1, 1]
@@ -1,9 +1,13 @@
-import pandas as pd
 import plotly.graph_objects as go
 from collections import defaultdict
+import html
 import io
 
+from engine.cache import LRUCache
 from engine.graph import PrecedenceGraph
+from engine.hashing import solution_hash, station_hash
+from engine.jes_generator import generate_station_jes
+from engine.store import ResultStore
 from ui.styles import C, PLOTLY_LAYOUT
 
 def metric_card(value, label, color=None):
@@ -11,109 +15,369 @@ def metric_card(value, label, color=None):
         color = C["text"]
     return f'<div class="mc"><div class="v" style="color:{color};">{value}</div><div class="l">{label}</div></div>'
 
-def create_dag_figure(g: PrecedenceGraph) -> go.Figure:
-    """Create a Plotly network graph defining the DAG layout manually using topological layers."""
-    try:
-        order = g.topological_sort()
-    except Exception:
-        return go.Figure()
 
+def bottleneck_grid(scores):
+    """Bottleneck badges as one CSS-grid HTML block (one payload, any station count)."""
+    cells = []
+    for bn in scores:
+        bc = "b-r" if bn["is_bottleneck"] else "b-y" if bn["load_percent"] >= 70 else "b-g"
+        bl = "BOTTLENECK" if bn["is_bottleneck"] else "OPTIMAL"
+        cells.append(f'<div class="bn"><div class="sid">Station {bn["station_id"]}</div><div class="pct">{bn["load_percent"]}%</div><span class="b {bc}">{bl}</span></div>')
+    return f'<div class="bng">{"".join(cells)}</div>'
+
+
+def bottleneck_page(scores, page=1, per_page=24):
+    """(scores on page, page count) — most loaded stations first, pages numbered from 1."""
+    ranked = sorted(scores, key=lambda b: b["load_percent"], reverse=True)
+    pages = max(1, -(-len(ranked) // per_page))
+    page = min(max(1, page), pages)
+    return ranked[(page - 1) * per_page: page * per_page], pages
+
+
+# Station load chart: per-bar text labels only up to this many stations
+LOAD_LABEL_LIMIT = 40
+
+
+def create_load_figure(stations, cycle_time, title):
+    """Horizontal stacked load/idle bars — two array-backed traces for any number of stations."""
+    labels = [f"Stn {s['station_id']}" for s in stations]
+    loads = [s["total_time"] for s in stations]
+    idles = [max(s["idle_time"], 0) for s in stations]
+    tasks = [", ".join(html.escape(str(t)) for t in s["tasks"]) for s in stations]
+    show_text = len(stations) <= LOAD_LABEL_LIMIT
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=loads, y=labels, orientation="h", name="Load",
+        text=[f"{l}s  ({t})" for l, t in zip(loads, tasks)] if show_text else None,
+        textposition="inside", textfont=dict(size=11),
+        customdata=list(zip([s["station_id"] for s in stations], idles, tasks)),
+        marker=dict(color=C["primary"], line=dict(width=0)),
+        hovertemplate="<b>Station %{customdata[0]}</b><br>Load: %{x}s<br>Idle: %{customdata[1]}s<br>Tasks: %{customdata[2]}<extra></extra>",
+    ))
+    fig.add_trace(go.Bar(
+        x=idles, y=labels, orientation="h", name="Idle",
+        text=[f"{i}s" if i > 0 else "" for i in idles] if show_text else None,
+        textposition="inside", textfont=dict(size=10, color="rgba(248,250,252,0.5)"),
+        marker=dict(color="rgba(239,68,68,0.2)", line=dict(width=0)),
+        hoverinfo="skip",
+    ))
+    fig.add_vline(x=cycle_time, line_dash="dash", line_color=C["warning"], annotation_text=f"CT={cycle_time}s", annotation_font=dict(color=C["warning"], size=11))
+    row_px = 55 if show_text else 18
+    fig.update_layout(
+        **PLOTLY_LAYOUT, barmode="stack", title=dict(text=title, font=dict(size=14)),
+        xaxis_title="Time (sec)", yaxis_title="", height=max(220, len(stations) * row_px + 60), showlegend=False,
+    )
+    return fig
+
+# DAG rendering: full detail up to DAG_DETAIL_LIMIT tasks, otherwise
+# consecutive topological layers are collapsed into at most DAG_MAX_GROUPS nodes
+DAG_DETAIL_LIMIT = 1500
+DAG_LABEL_LIMIT = 150
+DAG_MAX_GROUPS = 120
+
+
+def dag_layout(g: PrecedenceGraph):
+    """
+    Topological layer layout: {"layers": [[task_id, ...], ...], "pos": {task_id: (x, y)}}.
+    Raises ValueError if the graph has a cycle.
+    """
     depth = {}
-    for tid in order:
+    for tid in g.topological_sort():
         preds = g.predecessors[tid]
         depth[tid] = 0 if not preds else max(depth[p] for p in preds) + 1
 
-    layers = defaultdict(list)
+    layers = [[] for _ in range(max(depth.values(), default=-1) + 1)]
     for tid, d in depth.items():
         layers[d].append(tid)
 
     pos = {}
-    for d, nodes in layers.items():
+    for d, nodes in enumerate(layers):
         n = len(nodes)
         for i, tid in enumerate(nodes):
             pos[tid] = (d, (n - 1) / 2.0 - i)
+    return {"layers": layers, "pos": pos}
+
+
+def dag_layer_groups(layout, max_groups=DAG_MAX_GROUPS):
+    """Consecutive layer ranges [(first, last), ...] — one collapsed node each."""
+    n = len(layout["layers"])
+    size = max(1, -(-n // max_groups))
+    return [(lo, min(lo + size, n) - 1) for lo in range(0, n, size)]
+
+
+def dag_drilldown_views(layout, max_groups=DAG_MAX_GROUPS):
+    """
+    Drill-down targets [(first, last, page), ...]: each layer group, split
+    into pages of DAG_DETAIL_LIMIT tasks when it is wider than that (a single
+    layer can hold more tasks than one detail figure shows).
+    """
+    views = []
+    for lo, hi in dag_layer_groups(layout, max_groups):
+        n = sum(len(layout["layers"][d]) for d in range(lo, hi + 1))
+        views.extend((lo, hi, page) for page in range(max(1, -(-n // DAG_DETAIL_LIMIT))))
+    return views
+
+
+def dag_view_label(layout, view):
+    """Selectbox label of a dag_drilldown_views() entry."""
+    lo, hi, page = view
+    n = sum(len(layout["layers"][d]) for d in range(lo, hi + 1))
+    label = f"Layers {lo}–{hi} ({n:,} tasks)"
+    if n > DAG_DETAIL_LIMIT:
+        first = page * DAG_DETAIL_LIMIT
+        label += f" · tasks {first + 1:,}–{min(first + DAG_DETAIL_LIMIT, n):,}"
+    return label
+
+
+def create_dag_figure(g: PrecedenceGraph, layout=None, layers=None) -> go.Figure:
+    """
+    Precedence graph figure (WebGL above DAG_LABEL_LIMIT tasks).
+
+    Args:
+        layout : dag_layout(g), if already computed (it is cached per graph)
+        layers : (first, last[, page]) layer range to drill into; ranges with
+                 more than DAG_DETAIL_LIMIT tasks are shown one page at a
+                 time. None shows the whole graph, collapsed into layer
+                 groups when it is too large
+    """
+    if layout is None:
+        try:
+            layout = dag_layout(g)
+        except ValueError:
+            return go.Figure()
+
+    if layers is None and len(g.tasks) > DAG_DETAIL_LIMIT:
+        return _dag_overview_figure(g, layout)
+
+    lo, hi, page = (tuple(layers) + (0,))[:3] if layers is not None else (0, len(layout["layers"]) - 1, 0)
+    tasks = [t for d in range(lo, hi + 1) for t in layout["layers"][d]]
+    total = len(tasks)
+    first = page * DAG_DETAIL_LIMIT
+    tasks = tasks[first:first + DAG_DETAIL_LIMIT]
+    return _dag_detail_figure(g, layout, tasks, (first, total) if total > DAG_DETAIL_LIMIT else None)
+
+
+def _dag_detail_figure(g, layout, tasks, paged=None):
+    pos = layout["pos"]
+    shown = set(tasks)
+    labels = len(tasks) <= DAG_LABEL_LIMIT
+    scatter = go.Scatter if labels else go.Scattergl
 
     edge_x, edge_y = [], []
-    for tid in g.tasks:
+    for tid in tasks:
         x0, y0 = pos[tid]
         for succ in g.successors[tid]:
-            x1, y1 = pos[succ]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
+            if succ in shown:
+                x1, y1 = pos[succ]
+                edge_x.extend([x0, x1, None])
+                edge_y.extend([y0, y1, None])
 
-    node_x = [pos[t][0] for t in g.tasks]
-    node_y = [pos[t][1] for t in g.tasks]
-    node_color = [g.tasks[t]["duration"] for t in g.tasks]
     node_text = [
         f"<b>{t}</b><br>{g.tasks[t]['name']}<br>{g.tasks[t]['duration']}s"
-        for t in g.tasks
+        for t in tasks
     ]
 
     fig = go.Figure()
     # Edges
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter(
         x=edge_x, y=edge_y, mode="lines",
-        line=dict(color="rgba(148,163,184,0.3)", width=2),
+        line=dict(color="rgba(148,163,184,0.3)", width=2 if labels else 1),
         hoverinfo="none", showlegend=False
     ))
     # Nodes
-    fig.add_trace(go.Scatter(
-        x=node_x, y=node_y, mode="markers+text",
-        text=list(g.tasks.keys()), textposition="middle center",
+    fig.add_trace(scatter(
+        x=[pos[t][0] for t in tasks], y=[pos[t][1] for t in tasks],
+        mode="markers+text" if labels else "markers",
+        text=tasks if labels else None, textposition="middle center",
         hovertext=node_text, hoverinfo="text",
         marker=dict(
-            size=38, color=node_color, colorscale="Viridis", showscale=True,
+            size=38 if labels else 8, color=[g.tasks[t]["duration"] for t in tasks],
+            colorscale="Viridis", showscale=True,
             colorbar=dict(title="Duration (s)", thickness=10, len=0.8),
-            line=dict(width=2, color=C["bg"])
+            line=dict(width=2 if labels else 0, color=C["bg"])
         ),
         textfont=dict(color="white", size=11, weight="bold"), showlegend=False
     ))
+    title = "Task Precedence Graph (DAG)"
+    if paged is not None:
+        first, total = paged
+        title += f" — tasks {first + 1:,}–{first + len(tasks):,} of {total:,} in the selection"
     fig.update_layout(**PLOTLY_LAYOUT)
     fig.update_layout(
-        title=dict(text="Task Precedence Graph (DAG)", font=dict(size=14)),
+        title=dict(text=title, font=dict(size=14)),
         xaxis=dict(visible=False), yaxis=dict(visible=False),
         height=400, margin=dict(l=10, r=10, t=40, b=10)
     )
     return fig
 
-def generate_excel_export(metrics, stations, energy, jes_all, ct, algo):
-    """Generate in-memory Excel file with multiple sheets."""
+
+def _dag_overview_figure(g, layout):
+    """One node per layer group (size ~ task count, colour = work content)."""
+    groups = dag_layer_groups(layout)
+    group_of = {}
+    counts, work = [], []
+    for gi, (lo, hi) in enumerate(groups):
+        n, w = 0, 0.0
+        for d in range(lo, hi + 1):
+            for tid in layout["layers"][d]:
+                group_of[tid] = gi
+                w += g.tasks[tid]["duration"]
+            n += len(layout["layers"][d])
+        counts.append(n)
+        work.append(round(w, 2))
+
+    links = defaultdict(int)
+    for tid, gi in group_of.items():
+        for succ in g.successors[tid]:
+            gj = group_of[succ]
+            if gj != gi:
+                links[(gi, gj)] += 1
+
+    # Groups sit on a line; forward links arc above it, sized by edge count
+    edge_x, edge_y = [], []
+    for (gi, gj), _ in links.items():
+        mid = (gi + gj) / 2.0
+        edge_x.extend([gi, mid, gj, None])
+        edge_y.extend([0, 0.15 * (gj - gi), 0, None])
+
+    peak = max(counts)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=edge_x, y=edge_y, mode="lines",
+        line=dict(color="rgba(148,163,184,0.25)", width=1),
+        hoverinfo="none", showlegend=False
+    ))
+    fig.add_trace(go.Scattergl(
+        x=list(range(len(groups))), y=[0] * len(groups), mode="markers",
+        hovertext=[
+            f"<b>Layers {lo}–{hi}</b><br>{n:,} tasks<br>{w}s work content"
+            for (lo, hi), n, w in zip(groups, counts, work)
+        ],
+        hoverinfo="text",
+        marker=dict(
+            size=[10 + 30 * (n / peak) ** 0.5 for n in counts], color=work,
+            colorscale="Viridis", showscale=True,
+            colorbar=dict(title="Work (s)", thickness=10, len=0.8),
+            line=dict(width=0)
+        ),
+        showlegend=False
+    ))
+    fig.update_layout(**PLOTLY_LAYOUT)
+    fig.update_layout(
+        title=dict(text=f"Task Precedence Graph — {len(g.tasks):,} tasks in {len(groups)} layer groups", font=dict(size=14)),
+        xaxis=dict(visible=False), yaxis=dict(visible=False),
+        height=400, margin=dict(l=10, r=10, t=40, b=10)
+    )
+    return fig
+
+# Rendered work-step lists keyed by station content hash
+_STEPS_HTML_CACHE = LRUCache(maxsize=512)
+
+
+def jes_steps_html(station, cycle_time):
+    """
+    All JES work steps of one station as a single HTML block.
+
+    Built once per station content (and cycle time), so switching stations
+    sends one cached payload instead of one markdown element per step.
+    """
+    key = station_hash(station, cycle_time)
+    cached = _STEPS_HTML_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    jes = generate_station_jes(station, cycle_time)
+    ct = jes["cycle_time"]
+    bar = f"background:linear-gradient(90deg,{C['primary']},{C['primary2']});"
+    kp_style = f'color:{C["warning"]}; font-size:.8rem; margin-top:.5rem;'
+    parts = []
+    for s in jes["steps"]:
+        prog = round((s["cumulative_time"] / ct) * 100, 1)
+        kp = f'<div style="{kp_style}">📌 {html.escape(s["key_points"])}</div>' if s["key_points"] else ""
+        parts.append(
+            f'<div class="js"><div class="h"><span>Step {s["step"]}: {html.escape(s["task_name"])}</span><span class="t">⏱️ {s["duration"]}s</span></div>'
+            f'<div class="d"><span>ID: <code>{html.escape(s["task_id"])}</code></span><span>Σ {s["cumulative_time"]}/{ct}s</span><span>Rem: {s["remaining_time"]}s</span></div>'
+            f'<div class="pt"><div class="pb" style="width:{prog}%; {bar}"></div></div>{kp}</div>'
+        )
+    block = "".join(parts)
+    _STEPS_HTML_CACHE.put(key, block)
+    return block
+
+
+# Built workbooks keyed by (solution hash, algorithm, energy totals), bounded by
+# total bytes since one workbook of a large line can be tens of MB
+EXCEL_CACHE_BYTES = 64 * 1024 * 1024
+_EXCEL_CACHE = ResultStore(EXCEL_CACHE_BYTES)
+
+
+def _header_row(ws, names, font):
+    from openpyxl.cell import WriteOnlyCell
+
+    cells = []
+    for name in names:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = font
+        cells.append(cell)
+    ws.append(cells)
+
+
+def generate_excel_export(metrics, stations, energy, ct, algo):
+    """
+    Generate an .xlsx report (Summary, Stations, Energy, JES sheets).
+
+    Rows are streamed straight from the solution into a write-only
+    workbook, and the bytes are cached by solution hash so repeated
+    downloads of the same result don't rebuild the file.
+    """
+    key = (
+        solution_hash(stations, ct), algo,
+        energy.total_energy_kwh, energy.total_cost, energy.total_co2_kg,
+    )
+    cached = _EXCEL_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    from openpyxl import Workbook  # only needed when a report is downloaded
+    from openpyxl.styles import Font
+
+    wb = Workbook(write_only=True)
+    bold = Font(bold=True)
+
+    # 1. Summary
+    ws = wb.create_sheet("Summary")
+    _header_row(ws, ["Algorithm", "Cycle Time (s)", "Efficiency (%)", "Stations", "Theoretical Min", "Smoothness Index"], bold)
+    ws.append([
+        algo, ct, metrics["line_efficiency"], metrics["num_stations"],
+        metrics["theoretical_min_stations"], metrics["smoothness_index"],
+    ])
+
+    # 2. Stations
+    ws = wb.create_sheet("Stations")
+    _header_row(ws, ["Station", "Task ID", "Task Name", "Duration (s)"], bold)
+    for s in stations:
+        for t in s["task_details"]:
+            ws.append([s["station_id"], t["id"], t["name"], t["duration"]])
+
+    # 3. Energy
+    ws = wb.create_sheet("Energy")
+    _header_row(ws, ["Station", "Idle Time (s)", "Energy (kWh)", "Cost ($)", "CO2 (kg)"], bold)
+    for d in energy.per_station:
+        ws.append([d.station_id, d.idle_time, d.energy_kwh, d.cost, d.co2_kg])
+
+    # 4. JES (steps come from the per-station JES cache)
+    ws = wb.create_sheet("JES Works Instructions")
+    _header_row(ws, ["Station", "Step", "Task ID", "Task Name", "Duration", "Cumulative Time", "Key Points"], bold)
+    for s in stations:
+        jes = generate_station_jes(s, ct)
+        for step in jes["steps"]:
+            ws.append([
+                s["station_id"], step["step"], step["task_id"], step["task_name"],
+                step["duration"], step["cumulative_time"], step["key_points"],
+            ])
+
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        # 1. Summary
-        pd.DataFrame([{
-            "Algorithm": algo, "Cycle Time (s)": ct,
-            "Efficiency (%)": metrics["line_efficiency"],
-            "Stations": metrics["num_stations"],
-            "Theoretical Min": metrics["theoretical_min_stations"],
-            "Smoothness Index": metrics["smoothness_index"]
-        }]).to_excel(writer, sheet_name="Summary", index=False)
-        
-        # 2. Stations
-        st_data = []
-        for s in stations:
-            for t in s["task_details"]:
-                st_data.append({
-                    "Station": s["station_id"], "Task ID": t["id"],
-                    "Task Name": t["name"], "Duration (s)": t["duration"]
-                })
-        pd.DataFrame(st_data).to_excel(writer, sheet_name="Stations", index=False)
-        
-        # 3. Energy
-        pd.DataFrame([{
-            "Station": d.station_id, "Idle Time (s)": d.idle_time,
-            "Energy (kWh)": d.energy_kwh, "Cost ($)": d.cost, "CO2 (kg)": d.co2_kg
-        } for d in energy.per_station]).to_excel(writer, sheet_name="Energy", index=False)
-
-        # 4. JES
-        jes_data = []
-        for sid, jes in jes_all.items():
-            for step in jes["steps"]:
-                jes_data.append({
-                    "Station": sid, "Step": step["step"],
-                    "Task ID": step["task_id"], "Task Name": step["task_name"],
-                    "Duration": step["duration"], "Cumulative Time": step["cumulative_time"],
-                    "Key Points": step["key_points"]
-                })
-        pd.DataFrame(jes_data).to_excel(writer, sheet_name="JES Works Instructions", index=False)
-    return output.getvalue()
+    wb.save(output)
+    data = output.getvalue()
+    _EXCEL_CACHE.put(key, data, size=len(data))
+    return data
@@ -0,0 +1,140 @@
+"""
+Cached stages of the dashboard pipeline: parse -> graph -> solve -> energy,
+plus the DAG figure. Each stage is keyed by content hashes of its inputs,
+so a rerun only recomputes stages whose inputs changed.
+
+Large results (task frames, graphs, solutions, energy reports) live in one
+process-wide ResultStore under a memory budget; sessions pin the entries
+they use through ui.state. Small derived artefacts (DAG layouts and
+figures) use plain LRU caches. Cached values are shared across sessions:
+don't mutate them. Solves run as background jobs (see submit_solve).
+"""
+
+import io
+import os
+
+import pandas as pd
+
+from engine.cache import LRUCache
+from engine.energy_waste import calculate_energy_waste
+from engine.hashing import bytes_hash, graph_hash, parts_hash
+from engine.jobs import JobManager
+from engine.store import ResultStore
+from data.parser import load_tasks_csv
+from data.solver_cache import solve_cached
+from ui.components import create_dag_figure, dag_layout
+
+TTL = 3600  # seconds an unused entry is kept
+STORE_BUDGET = int(os.environ.get("ALB_STORE_BUDGET_MB", "512")) * 1024 * 1024
+
+# ("input", content hash)              -> (task_df, graph, graph hash)
+# ("solve", graph hash, ct, algo)      -> (stations, metrics)
+# ("energy", graph hash, ct, algo, …)  -> EnergyReport
+STORE = ResultStore(STORE_BUDGET, ttl=TTL)
+
+_LAYOUT = LRUCache(maxsize=8, ttl=TTL)    # graph hash -> DAG layer layout
+_DAG = LRUCache(maxsize=32, ttl=TTL)      # (graph hash, layer range) -> plotly Figure
+
+
+def _input_entry(source, progress=None):
+    # Every input path (sample, upload, manual entry) goes through the same validator
+    df, g = load_tasks_csv(source, progress=progress)
+    return df, g, graph_hash(g)
+
+
+def parse_file(path):
+    """Sample/local CSV -> (key, (task_df, graph, graph hash)), keyed by file contents."""
+    with open(path, "rb") as f:
+        data = f.read()
+    key = ("input", bytes_hash(data))
+    return key, STORE.get_or_set(key, lambda: _input_entry(io.BytesIO(data)))
+
+
+def parse_upload(uploaded, progress=None):
+    """Uploaded CSV -> (key, (task_df, graph, graph hash)); progress only fires on a miss."""
+    key = ("input", bytes_hash(uploaded.getbuffer()))
+
+    return key, STORE.get_or_set(key, lambda: _input_entry(uploaded, progress))
+
+
+def frame_input(df):
+    """Edited task frame -> (key, (task_df, graph, graph hash)), keyed by the frame's contents."""
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy()  # vectorised, one uint64 per row
+    key = ("input", parts_hash([tuple(df.columns), bytes_hash(rows.tobytes())]))
+    return key, STORE.get_or_set(key, lambda: _input_entry(io.BytesIO(df.to_csv(index=False).encode("utf-8"))))
+
+
+# Background solves, shared by all sessions; identical requests share one job.
+# Finished jobs are kept briefly (they reference their result outside the store budget).
+JOBS = JobManager(max_workers=2, keep_finished=32, finished_ttl=60)
+
+
+def solve_key(g_hash, cycle_time, algorithm):
+    return ("solve", g_hash, float(cycle_time), algorithm)
+
+
+def submit_solve(graph, g_hash, cycle_time, algorithm, owner=None):
+    """
+    Start (or join) a background solve for owner (the session). The job's
+    result is (stations, metrics); job.partial holds the stations built so
+    far while it runs.
+    """
+    key = solve_key(g_hash, cycle_time, algorithm)
+
+    def run(progress):
+        def on_station(stations, assigned, total):
+            progress(assigned / total if total else 1.0, stations)
+        return STORE.get_or_set(key, lambda: solve_cached(graph, cycle_time, algorithm, g_hash=g_hash, progress=on_station))
+
+    return JOBS.submit(key, run, owner=owner)
+
+
+def release_solve(job_id, owner):
+    """owner no longer waits for job_id; it is cancelled if queued and nobody else does."""
+    return JOBS.release(job_id, owner)
+
+
+def cached_solve(g_hash, cycle_time, algorithm):
+    """(stations, metrics) if this solve is already in the store, else None."""
+    return STORE.get(solve_key(g_hash, cycle_time, algorithm))
+
+
+def energy_key(g_hash, cycle_time, algorithm, kwh_per_sec, cost_per_kwh, co2_factor):
+    return ("energy", g_hash, float(cycle_time), algorithm, kwh_per_sec, cost_per_kwh, co2_factor)
+
+
+def energy(stations, g_hash, cycle_time, algorithm, kwh_per_sec, cost_per_kwh, co2_factor):
+    """(key, EnergyReport) for a solve result and the energy parameters."""
+    key = energy_key(g_hash, cycle_time, algorithm, kwh_per_sec, cost_per_kwh, co2_factor)
+    return key, STORE.get_or_set(
+        key, lambda: calculate_energy_waste(stations, cycle_time, kwh_per_sec, cost_per_kwh, co2_factor),
+    )
+
+
+def layout(graph, g_hash):
+    """DAG layer layout, computed once per graph (None if the graph has a cycle)."""
+    def compute():
+        try:
+            return dag_layout(graph)
+        except ValueError:
+            return None
+    return _LAYOUT.get_or_set(g_hash, compute)
+
+
+def dag_figure(graph, g_hash, layers=None):
+    """Precedence graph figure (whole graph, or a drilled-down layer range)."""
+    def build():
+        lay = layout(graph, g_hash)
+        return create_dag_figure(graph, lay, layers) if lay is not None else create_dag_figure(graph)
+    return _DAG.get_or_set((g_hash, layers), build)
+
+
+def cache_stats():
+    """{"store": ResultStore.stats(), "layout"/"dag": LRUCache.stats()}"""
+    return {"store": STORE.stats(), "layout": _LAYOUT.stats(), "dag": _DAG.stats()}
+
+
+def clear():
+    STORE.clear()
+    _LAYOUT.clear()
+    _DAG.clear()
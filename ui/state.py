@@ -0,0 +1,38 @@
+"""
+Per-session references into the shared result store.
+
+Sessions keep only store keys (in a StoreRefs object in session_state);
+the data itself lives once per process in ui.pipeline.STORE and is
+released when the session goes away.
+
+Slots: "input" -> (task_df, graph, graph hash), "solve_<algo>" ->
+(stations, metrics), "energy_<algo>" -> EnergyReport.
+"""
+
+import streamlit as st
+
+from engine.store import StoreRefs
+from ui.pipeline import STORE
+
+
+def refs() -> StoreRefs:
+    r = st.session_state.get("_store_refs")
+    if r is None:
+        r = st.session_state["_store_refs"] = StoreRefs(STORE)
+    return r
+
+
+def hold(slot, key, value=None):
+    """Pin key in this session's slot; returns the stored value."""
+    return refs().hold(slot, key, value)
+
+
+def held(slot, default=None):
+    """Value this session holds in slot, or default."""
+    return refs().get(slot, default)
+
+
+def current(slot, key):
+    """Value held in slot if it was stored under key (i.e. is up to date), else None."""
+    r = refs()
+    return r.get(slot) if r.key(slot) == key else None
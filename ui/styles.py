@@ -97,6 +97,7 @@ def apply_styles():
     .pb {{ height:100%; border-radius:99px; transition:width .5s cubic-bezier(.4,0,.2,1); }}
     .bn {{ text-align:center; background:var(--card); padding:1.25rem .5rem; border-radius:12px; border:1px solid var(--bdr); }}
     .bn .sid {{ font-weight:700; color:var(--muted); font-size:.65rem; text-transform:uppercase; letter-spacing:.1em; margin-bottom:.4rem; }}
+    .bng {{ display:grid; grid-template-columns:repeat(auto-fill, minmax(120px, 1fr)); gap:.75rem; }}
     .bn .pct {{ font-size:1.5rem; font-family:'Fira Code',monospace; font-weight:700; color:var(--txt); margin-bottom:.5rem; }}
     .ft {{ text-align:center; color:#475569; font-size:.72rem; padding:2rem 0 .5rem; font-family:'Fira Code',monospace; letter-spacing:.03em; }}
     .stSelectbox label, .stSlider label, .stNumberInput label, .stRadio label, .stFileUploader label {{ font-size:.85rem !important; color:var(--muted) !important; }}
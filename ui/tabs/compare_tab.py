@@ -1,7 +1,7 @@
 import streamlit as st
 import plotly.graph_objects as go
 
-from data.database import list_scenarios, load_scenario
+from data.database import compare_scenarios, list_scenarios_page, load_scenario_lazy
 from ui.styles import C, PLOTLY_LAYOUT
 
 
@@ -25,48 +25,76 @@ def delta_metric(label, v1, v2, suffix="", invert=False):
     </div>"""
 
 
+# Scenarios offered per selectbox; narrow with the search box
+SELECT_LIMIT = 100
+
+
+def scenario_label(s):
+    return f"[{s['algorithm'].upper()}] {s['name']} (CT={s['cycle_time']})"
+
+
+def scenario_picker(label, key, default_index=0):
+    """Search box + selectbox backed by a server-side, paginated query."""
+    search = st.text_input(f"Search {label.lower()}", key=f"{key}_q", placeholder="Name contains…", label_visibility="collapsed")
+    options, more = list_scenarios_page(limit=SELECT_LIMIT, search=search or None)
+    if not options:
+        st.caption("No matching scenarios.")
+        return None
+    if more:
+        st.caption(f"Showing the {SELECT_LIMIT} newest matches — refine the search to narrow down.")
+    # Options are scenario ids, so the selection survives the list changing (new saves, search)
+    labels = {s["id"]: scenario_label(s) for s in options}
+    return st.selectbox(label, list(labels), index=min(default_index, len(labels) - 1), format_func=labels.get, key=key)
+
+
 def render_compare_tab():
     st.markdown('<div class="sh">⚖️ Scenario Comparison</div>', unsafe_allow_html=True)
-    saved = list_scenarios()
+    first_two, _ = list_scenarios_page(limit=2)
 
-    if len(saved) < 2:
+    if len(first_two) < 2:
         st.info("⚠️ Please save at least 2 scenarios in the Results tab to compare them here.")
     else:
+        mode = st.radio("Comparison mode", ["Two scenarios", "Many scenarios"], horizontal=True, label_visibility="collapsed")
+        if mode == "Many scenarios":
+            render_nway_compare()
+            return
+
         c1, c2 = st.columns(2)
         with c1:
-            s1_idx = st.selectbox("Select Baseline Scenario", range(len(saved)), format_func=lambda i: f"[{saved[i]['algorithm'].upper()}] {saved[i]['name']} (CT={saved[i]['cycle_time']})", key="sc1")
+            id1 = scenario_picker("Select Baseline Scenario", "sc1")
         with c2:
-            s2_idx = st.selectbox("Select Target Scenario", range(len(saved)), index=min(1, len(saved)-1), format_func=lambda i: f"[{saved[i]['algorithm'].upper()}] {saved[i]['name']} (CT={saved[i]['cycle_time']})", key="sc2")
+            id2 = scenario_picker("Select Target Scenario", "sc2", default_index=1)
+
+        if id1 is None or id2 is None:
+            return
 
-        sc1 = load_scenario(saved[s1_idx]["id"])
-        sc2 = load_scenario(saved[s2_idx]["id"])
+        # Headline metrics only; station loads are fetched when the chart reads them
+        sc1 = load_scenario_lazy(id1)
+        sc2 = load_scenario_lazy(id2)
 
-        if not sc1 or not sc2 or not sc1.get("results") or not sc2.get("results"):
+        if not sc1 or not sc2 or sc1["num_stations"] is None or sc2["num_stations"] is None:
             st.error("One or more selected scenarios have missing results data.")
             return
 
-        m1 = sc1["results"]
-        m2 = sc2["results"]
-
         st.markdown("### 📈 Metric Deltas")
         mc1, mc2, mc3, mc4 = st.columns(4)
 
         with mc1:
-            st.markdown(delta_metric("Efficiency", m1["line_efficiency"], m2["line_efficiency"], "%"), unsafe_allow_html=True)
+            st.markdown(delta_metric("Efficiency", sc1["line_efficiency"], sc2["line_efficiency"], "%"), unsafe_allow_html=True)
         with mc2:
-            st.markdown(delta_metric("Stations", m1["num_stations"], m2["num_stations"], "", invert=True), unsafe_allow_html=True)
+            st.markdown(delta_metric("Stations", sc1["num_stations"], sc2["num_stations"], "", invert=True), unsafe_allow_html=True)
         with mc3:
-            st.markdown(delta_metric("Smoothness", m1["smoothness_index"], m2["smoothness_index"], "", invert=True), unsafe_allow_html=True)
+            st.markdown(delta_metric("Smoothness", sc1["smoothness_index"], sc2["smoothness_index"], "", invert=True), unsafe_allow_html=True)
         with mc4:
-            e1 = sc1["results"].get("total_energy_kwh", 0)
-            e2 = sc2["results"].get("total_energy_kwh", 0)
+            e1 = sc1["total_energy_kwh"] or 0
+            e2 = sc2["total_energy_kwh"] or 0
             st.markdown(delta_metric("Energy Waste", e1, e2, " kWh", invert=True), unsafe_allow_html=True)
 
         st.markdown("<br>", unsafe_allow_html=True)
 
         # Load Comparison Chart
-        st1_loads = [s["total_time"] for s in sc1["results"].get("stations", [])]
-        st2_loads = [s["total_time"] for s in sc2["results"].get("stations", [])]
+        st1_loads = [s["total_time"] for s in sc1["loads"]]
+        st2_loads = [s["total_time"] for s in sc2["loads"]]
 
         fig_comp = go.Figure()
         fig_comp.add_trace(go.Bar(name=f"Baseline: {sc1['name']}", x=[f"Stn {i+1}" for i in range(len(st1_loads))], y=st1_loads, marker_color=C["muted"]))
@@ -79,3 +107,53 @@ def render_compare_tab():
             fig_comp.add_hline(y=sc2["cycle_time"], line_dash="dash", line_color=C["primary"], annotation_text="Target CT")
 
         st.plotly_chart(fig_comp, use_container_width=True)
+
+
+def render_nway_compare():
+    """Summary table + load-distribution chart for N scenarios, from one SQL query."""
+    search = st.text_input("Search scenarios", key="nway_q", placeholder="Name contains…", label_visibility="collapsed")
+    options, more = list_scenarios_page(limit=SELECT_LIMIT, search=search or None)
+    if more:
+        st.caption(f"Showing the {SELECT_LIMIT} newest matches — refine the search to narrow down.")
+    labels = {s["id"]: scenario_label(s) for s in options}
+    ids = st.multiselect("Scenarios (the first one is the baseline)", list(labels), default=list(labels)[:2], format_func=labels.get, key="nway_ids")
+    if len(ids) < 2:
+        st.caption("Select at least 2 scenarios.")
+        return
+
+    rows = compare_scenarios(ids)
+    if len(rows) < 2:
+        st.error("One or more selected scenarios have missing results data.")
+        return
+
+    st.markdown("### 📋 Summary")
+    st.dataframe(
+        [
+            {
+                "Scenario": r["name"],
+                "Algorithm": r["algorithm"].upper(),
+                "CT (s)": r["cycle_time"],
+                "Stations": r["num_stations"],
+                "Efficiency (%)": r["line_efficiency"],
+                "Δ Efficiency": r["delta_line_efficiency"],
+                "Smoothness": r["smoothness_index"],
+                "Δ Smoothness": r["delta_smoothness_index"],
+                "Energy (kWh)": r["total_energy_kwh"],
+                "Δ Energy": r["delta_total_energy_kwh"],
+                "Rank (Eff.)": r["rank_line_efficiency"],
+                "Rank (Energy)": r["rank_total_energy_kwh"],
+            }
+            for r in rows
+        ],
+        hide_index=True, use_container_width=True,
+    )
+
+    # Load distribution: one box per scenario
+    fig = go.Figure()
+    for i, r in enumerate(rows):
+        fig.add_trace(go.Box(
+            y=r["loads"], name=f"{r['name']} (#{r['id']})", boxpoints="all", jitter=0.3,
+            marker_color=C["muted"] if i == 0 else C["primary"],
+        ))
+    fig.update_layout(**PLOTLY_LAYOUT, title=dict(text="Station Load Distribution", font=dict(size=14)), yaxis_title="Load Time (sec)", height=380, showlegend=False)
+    st.plotly_chart(fig, use_container_width=True)
@@ -1,17 +1,9 @@
 import streamlit as st
 import pandas as pd
-import io
 
+from ui import pipeline, state
 from ui.styles import C
-from ui.components import metric_card, create_dag_figure
-from data.parser import parse_csv
-from engine.graph import PrecedenceGraph
-
-
-def load_graph(df: pd.DataFrame) -> PrecedenceGraph:
-    g = PrecedenceGraph()
-    g.load_from_dataframe(df)
-    return g
+from ui.components import DAG_DETAIL_LIMIT, dag_drilldown_views, dag_view_label, metric_card
 
 
 def render_input_tab():
@@ -27,34 +19,42 @@ def render_input_tab():
 
     if data_source == "📂 Sample Data":
         try:
-            df = parse_csv("sample_tasks.csv")
+            key, (df, graph, g_hash) = pipeline.parse_file("sample_tasks.csv")
             st.success("Loaded 10 tasks from `sample_tasks.csv`")
         except Exception as e:
             st.error(str(e))
     elif data_source == "📤 Upload CSV":
         uploaded = st.file_uploader("Upload CSV", type=["csv"], help="Columns: task_id, task_name, duration, predecessors")
         if uploaded:
+            # Stream the upload in chunks straight from the uploaded buffer (no copy);
+            # unchanged uploads come from the parse cache without re-reading
+            bar = st.progress(0.0, text="Reading tasks…")
             try:
-                df = parse_csv(io.BytesIO(uploaded.read()))
-                st.success("CSV uploaded and validated!")
+                key, (df, graph, g_hash) = pipeline.parse_upload(
+                    uploaded,
+                    progress=lambda rows, frac: bar.progress(frac, text=f"Reading tasks… {rows:,} rows"),
+                )
+                bar.empty()
+                st.success(f"CSV uploaded and validated! ({len(df):,} tasks)")
             except ValueError as e:
+                bar.empty()
                 st.error(f"Validation error: {e}")
     elif "Manual Entry" in data_source:
         default_data = pd.DataFrame({"task_id": ["T1", "T2"], "task_name": ["Task 1", "Task 2"], "duration": [5.0, 4.0], "predecessors": ["", "T1"]})
         edited = st.data_editor(default_data, num_rows="dynamic", use_container_width=True)
         if st.button("✅ Confirm Data", type="primary"):
             try:
-                df = parse_csv(io.StringIO(edited.to_csv(index=False)))
+                key, (df, graph, g_hash) = pipeline.frame_input(edited)
                 st.success("Data validated!")
             except ValueError as e:
                 st.error(f"Validation error: {e}")
                 df = None
 
     if df is not None:
-        st.session_state["task_df"] = df
         try:
-            graph = load_graph(df)
-            st.session_state["graph"] = graph
+            # The session pins the shared entry; only its key is kept per session
+            state.hold("input", key, (df, graph, g_hash))
+            st.session_state["graph_hash"] = g_hash
             s = graph.summary()
 
             c1, c2 = st.columns([1, 2])
@@ -73,7 +73,18 @@ def render_input_tab():
 
             with c2:
                 # ── Feature 1: DAG Visualization ──
-                st.plotly_chart(create_dag_figure(graph), use_container_width=True)
+                layers = None
+                lay = pipeline.layout(graph, g_hash)
+                if lay is not None and len(graph.tasks) > DAG_DETAIL_LIMIT:
+                    # Large graphs: collapsed layer groups, with drill-down into one group
+                    # (paged when a group is wider than one detail figure)
+                    pick = st.selectbox(
+                        "Drill down", [None] + dag_drilldown_views(lay),
+                        format_func=lambda v: "Overview (collapsed layers)" if v is None else dag_view_label(lay, v),
+                        key="dag_drill",
+                    )
+                    layers = pick
+                st.plotly_chart(pipeline.dag_figure(graph, g_hash, layers), use_container_width=True)
 
         except Exception as e:
             st.error(f"Graph error: {e}")
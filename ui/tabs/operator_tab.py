@@ -1,23 +1,39 @@
 import streamlit as st
-import html
+import io
 
-from engine.jes_generator import generate_jes, format_jes_markdown
+from engine.jes_generator import generate_station_jes, format_jes_markdown
+from engine.jes_export import export_jes_archive
+from ui import pipeline, state
 from ui.styles import C
-from ui.components import metric_card
+from ui.components import jes_steps_html, metric_card
+
+
+def build_jes_zip(stations, cycle_time, generated_at):
+    buf = io.BytesIO()
+    export_jes_archive(stations, cycle_time, buf, generated_at=generated_at)
+    return buf.getvalue()
 
 
 def render_operator_tab(cycle_time):
     st.markdown('<div class="sh">👷 Digital Work Instructions <span class="b b-i" style="margin-left:.75rem;">JES</span></div>', unsafe_allow_html=True)
-    available_stations = st.session_state.get("stations_rpw") or st.session_state.get("stations_greedy")
+    # Only solutions for the current inputs (the Results tab may not have rerun since)
+    g_hash = st.session_state.get("graph_hash")
+    algo_key, available_stations = "rpw", None
+    for key in ("rpw", "greedy"):
+        result = state.current(f"solve_{key}", pipeline.solve_key(g_hash, cycle_time, key))
+        if result:
+            algo_key, available_stations = key, result[0]
+            break
 
     if not available_stations:
         st.warning("⚠️ Run the solver in **Results** tab first.")
     else:
-        jes_all = generate_jes(available_stations, cycle_time)
-        selected_station = st.selectbox("Select Station", sorted(jes_all.keys()), format_func=lambda x: f"Station {x}")
+        by_id = {s["station_id"]: s for s in available_stations}
+        selected_station = st.selectbox("Select Station", sorted(by_id.keys()), format_func=lambda x: f"Station {x}")
 
         if selected_station:
-            jes = jes_all[selected_station]
+            # Only the viewed station is generated; steps are memoized by content hash
+            jes = generate_station_jes(by_id[selected_station], cycle_time, generated_at=st.session_state.get(f"solved_at_{algo_key}"))
             pct = jes["utilization_pct"]
             j1, j2, j3 = st.columns(3)
             with j1:
@@ -31,16 +47,21 @@ def render_operator_tab(cycle_time):
             st.markdown(f'<div class="pt" style="height:6px; margin:1rem 0 1.5rem;"><div class="pb" style="width:{min(pct,100)}%; background:linear-gradient(90deg,{bar_c},{bar_c}88);"></div></div>', unsafe_allow_html=True)
             st.markdown('<div class="sh" style="margin-top:0;">📋 Work Steps</div>', unsafe_allow_html=True)
 
-            for s in jes["steps"]:
-                prog = round((s["cumulative_time"] / jes["cycle_time"]) * 100, 1)
-                kp = f'<div style="color:{C["warning"]}; font-size:.8rem; margin-top:.5rem;">📌 {html.escape(s["key_points"])}</div>' if s["key_points"] else ""
-                st.markdown(f"""
-                <div class="js"><div class="h"><span>Step {s['step']}: {html.escape(s['task_name'])}</span><span class="t">⏱️ {s['duration']}s</span></div>
-                <div class="d"><span>ID: <code>{html.escape(s['task_id'])}</code></span><span>Σ {s['cumulative_time']}/{jes['cycle_time']}s</span><span>Rem: {s['remaining_time']}s</span></div>
-                <div class="pt"><div class="pb" style="width:{prog}%; background:linear-gradient(90deg,{C['primary']},{C['primary2']});"></div></div>{kp}</div>
-                """, unsafe_allow_html=True)
+            # One cached HTML block per station (single websocket delta)
+            st.markdown(jes_steps_html(by_id[selected_station], cycle_time), unsafe_allow_html=True)
 
             with st.expander("📄 Export Markdown"):
                 md = format_jes_markdown(jes)
                 st.code(md, language="markdown")
                 st.download_button("📥 Download", md, f"JES_Station_{selected_station}.md", "text/markdown")
+
+        with st.expander("🗂️ Export All Stations (ZIP)"):
+            st.caption(f"Markdown + HTML instructions for all {len(available_stations)} stations.")
+            solved_at = st.session_state.get(f"solved_at_{algo_key}")
+            # Callable data: the archive is only built when the button is clicked
+            st.download_button(
+                "📥 Download ZIP",
+                data=lambda: build_jes_zip(available_stations, cycle_time, solved_at),
+                file_name=f"JES_All_Stations_CT{cycle_time}.zip",
+                mime="application/zip",
+            )
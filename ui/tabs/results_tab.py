@@ -1,40 +1,84 @@
 import streamlit as st
-import plotly.graph_objects as go
-import html
-
-from engine.rpw_solver import solve_rpw
-from engine.greedy_solver import solve_greedy
-from engine.metrics import compute_all_metrics
-from engine.energy_waste import calculate_energy_waste
-from engine.jes_generator import generate_jes
+
+from engine.jes_generator import jes_timestamp
+from engine.hashing import solution_hash
 from data.database import save_scenario
-from ui.styles import C, PLOTLY_LAYOUT
-from ui.components import metric_card, generate_excel_export
+from ui import pipeline, state
+from ui.styles import C
+from ui.components import bottleneck_grid, bottleneck_page, create_load_figure, metric_card, generate_excel_export
+
+# Bottleneck badges shown per page
+BOTTLENECK_PAGE = 24
+# Solves finishing within this many seconds are shown without a progress view
+QUICK_SOLVE = 0.3
+POLL_INTERVAL = 0.5
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def render_solve_progress(job_ids, cycle_time):
+    """Poll running solve jobs; show progress and the stations built so far."""
+    running = False
+    for name, job_id in job_ids.items():
+        job = pipeline.JOBS.get(job_id)
+        if job is None or job.finished:
+            continue
+        running = True
+        st.session_state[f"solve_progress_{name.lower()}"] = job.progress
+        st.progress(job.progress, text=f"Solving {name}… {job.progress:.0%}")
+        partial = list(job.partial or [])
+        if partial:
+            st.plotly_chart(create_load_figure(partial, cycle_time, f"Station Loads — {name} (partial: {len(partial)} stations)"), use_container_width=True)
+    if not running:
+        st.rerun()
 
 
 def render_results_tab(algorithm, cycle_time, kwh_per_sec, cost_per_kwh, co2_factor):
     st.markdown('<div class="sh">📊 Line Balancing Results</div>', unsafe_allow_html=True)
 
-    if "graph" not in st.session_state:
+    inputs = state.held("input")
+    if inputs is None:
         st.warning("⚠️ Load data in the **Data Input** tab first.")
     else:
-        graph = st.session_state["graph"]
+        task_df, graph, g_hash = inputs
         try:
             algo_key = {"RPW (Ranked Positional Weight)": "rpw", "Greedy (Largest Candidate)": "greedy", "Compare (Both)": "compare"}[algorithm]
 
-            if algo_key == "compare":
-                results_list = [("RPW", solve_rpw(graph, cycle_time)), ("Greedy", solve_greedy(graph, cycle_time))]
-            elif algo_key == "rpw":
-                results_list = [("RPW", solve_rpw(graph, cycle_time))]
-            else:
-                results_list = [("Greedy", solve_greedy(graph, cycle_time))]
+            # Cached per (graph, cycle time, algorithm); misses run as background
+            # jobs (shared with identical in-flight requests) through the solver cache
+            solved, running = {}, {}
+            for name, key in (("RPW", "rpw"), ("Greedy", "greedy")):
+                if algo_key in (key, "compare"):
+                    slot = f"solve_job_{key}"
+                    previous = st.session_state.pop(slot, None)
+                    result = pipeline.cached_solve(g_hash, cycle_time, key)
+                    job = None
+                    if result is None:
+                        job = pipeline.submit_solve(graph, g_hash, cycle_time, key, owner=state.refs())
+                        st.session_state[slot] = job.job_id
+                    if previous is not None and (job is None or job.job_id != previous):
+                        # Inputs changed (e.g. cycle time slider): drop this session's superseded solve
+                        pipeline.release_solve(previous, state.refs())
+                    if job is not None:
+                        if not job.wait(QUICK_SOLVE):
+                            running[name] = job.job_id
+                            continue
+                        if job.error is not None:
+                            raise job.error
+                        result = job.result
+                    solved[name] = state.hold(f"solve_{key}", pipeline.solve_key(g_hash, cycle_time, key), result)
+
+            if running:
+                render_solve_progress(running, cycle_time)
+                return
+            results_list = [(name, stations) for name, (stations, _) in solved.items()]
 
             for algo_name, stations in results_list:
                 if algo_key == "compare":
                     st.markdown(f"""<div style="margin:1.5rem 0 .75rem; font-family:'Fira Code',monospace; font-size:1.1rem; font-weight:700; color:{C['text']}; border-bottom:1px solid {C['border']}; padding-bottom:0.5rem;"><span style="color:{C['primary']};">▸</span> {algo_name} Algorithm</div>""", unsafe_allow_html=True)
 
-                metrics = compute_all_metrics(stations, cycle_time, graph.total_work_content())
-                energy = calculate_energy_waste(stations, cycle_time, kwh_per_sec, cost_per_kwh, co2_factor)
+                metrics = solved[algo_name][1]
+                e_key, energy = pipeline.energy(stations, g_hash, cycle_time, algo_name.lower(), kwh_per_sec, cost_per_kwh, co2_factor)
+                state.hold(f"energy_{algo_name.lower()}", e_key, energy)
 
                 # ── Metric Cards ──
                 m1, m2, m3, m4, m5 = st.columns(5)
@@ -54,40 +98,20 @@ def render_results_tab(algorithm, cycle_time, kwh_per_sec, cost_per_kwh, co2_fac
                 st.markdown("")
 
                 # ── Station Load Chart ──
-                fig = go.Figure()
-                for s_item in stations:
-                    safe_tasks = ", ".join(html.escape(str(t)) for t in s_item["tasks"])
-                    fig.add_trace(go.Bar(
-                        x=[s_item["total_time"]], y=[f"Stn {s_item['station_id']}"],
-                        orientation="h", name=f"Stn {s_item['station_id']}",
-                        text=f"{s_item['total_time']}s  ({safe_tasks})", textposition="inside", textfont=dict(size=11),
-                        marker=dict(color=C["primary"], line=dict(width=0)),
-                        hovertemplate=f"<b>Station {s_item['station_id']}</b><br>Load: {s_item['total_time']}s<br>Idle: {s_item['idle_time']}s<br>Tasks: {safe_tasks}<extra></extra>",
-                    ))
-                    if s_item["idle_time"] > 0:
-                        fig.add_trace(go.Bar(
-                            x=[s_item["idle_time"]], y=[f"Stn {s_item['station_id']}"],
-                            orientation="h", name="Idle", showlegend=False,
-                            text=f"{s_item['idle_time']}s", textposition="inside", textfont=dict(size=10, color="rgba(248,250,252,0.5)"),
-                            marker=dict(color="rgba(239,68,68,0.2)", line=dict(width=0)),
-                        ))
-
-                fig.add_vline(x=cycle_time, line_dash="dash", line_color=C["warning"], annotation_text=f"CT={cycle_time}s", annotation_font=dict(color=C["warning"], size=11))
-                fig.update_layout(**PLOTLY_LAYOUT, barmode="stack", title=dict(text=f"Station Loads — {algo_name}", font=dict(size=14)), xaxis_title="Time (sec)", yaxis_title="", height=max(220, len(stations) * 55 + 60), showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
-
-                # ── Bottlenecks ──
-                bn_scores = metrics["bottleneck_scores"]
-                bn_cols = st.columns(len(bn_scores))
-                for i, bn in enumerate(bn_scores):
-                    with bn_cols[i]:
-                        bc = "b-r" if bn["is_bottleneck"] else "b-y" if bn["load_percent"] >= 70 else "b-g"
-                        bl = "BOTTLENECK" if bn["is_bottleneck"] else "OPTIMAL"
-                        st.markdown(f'<div class="bn"><div class="sid">Station {bn["station_id"]}</div><div class="pct">{bn["load_percent"]}%</div><span class="b {bc}">{bl}</span></div>', unsafe_allow_html=True)
-
-                st.session_state[f"energy_{algo_name.lower()}"] = energy
-                st.session_state[f"stations_{algo_name.lower()}"] = stations
-                st.session_state[f"metrics_{algo_name.lower()}"] = metrics
+                st.plotly_chart(create_load_figure(stations, cycle_time, f"Station Loads — {algo_name}"), use_container_width=True)
+
+                # ── Bottlenecks (most loaded first, paginated) ──
+                shown, pages = bottleneck_page(metrics["bottleneck_scores"], 1, BOTTLENECK_PAGE)
+                if pages > 1:
+                    page = st.number_input(f"Bottleneck page (of {pages})", 1, pages, 1, key=f"bn_page_{algo_name.lower()}")
+                    shown, _ = bottleneck_page(metrics["bottleneck_scores"], page, BOTTLENECK_PAGE)
+                st.markdown(bottleneck_grid(shown), unsafe_allow_html=True)
+
+                # JES timestamp is taken once per distinct solution, not per rerun
+                sol_hash = solution_hash(stations, cycle_time)
+                if st.session_state.get(f"solution_hash_{algo_name.lower()}") != sol_hash:
+                    st.session_state[f"solution_hash_{algo_name.lower()}"] = sol_hash
+                    st.session_state[f"solved_at_{algo_name.lower()}"] = jes_timestamp()
 
             # ── Excel Export (Feature 3) & Saving ──
             st.markdown("---")
@@ -104,26 +128,22 @@ def render_results_tab(algorithm, cycle_time, kwh_per_sec, cost_per_kwh, co2_fac
                 scen_name = st.text_input("Name", value=f"{algo_for_export[:3]}_CT{cycle_time}", label_visibility="collapsed")
                 if st.button("Save Scenario", type="primary"):
                     try:
-                        m_key = f"metrics_{algo_for_export.lower()}"
-                        e_key = f"energy_{algo_for_export.lower()}"
-                        last_m = st.session_state.get(m_key, {})
-                        last_e = st.session_state.get(e_key)
-                        tdf = st.session_state.get("task_df")
-                        sid = save_scenario(scen_name, cycle_time, algo_for_export.lower(), tdf.to_dict("records") if tdf is not None else [], last_m, stations_for_export, last_e.to_dict() if last_e else {})
+                        last_m = solved[algo_for_export][1]
+                        last_e = state.held(f"energy_{algo_for_export.lower()}")
+                        sid = save_scenario(scen_name, cycle_time, algo_for_export.lower(), task_df.to_dict("records"), last_m, stations_for_export, last_e.to_dict() if last_e else {})
                         st.success(f"Saved! (ID: {sid})")
                     except Exception as e:
                         st.error(str(e))
 
             with cc2:
                 st.markdown("### 📥 Download Excel Report")
-                metrics_exp = st.session_state.get(f"metrics_{algo_for_export.lower()}")
-                energy_exp = st.session_state.get(f"energy_{algo_for_export.lower()}")
-                jes_exp = generate_jes(stations_for_export, cycle_time)
-                excel_data = generate_excel_export(metrics_exp, stations_for_export, energy_exp, jes_exp, cycle_time, algo_for_export)
+                metrics_exp = solved[algo_for_export][1]
+                energy_exp = state.held(f"energy_{algo_for_export.lower()}")
 
+                # Callable data: the workbook is only built when the button is clicked
                 st.download_button(
                     label="Download .xlsx",
-                    data=excel_data,
+                    data=lambda: generate_excel_export(metrics_exp, stations_for_export, energy_exp, cycle_time, algo_for_export),
                     file_name=f"Report_{algo_for_export}_CT{cycle_time}.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
@@ -1,12 +1,19 @@
 import streamlit as st
 import plotly.graph_objects as go
 
+from ui import pipeline, state
 from ui.styles import C, PLOTLY_LAYOUT
 
 
-def render_sustainability_tab():
+def render_sustainability_tab(cycle_time, kwh_per_sec, cost_per_kwh, co2_factor):
     st.markdown('<div class="sh">🌿 Sustainability Report <span class="b b-g" style="margin-left:.75rem;">9TH WASTE</span></div>', unsafe_allow_html=True)
-    energy_report = st.session_state.get("energy_rpw") or st.session_state.get("energy_greedy")
+    g_hash = st.session_state.get("graph_hash")
+    energy_report = next((
+        r for r in (
+            state.current(f"energy_{key}", pipeline.energy_key(g_hash, cycle_time, key, kwh_per_sec, cost_per_kwh, co2_factor))
+            for key in ("rpw", "greedy")
+        ) if r
+    ), None)
 
     if not energy_report:
         st.warning("⚠️ Run the solver in **Results** tab first.")